@@ -48,7 +48,8 @@ void main() async {
 Future<bool> _checkForDatabaseUpdate() async {
   print("Verificando atualizações do banco de dados...");
   try {
-    final url = Uri.parse('https://raw.githubusercontent.com/PauloRoberto11/bdkards-robo/main/database/brasileirao.db');
+    // O banco é publicado pelo robô como arquivo da release "dados" (não fica mais no repositório)
+    final url = Uri.parse('https://github.com/PauloRoberto11/bdkards-robo/releases/download/dados/brasileirao.db');
 
     // Usando path_provider para encontrar a pasta de documentos correta
     final Directory documentsDirectory = await getApplicationDocumentsDirectory();
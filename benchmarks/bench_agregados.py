@@ -0,0 +1,110 @@
+"""
+Benchmark: agregados por time com laços em Python x NumPy (calcular_agregados_por_time).
+
+Monta um banco com N rodadas sintéticas (o mesmo de bench_suspensoes.py: fluxo de
+rodadas com o livro de cartões, as últimas rodadas ainda por disputar) e calcula os
+agregados das tabelas de TABELAS_DE_AGREGADOS e de ESTATISTICAS_TIME de dois jeitos:
+- Python: um laço por time e por jogo, como o main_run faz com as médias do 365Scores;
+- NumPy: calcular_agregados_por_time.
+Confere que os dois chegam às mesmas linhas e mede também a gravação
+(atualizar_agregados_por_time) com os agregados já em dia, isto é, sem mudanças.
+
+Uso:
+    python benchmarks/bench_agregados.py [--rodadas 38 380 1520] [--repeticoes 5] [--pasta DIR]
+"""
+import argparse
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import cbf_scraper  # noqa: E402
+from bench_suspensoes import montar_banco  # noqa: E402
+
+
+def calcular_em_python(conn):
+    """Os mesmos agregados de calcular_agregados_por_time, com laços por time e por jogo."""
+    jogos_por_time = {}
+    for id_jogo, rodada, mandante, visitante, gols_m, gols_v in conn.execute(
+            "SELECT p.id_jogo, p.rodada, p.mandante_id, p.visitante_id, CAST(p.mandante_gols AS INTEGER), CAST(p.visitante_gols AS INTEGER) "
+            "FROM partidas p JOIN jogos_finalizados f ON f.id_jogo = p.id_jogo "
+            "WHERE p.mandante_id IS NOT NULL AND p.visitante_id IS NOT NULL "
+            "AND p.mandante_gols GLOB '[0-9]*' AND p.visitante_gols GLOB '[0-9]*'"):
+        jogos_por_time.setdefault(mandante, {})[id_jogo] = {'rodada': rodada, 'mando': 'CASA', 'gp': gols_m, 'gc': gols_v, 'am': 0, 'vm': 0}
+        jogos_por_time.setdefault(visitante, {})[id_jogo] = {'rodada': rodada, 'mando': 'FORA', 'gp': gols_v, 'gc': gols_m, 'am': 0, 'vm': 0}
+    for id_jogo, time_id, resultado in conn.execute("SELECT id_jogo, time_id, resultado FROM cartoes_eventos"):
+        jogo = jogos_por_time.get(time_id, {}).get(id_jogo)
+        if jogo:
+            jogo['am'] += resultado in ('AMARELO', 'VERMELHO2AMARELO')
+            jogo['vm'] += resultado in ('VERMELHO', 'VERMELHO2AMARELO')
+
+    mando, rodada, estatisticas_time = [], [], []
+    for time_id in sorted(jogos_por_time):
+        jogos = sorted(jogos_por_time[time_id].items(), key=lambda item: (item[1]['rodada'], item[0]))
+        for filtro in ('TOTAL', 'CASA', 'FORA'):
+            lista = [j for _, j in jogos if filtro in ('TOTAL', j['mando'])]
+            pts = [3 if j['gp'] > j['gc'] else 1 if j['gp'] == j['gc'] else 0 for j in lista]
+            media = lambda total: round(total / len(lista), 2) if lista else 0.0  # noqa: E731
+            gp, gc = sum(j['gp'] for j in lista), sum(j['gc'] for j in lista)
+            mando.append((time_id, filtro, len(lista), pts.count(3), pts.count(1), pts.count(0), sum(pts), gp, gc,
+                          media(gp), media(gc), media(sum(j['am'] for j in lista)), media(sum(j['vm'] for j in lista))))
+        pontos = []
+        for id_jogo, j in jogos:
+            pontos.append(3 if j['gp'] > j['gc'] else 1 if j['gp'] == j['gc'] else 0)
+            ultimos = [jj for _, jj in jogos[max(0, len(pontos) - cbf_scraper.JOGOS_FORMA):len(pontos)]]
+            rodada.append((time_id, j['rodada'], id_jogo, j['mando'], j['gp'], j['gc'], pontos[-1], sum(pontos),
+                           sum(pontos[-cbf_scraper.JOGOS_FORMA:]), sum(jj['gp'] for jj in ultimos), sum(jj['gc'] for jj in ultimos)))
+        total = mando[-3]
+        estatisticas_time.append({'time_id': time_id, 'gols_pro': total[7], 'gols_contra': total[8], 'pontos_forma': rodada[-1][8]})
+    return {'estatisticas_time_mando': mando, 'estatisticas_time_rodada': rodada, 'estatisticas_time': estatisticas_time}
+
+
+def normalizar(agregados):
+    return {tabela: sorted(map(repr, linhas)) for tabela, linhas in agregados.items()}
+
+
+def mediana(funcao, repeticoes):
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = funcao()
+        tempos.append(time.perf_counter() - inicio)
+    return statistics.median(tempos), resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rodadas', type=int, nargs='+', default=[38, 380, 1520])
+    parser.add_argument('--repeticoes', type=int, default=5)
+    parser.add_argument('--pasta', help='Onde criar os bancos temporários')
+    args = parser.parse_args()
+
+    pasta = tempfile.mkdtemp(prefix='bench_agregados_', dir=args.pasta)
+    resultados = []
+    try:
+        for num_rodadas in args.rodadas:
+            montar_banco(os.path.join(pasta, f"rodadas_{num_rodadas}.db"), num_rodadas, 5)
+            with cbf_scraper.usar_conexao() as conn:
+                tempo_python, em_python = mediana(lambda: calcular_em_python(conn), args.repeticoes)
+                tempo_numpy, em_numpy = mediana(lambda: cbf_scraper.calcular_agregados_por_time(conn), args.repeticoes)
+                tempo_gravacao, alteradas = mediana(lambda: cbf_scraper.atualizar_agregados_por_time(conn), args.repeticoes)
+                iguais = normalizar(em_python) == normalizar(em_numpy)
+            resultados.append((num_rodadas, len(em_numpy['estatisticas_time_rodada']), tempo_python, tempo_numpy, iguais,
+                               tempo_gravacao, sum(alteradas.values())))
+    finally:
+        shutil.rmtree(pasta, ignore_errors=True)
+
+    print(f"Mediana de {args.repeticoes} execuções")
+    print(f"{'Rodadas':>8}{'linhas time x jogo':>20}{'Python':>12}{'NumPy':>12}{'ganho':>8}{'iguais':>8}{'gravação sem mudanças':>24}")
+    for num_rodadas, linhas, python, numpy_, iguais, gravacao, alteradas in resultados:
+        print(f"{num_rodadas:>8}{linhas:>20}{python * 1000:>9.1f} ms{numpy_ * 1000:>9.1f} ms{python / numpy_:>7.1f}x{str(iguais):>8}"
+              f"{gravacao * 1000:>13.1f} ms ({alteradas} alt.)")
+
+
+if __name__ == '__main__':
+    main()
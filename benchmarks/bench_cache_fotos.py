@@ -0,0 +1,93 @@
+"""
+Benchmark: etapa de fotos com o cache do banco (obter_fotos_jogadores).
+
+Reproduz as páginas de elenco de uma gravação com uma latência fixa por página (ver
+bench_fotos_elencos.py) contra um banco novo e mede a etapa de fotos em execuções
+seguidas, cada uma com o seu "agora":
+- cache vazio: todos os elencos são buscados;
+- cache em dia: nenhum elenco é buscado;
+- jogador sem foto: a escalação traz um jogador que o elenco não tinha (só o time dele);
+- cache vencido: VALIDADE_FOTOS_ELENCO_DIAS depois, todos de novo.
+Confere que todas chegam ao mesmo mapa de fotos da busca sem cache.
+
+Uso:
+    python benchmarks/bench_cache_fotos.py [--gravacao execucao.zip] [--latencia 0.25] [--pasta DIR]
+"""
+import argparse
+import contextlib
+import io
+import os
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import cbf_scraper  # noqa: E402
+from bench_fotos_elencos import com_latencia  # noqa: E402
+from gravacao_sintetica import gerar_gravacao  # noqa: E402
+
+
+def escalacao_com_jogador_novo(nome_365):
+    """Escalação de um jogo com um titular do time `nome_365` que não está no elenco gravado."""
+    lado = {'chave_foto_prefixo': cbf_scraper.normalizar_nome_time_365(nome_365),
+            'titulares': [{'nome_normalizado': 'jogador recem contratado'}], 'reservas': [], 'fora_de_jogo': []}
+    return {1: {'id_jogo': 1, 'mandante': lado}}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--gravacao', help='Arquivo .zip gerado com cbf_scraper.py --gravar (padrão: sintética)')
+    parser.add_argument('--latencia', type=float, default=0.25, help='Espera simulada por página (s)')
+    parser.add_argument('--pasta', help='Onde criar o banco temporário')
+    args = parser.parse_args()
+
+    pasta = tempfile.mkdtemp(prefix='bench_cache_fotos_', dir=args.pasta)
+    get_original, get_com_latencia = com_latencia(args.latencia)
+    inicio = datetime(2025, 6, 1, 12, 0)
+    novo_time = next(iter(cbf_scraper.URLS_ELENCO_365))
+    cenarios = [
+        ('cache vazio', inicio, {}),
+        ('cache em dia', inicio + timedelta(hours=1), {}),
+        ('jogador sem foto', inicio + timedelta(hours=cbf_scraper.ESPERA_NOVA_BUSCA_ELENCO_HORAS + 1),
+         escalacao_com_jogador_novo(novo_time)),
+        ('cache vencido', inicio + timedelta(days=cbf_scraper.VALIDADE_FOTOS_ELENCO_DIAS, hours=2), {}),
+    ]
+    resultados = []
+    try:
+        arquivo_gravacao = args.gravacao
+        if not arquivo_gravacao:
+            arquivo_gravacao = os.path.join(pasta, 'gravacao_sintetica.zip')
+            with contextlib.redirect_stdout(io.StringIO()):
+                gerar_gravacao(arquivo_gravacao)
+        cbf_scraper.DB_FILE = os.path.join(pasta, 'fotos.db')
+        cbf_scraper.DriverFalso.get = get_com_latencia
+        with contextlib.redirect_stdout(io.StringIO()):
+            cbf_scraper.criar_banco_de_dados()
+        referencia = None
+        for nome, agora, escalacoes in cenarios:
+            with contextlib.redirect_stdout(io.StringIO()), \
+                    cbf_scraper.modo_gravacao_reproducao(arquivo_reproduzir=arquivo_gravacao), \
+                    cbf_scraper.navegador_compartilhado() as pool:
+                comeco = time.perf_counter()
+                fotos = cbf_scraper.obter_fotos_jogadores(escalacoes, agora)
+                tempo = time.perf_counter() - comeco
+                navegadores = pool.relatorio().get('fotos_365', {}).get('usos', 0)
+            referencia = fotos if referencia is None else referencia
+            resultados.append((nome, tempo, navegadores, len(fotos), fotos == referencia))
+    finally:
+        cbf_scraper.DriverFalso.get = get_original
+        shutil.rmtree(pasta, ignore_errors=True)
+
+    print(f"{len(cbf_scraper.URLS_ELENCO_365)} elencos, {args.latencia:.2f} s por página, "
+          f"até {cbf_scraper.NAVEGADORES_FOTOS} navegadores")
+    print(f"{'Cenário':<18}{'tempo':>10}{'navegadores':>13}{'fotos':>8}{'iguais':>8}")
+    for nome, tempo, navegadores, fotos, iguais in resultados:
+        print(f"{nome:<18}{tempo:>8.2f} s{navegadores:>13}{fotos:>8}{str(iguais):>8}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,189 @@
+"""
+Benchmark: consultas de leitura do app (bdkard/bdkards/lib/data/database/database_helper.dart).
+
+Monta um banco ampliado com os dados sintéticos de bench_escrita.py (várias
+temporadas) e reexecuta as MESMAS instruções SQL do app, medindo a latência
+(p50/p95) de cada uma em dois bancos:
+- sem índices: o mesmo banco sem os índices da migração 002 e sem ANALYZE;
+- com índices: todas as migrações + ANALYZE (o que o scraper publica hoje).
+
+Para cada consulta também mostra o plano (EXPLAIN QUERY PLAN) do banco indexado.
+Em seguida mede as telas lidas das tabelas de leitura (vw_*), com uma busca pela
+chave, ao lado da consulta do app que elas substituem. As últimas rodadas da
+última temporada ficam sem resultado, para haver jogos a disputar.
+
+Obs.: o app ainda consulta `escalacoes WHERE jogo_id = ?`, tabela substituída por
+`partidas_elenco`; o benchmark mede a consulta equivalente nesta última.
+
+Uso:
+    python benchmarks/bench_consultas.py [--temporadas 10] [--repeticoes 200] [--pasta DIR]
+"""
+import argparse
+import contextlib
+import io
+import os
+import shutil
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import cbf_scraper  # noqa: E402
+from bench_escrita import gerar_dados_sinteticos  # noqa: E402
+
+# (nome, SQL exatamente como no database_helper.dart; db.query(...) traduzido para o SQL que o sqflite gera)
+CONSULTAS_DO_APP = [
+    ('getRodadaAtual', "SELECT MAX(rodada) as rodada_atual FROM jogos_finalizados"),
+    ('getAtletasComCartoes',
+     "SELECT a.*, t.nome as time_nome, t.url_escudo FROM atletas a JOIN times t ON a.time_id = t.id "
+     "WHERE a.cartoes_amarelos > 0 OR a.cartoes_vermelhos > 0 ORDER BY t.nome, a.apelido"),
+    ('getPartidasPorRodada', "SELECT * FROM partidas WHERE rodada = ? ORDER BY data"),
+    ('getAtletasComCartoesPorTime',
+     "SELECT a.*, t.nome as time_nome, t.url_escudo FROM atletas a JOIN times t ON a.time_id = t.id "
+     "WHERE (a.cartoes_amarelos > 0 OR a.cartoes_vermelhos > 0) AND t.nome = ? ORDER BY a.apelido"),
+    ('getPendurados',
+     "SELECT a.*, t.nome as time_nome, t.url_escudo FROM atletas a JOIN times t ON a.time_id = t.id "
+     "WHERE (t.nome = ? OR t.nome = ?) AND (a.cartoes_amarelos > 0 AND a.cartoes_amarelos % 3 = 2) "
+     "ORDER BY t.nome, a.apelido"),
+    ('getTimes', "SELECT * FROM times ORDER BY nome"),
+    ('getClassificacao',
+     "SELECT t.nome, t.url_escudo, e.posicao, e.pontos, e.ultimos_jogos FROM estatisticas_time e "
+     "JOIN times t ON e.time_id = t.id WHERE e.posicao IS NOT NULL ORDER BY e.posicao ASC"),
+    ('getEstatisticasConfronto',
+     "SELECT t.nome, e.* FROM estatisticas_time e JOIN times t ON e.time_id = t.id WHERE t.nome = ? OR t.nome = ?"),
+    ('getEscalacao (partidas_elenco)', "SELECT * FROM partidas_elenco WHERE jogo_id = ?"),
+    ('getPartida', "SELECT * FROM partidas WHERE id_jogo = ? LIMIT 1"),
+]
+
+# (nome, consulta do app que a tabela de leitura substitui, SQL na tabela de leitura)
+CONSULTAS_TABELAS_DE_LEITURA = [
+    ('vw_classificacao', 'getClassificacao',
+     "SELECT nome, url_escudo, posicao, pontos, ultimos_jogos FROM vw_classificacao ORDER BY posicao"),
+    ('vw_pendurados_por_jogo', 'getPendurados', "SELECT * FROM vw_pendurados_por_jogo WHERE jogo_id = ?"),
+    ('vw_pre_jogo', 'getEstatisticasConfronto', "SELECT * FROM vw_pre_jogo WHERE jogo_id = ?"),
+]
+RODADAS_A_DISPUTAR = 5
+
+
+def montar_bancos(pasta, dados):
+    """Grava os dados num banco novo e faz uma cópia sem os índices de leitura. Retorna (sem, com)."""
+    com_indices = os.path.join(pasta, 'com_indices.db')
+    sem_indices = os.path.join(pasta, 'sem_indices.db')
+    cbf_scraper.DB_FILE = com_indices
+    with contextlib.redirect_stdout(io.StringIO()):
+        cbf_scraper.criar_banco_de_dados()
+        cbf_scraper.salvar_dados_no_banco(*dados)
+    shutil.copyfile(com_indices, sem_indices)
+    conn = sqlite3.connect(sem_indices)
+    for (indice,) in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index' AND name LIKE 'idx_%'").fetchall():
+        conn.execute(f"DROP INDEX {indice}")
+    conn.execute("DROP TABLE IF EXISTS sqlite_stat1")
+    conn.commit()
+    conn.close()
+    return sem_indices, com_indices
+
+
+def separar_rodadas_a_disputar(dados):
+    """Tira dos jogos finalizados as últimas RODADAS_A_DISPUTAR rodadas da última temporada."""
+    dados = list(dados)
+    ultimos_jogos = {jogo['id_jogo'] for jogo in dados[3][-10 * RODADAS_A_DISPUTAR:]}
+    dados[2] = [jogo for jogo in dados[2] if jogo['id_jogo'] not in ultimos_jogos]
+    return dados
+
+
+def parametros_por_consulta(conn):
+    """Sorteia parâmetros reais do banco (em rodízio) para as consultas com '?'."""
+    nomes = [linha[0] for linha in conn.execute("SELECT nome FROM times ORDER BY id")]
+    rodadas = [linha[0] for linha in conn.execute("SELECT DISTINCT rodada FROM partidas ORDER BY rodada")]
+    jogos = [linha[0] for linha in conn.execute("SELECT id_jogo FROM partidas ORDER BY id_jogo")]
+    a_disputar = [linha[0] for linha in conn.execute(
+        "SELECT id_jogo FROM partidas WHERE id_jogo NOT IN (SELECT id_jogo FROM jogos_finalizados) ORDER BY id_jogo")]
+    pares = list(zip(nomes, reversed(nomes)))
+    return {
+        'getPartidasPorRodada': [(r,) for r in rodadas],
+        'getAtletasComCartoesPorTime': [(n,) for n in nomes],
+        'getPendurados': pares,
+        'getEstatisticasConfronto': pares,
+        'getEscalacao (partidas_elenco)': [(j,) for j in jogos[::7]],
+        'getPartida': [(j,) for j in jogos[::7]],
+        'vw_pendurados_por_jogo': [(j,) for j in a_disputar],
+        'vw_pre_jogo': [(j,) for j in a_disputar],
+    }
+
+
+def medir_consultas(caminho, consultas, repeticoes):
+    """Retorna {consulta: (p50_ms, p95_ms)} executando cada SQL `repeticoes` vezes."""
+    conn = sqlite3.connect(caminho)
+    parametros = parametros_por_consulta(conn)
+    resultados = {}
+    for nome, sql in consultas:
+        opcoes = parametros.get(nome, [()])
+        conn.execute(sql, opcoes[0]).fetchall()  # aquece o cache de páginas
+        tempos = []
+        for i in range(repeticoes):
+            inicio = time.perf_counter()
+            conn.execute(sql, opcoes[i % len(opcoes)]).fetchall()
+            tempos.append((time.perf_counter() - inicio) * 1000)
+        tempos.sort()
+        resultados[nome] = (statistics.median(tempos), tempos[min(len(tempos) - 1, int(len(tempos) * 0.95))])
+    conn.close()
+    return resultados
+
+
+def planos(caminho):
+    """EXPLAIN QUERY PLAN de cada consulta, em uma linha."""
+    conn = sqlite3.connect(caminho)
+    parametros = parametros_por_consulta(conn)
+    saida = {}
+    for nome, sql in CONSULTAS_DO_APP:
+        linhas = conn.execute("EXPLAIN QUERY PLAN " + sql, parametros.get(nome, [()])[0]).fetchall()
+        saida[nome] = ' | '.join(linha[-1] for linha in linhas)
+    conn.close()
+    return saida
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--temporadas', type=int, default=10)
+    parser.add_argument('--repeticoes', type=int, default=200)
+    parser.add_argument('--pasta', help='Onde criar os bancos temporários')
+    args = parser.parse_args()
+
+    dados = separar_rodadas_a_disputar(gerar_dados_sinteticos(args.temporadas))
+    pasta = tempfile.mkdtemp(prefix='bench_consultas_', dir=args.pasta)
+    try:
+        sem_indices, com_indices = montar_bancos(pasta, dados)
+
+        conn = sqlite3.connect(com_indices)
+        contagens = {t: conn.execute(f"SELECT COUNT(*) FROM {t}").fetchone()[0]
+                     for t in ('times', 'atletas', 'partidas', 'partidas_elenco', 'vw_pendurados_por_jogo', 'vw_pre_jogo')}
+        conn.close()
+
+        antes = medir_consultas(sem_indices, CONSULTAS_DO_APP, args.repeticoes)
+        depois = medir_consultas(com_indices, CONSULTAS_DO_APP, args.repeticoes)
+        leitura = medir_consultas(com_indices, [(nome, sql) for nome, _, sql in CONSULTAS_TABELAS_DE_LEITURA], args.repeticoes)
+        plano = planos(com_indices)
+    finally:
+        shutil.rmtree(pasta, ignore_errors=True)
+
+    print(f"Temporadas: {args.temporadas} | {', '.join(f'{t}: {n}' for t, n in contagens.items())} "
+          f"| {args.repeticoes} execuções por consulta")
+    print(f"{'Consulta':<32}{'sem índices p50/p95 (ms)':>26}{'com índices p50/p95 (ms)':>26}{'ganho p50':>11}")
+    for nome, _ in CONSULTAS_DO_APP:
+        (a50, a95), (d50, d95) = antes[nome], depois[nome]
+        print(f"{nome:<32}{a50:>13.3f} /{a95:>10.3f}{d50:>15.3f} /{d95:>10.3f}{a50 / d50:>10.1f}x")
+    print("\nPlanos com índices:")
+    for nome, _ in CONSULTAS_DO_APP:
+        print(f"  {nome:<32}{plano[nome]}")
+    print(f"\n{'Tabela de leitura':<32}{'consulta do app p50 (ms)':>26}{'tabela p50/p95 (ms)':>26}{'ganho p50':>11}")
+    for nome, consulta_app, _ in CONSULTAS_TABELAS_DE_LEITURA:
+        (l50, l95), app50 = leitura[nome], depois[consulta_app][0]
+        print(f"{nome:<32}{app50:>13.3f} ({consulta_app[:10]}){l50:>13.3f} /{l95:>10.3f}{app50 / l50:>10.1f}x")
+
+
+if __name__ == '__main__':
+    main()
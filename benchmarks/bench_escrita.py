@@ -0,0 +1,203 @@
+"""
+Benchmark: gravação no SQLite (linha a linha antiga x gravação em lote).
+
+Gera um conjunto sintético de várias temporadas (times, elenco, atletas,
+partidas, jogos finalizados e escalações) e mede o tempo de gravação:
+- antes: um cursor.execute por linha, com o journal padrão (DELETE) e o SQL da
+  gravação antiga (INSERT OR REPLACE/IGNORE), congelado em SQL_GRAVACAO_ANTIGO;
+- depois: gravar_linhas_em_lote (executemany por tabela, uma transação, PRAGMAs),
+  entre abrir_conexao_escrita e fechar_conexao_escrita.
+Só a gravação é medida: as linhas são montadas antes (montar_linhas_para_o_banco) e
+as etapas que salvar_dados_no_banco faz depois dela (tabelas de leitura, agregados,
+ANALYZE) ficam de fora. Cada medição parte de um banco novo criado por criar_banco_de_dados.
+
+Também mede a REGRAVAÇÃO do mesmo conjunto (cenário das execuções agendadas,
+em que quase nada muda): INSERT OR REPLACE x upsert que pula linhas iguais,
+em tempo, linhas alteradas e páginas gravadas no banco.
+
+Uso:
+    python benchmarks/bench_escrita.py [--temporadas 5] [--repeticoes 3] [--pasta DIR]
+"""
+import argparse
+import contextlib
+import io
+import os
+import random
+import shutil
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import cbf_scraper  # noqa: E402
+
+TIMES_POR_TEMPORADA = 20
+JOGADORES_POR_TIME = 30
+RODADAS = 38
+
+# SQL da gravação linha a linha, como era antes da gravação em lote (as tuplas de
+# montar_linhas_para_o_banco continuam na mesma ordem de colunas)
+SQL_GRAVACAO_ANTIGO = {
+    'times': 'INSERT OR REPLACE INTO times (id, nome, url_escudo, nome_curto) VALUES (?, ?, ?, ?)',
+    'elenco': 'INSERT OR IGNORE INTO elenco (id_jogador, id_time, nome_jogador, numero, posicao, url_foto) VALUES (?, ?, ?, ?, ?, ?)',
+    'atletas': 'INSERT OR REPLACE INTO atletas (id, apelido, cartoes_amarelos, cartoes_vermelhos, rodada_ultimo_vermelho, '
+               'rodada_suspensao_amarelo, time_id) VALUES (?, ?, ?, ?, ?, ?, ?)',
+    'estatisticas_time': 'INSERT OR REPLACE INTO estatisticas_time (time_id, posicao, pontos, ultimos_jogos, media_cartoes_amarelos, '
+                         'total_cartoes_vermelhos, media_escanteios) VALUES (?, ?, ?, ?, ?, ?, ?)',
+    'partidas': 'INSERT OR REPLACE INTO partidas (id_jogo, rodada, data, hora, local, mandante_id, mandante_url_escudo, mandante_gols, '
+                'mandante_formacao, visitante_id, visitante_url_escudo, visitante_gols, visitante_formacao) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+    'jogos_finalizados': 'INSERT OR REPLACE INTO jogos_finalizados (id_jogo, rodada) VALUES (?, ?)',
+    'partidas_elenco': 'INSERT INTO partidas_elenco (jogo_id, id_time, id_jogador, papel, pos_x, pos_y, motivo) VALUES (?, ?, ?, ?, ?, ?, ?)',
+}
+
+
+def gerar_dados_sinteticos(temporadas, semente=2025):
+    """Monta as estruturas de entrada de salvar_dados_no_banco para N temporadas de 380 jogos."""
+    rnd = random.Random(semente)
+    times_info, estatisticas_times, estatisticas_jogadores = {}, {}, {}
+    lista_final_elenco, todas_as_partidas_info, jogos_finalizados_info = [], [], []
+    todas_as_escalacoes = {}
+    elenco_por_time = {}
+
+    for temporada in range(temporadas):
+        ids_times = [temporada * 1000 + t for t in range(1, TIMES_POR_TEMPORADA + 1)]
+        for time_id in ids_times:
+            nome = f"Time {time_id}"
+            times_info[time_id] = {'nome': nome, 'url_escudo': f"https://exemplo/escudo/{time_id}.png", 'nome_curto': nome[:10]}
+            estatisticas_times[time_id] = {'posicao': rnd.randint(1, 20), 'pontos': rnd.randint(0, 90), 'ultimos_jogos': 'VVEDV',
+                                           'media_amarelos': rnd.random() * 3, 'total_vermelhos': rnd.randint(0, 8),
+                                           'media_escanteios': rnd.random() * 8}
+            elenco_por_time[time_id] = []
+            for n in range(JOGADORES_POR_TIME):
+                id_jogador = len(lista_final_elenco) + 1
+                nome_jogador = f"Jogador {time_id}-{n}"
+                lista_final_elenco.append({'id_jogador': id_jogador, 'id_time': time_id, 'nome_jogador': nome_jogador,
+                                           'numero': str(n + 1), 'posicao': 'MEIA', 'url_foto': f"https://exemplo/foto/{id_jogador}.png"})
+                elenco_por_time[time_id].append(nome_jogador)
+                estatisticas_jogadores[time_id * 100 + n] = {'nome': nome_jogador, 'amarelos': rnd.randint(0, 9), 'vermelhos': rnd.randint(0, 2),
+                                                             'rodada_ultimo_vermelho': rnd.randint(0, 38), 'rodada_suspensao_amarelo': 0,
+                                                             'time_id': time_id}
+
+        for rodada in range(1, RODADAS + 1):
+            embaralhados = rnd.sample(ids_times, len(ids_times))
+            for j in range(0, len(embaralhados), 2):
+                mandante, visitante = embaralhados[j], embaralhados[j + 1]
+                id_jogo = temporada * 100000 + rodada * 100 + j // 2
+                todas_as_partidas_info.append({'id_jogo': id_jogo, 'rodada': rodada, 'data': '01/01/2025', 'hora': '16:00',
+                                               'mandante_id': mandante, 'mandante_url_escudo': '', 'mandante_gols': '1',
+                                               'visitante_id': visitante, 'visitante_url_escudo': '', 'visitante_gols': '0'})
+                jogos_finalizados_info.append({'id_jogo': id_jogo, 'rodada': rodada})
+                escalacao = {}
+                for lado, time_id in (('mandante', mandante), ('visitante', visitante)):
+                    nomes = rnd.sample(elenco_por_time[time_id], 26)
+                    escalacao[lado] = {
+                        'nome_cbf_original': times_info[time_id]['nome'],
+                        'titulares': [{'nome': nome, 'pos_x': rnd.random(), 'pos_y': rnd.random()} for nome in nomes[:11]],
+                        'reservas': [{'nome': nome} for nome in nomes[11:23]],
+                        'fora_de_jogo': [{'nome': nome, 'motivo': 'Lesão'} for nome in nomes[23:]],
+                    }
+                todas_as_escalacoes[id_jogo] = escalacao
+
+    return (estatisticas_jogadores, times_info, jogos_finalizados_info, todas_as_partidas_info,
+            estatisticas_times, todas_as_escalacoes, lista_final_elenco)
+
+
+def gravar_linha_a_linha(linhas_por_tabela):
+    """Reproduz a gravação antiga: um cursor.execute por linha, journal padrão, commit no final."""
+    conn = sqlite3.connect(cbf_scraper.DB_FILE)
+    cursor = conn.cursor()
+    for tabela, sql in SQL_GRAVACAO_ANTIGO.items():
+        for linha in linhas_por_tabela[tabela]:
+            cursor.execute(sql, linha)
+    conn.commit()
+    conn.close()
+
+
+def gravar_em_lote(linhas_por_tabela):
+    """A gravação atual: conexão com os PRAGMAs de escrita, executemany por tabela em uma transação."""
+    conn = cbf_scraper.abrir_conexao_escrita()
+    cbf_scraper.gravar_linhas_em_lote(conn, linhas_por_tabela)
+    cbf_scraper.fechar_conexao_escrita(conn)
+
+
+def sql_insert_or_replace(tabela):
+    """SQL antigo (INSERT OR REPLACE) com as mesmas colunas do upsert atual."""
+    chave, colunas = cbf_scraper.CHAVES_E_COLUNAS_POR_TABELA[tabela]
+    todas = chave + colunas
+    return f"INSERT OR REPLACE INTO {tabela} ({', '.join(todas)}) VALUES ({', '.join('?' * len(todas))})"
+
+
+def regravar(dados, pasta, usar_upsert):
+    """Grava os dados, altera o placar de uma rodada e regrava tudo. Retorna (tempo, linhas alteradas, páginas)."""
+    cbf_scraper.DB_FILE = os.path.join(pasta, f"regravacao_{'upsert' if usar_upsert else 'replace'}", 'brasileirao.db')
+    with contextlib.redirect_stdout(io.StringIO()):
+        cbf_scraper.criar_banco_de_dados()
+        cbf_scraper.salvar_dados_no_banco(*dados)
+
+    linhas = cbf_scraper.montar_linhas_para_o_banco(*dados)
+    linhas['partidas'] = [linha[:7] + ('2',) + linha[8:] if linha[1] == RODADAS else linha for linha in linhas['partidas']]
+
+    conn = cbf_scraper.abrir_conexao_escrita()
+    inicio = time.perf_counter()
+    if usar_upsert:
+        alteradas = sum(cbf_scraper.gravar_linhas_em_lote(conn, linhas).values())
+    else:
+        antes = conn.total_changes
+        conn.execute("BEGIN")
+        for tabela in cbf_scraper.CHAVES_E_COLUNAS_POR_TABELA:
+            conn.executemany(sql_insert_or_replace(tabela), linhas[tabela])
+        conn.execute("COMMIT")
+        alteradas = conn.total_changes - antes
+    tempo = time.perf_counter() - inicio
+    paginas = cbf_scraper.fechar_conexao_escrita(conn)
+    return tempo, alteradas, paginas
+
+
+def medir(funcao, linhas, pasta, repeticoes):
+    tempos = []
+    for i in range(repeticoes):
+        cbf_scraper.DB_FILE = os.path.join(pasta, f"{funcao.__name__}_{i}", 'brasileirao.db')
+        with contextlib.redirect_stdout(io.StringIO()):
+            cbf_scraper.criar_banco_de_dados()
+            inicio = time.perf_counter()
+            funcao(linhas)
+            tempos.append(time.perf_counter() - inicio)
+    return statistics.median(tempos)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--temporadas', type=int, default=5)
+    parser.add_argument('--repeticoes', type=int, default=3)
+    parser.add_argument('--pasta', help='Onde criar os bancos temporários (use um disco real, não tmpfs)')
+    args = parser.parse_args()
+
+    dados = gerar_dados_sinteticos(args.temporadas)
+    linhas = cbf_scraper.montar_linhas_para_o_banco(*dados)
+    total_linhas = sum(len(v) for v in linhas.values())
+
+    pasta = tempfile.mkdtemp(prefix='bench_escrita_', dir=args.pasta)
+    try:
+        tempo_antigo = medir(gravar_linha_a_linha, linhas, pasta, args.repeticoes)
+        tempo_novo = medir(gravar_em_lote, linhas, pasta, args.repeticoes)
+        regravacao_replace = regravar(dados, pasta, usar_upsert=False)
+        regravacao_upsert = regravar(dados, pasta, usar_upsert=True)
+    finally:
+        shutil.rmtree(pasta, ignore_errors=True)
+
+    print(f"Temporadas: {args.temporadas} | linhas gravadas: {total_linhas} "
+          f"({', '.join(f'{t}: {len(v)}' for t, v in linhas.items() if v)})")
+    print(f"Linha a linha (antigo) : {tempo_antigo:7.2f}s")
+    print(f"Em lote (atual)        : {tempo_novo:7.2f}s")
+    print(f"Ganho                  : {tempo_antigo / tempo_novo:7.1f}x")
+    print(f"\nRegravação com 1 rodada alterada ({len(linhas['partidas']) // (RODADAS * args.temporadas)} placares mudados por temporada na última rodada):")
+    for nome, (tempo, alteradas, paginas) in (('INSERT OR REPLACE', regravacao_replace), ('Upsert (atual)', regravacao_upsert)):
+        print(f"{nome:<23}: {tempo:7.2f}s | linhas alteradas: {alteradas:7d} | páginas gravadas: {paginas:6d}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,129 @@
+"""
+Benchmark: versionar o banco no git como .db binário x exportação NDJSON.
+
+Simula uma sequência de coletas sobre os dados sintéticos de bench_escrita.py
+(a cada coleta, os placares de uma rodada mudam) e, depois de cada uma, faz
+commit em dois repositórios git temporários:
+- binário: o brasileirao.db inteiro (o que o workflow fazia);
+- texto: a pasta gerada por exportar_banco_para_texto.
+
+Compara o tamanho dos repositórios (depois de `git gc`) após a carga inicial e
+ao final, isto é, quanto cada coleta faz o repositório crescer. Também
+mede o tempo da exportação e da reconstrução com importar_banco_de_texto
+(conferindo que o banco reconstruído tem as mesmas linhas).
+
+Uso:
+    python benchmarks/bench_exportacao.py [--temporadas 2] [--coletas 10] [--pasta DIR]
+"""
+import argparse
+import contextlib
+import io
+import os
+import shutil
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import cbf_scraper  # noqa: E402
+from bench_escrita import RODADAS, gerar_dados_sinteticos  # noqa: E402
+
+
+def git(repositorio, *argumentos):
+    return subprocess.run(['git', '-C', repositorio, *argumentos], check=True, capture_output=True, text=True).stdout
+
+
+def criar_repositorio(caminho):
+    os.makedirs(caminho)
+    git(caminho, 'init', '-q')
+    git(caminho, 'config', 'user.email', 'bench@exemplo')
+    git(caminho, 'config', 'user.name', 'bench')
+
+
+def commitar(repositorio, mensagem):
+    git(repositorio, 'add', '-A')
+    git(repositorio, 'commit', '-q', '--allow-empty', '-m', mensagem)
+
+
+def tamanho_repositorio(repositorio):
+    """Tamanho (bytes) do diretório .git depois de um git gc (empacotado com deltas, como num clone)."""
+    git(repositorio, 'gc', '-q', '--prune=now')
+    pasta_git = os.path.join(repositorio, '.git')
+    return sum(os.path.getsize(os.path.join(raiz, nome)) for raiz, _, nomes in os.walk(pasta_git) for nome in nomes)
+
+
+def linhas_por_tabela(caminho):
+    conn = sqlite3.connect(caminho)
+    tabelas = [t for (t,) in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%'")]
+    contagens = {t: conn.execute(f"SELECT COUNT(*) FROM {t}").fetchone()[0] for t in tabelas}
+    conn.close()
+    return contagens
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--temporadas', type=int, default=2)
+    parser.add_argument('--coletas', type=int, default=10)
+    parser.add_argument('--pasta', help='Onde criar os arquivos temporários')
+    args = parser.parse_args()
+
+    dados = gerar_dados_sinteticos(args.temporadas)
+    pasta = tempfile.mkdtemp(prefix='bench_exportacao_', dir=args.pasta)
+    try:
+        repo_binario = os.path.join(pasta, 'repo_binario')
+        repo_texto = os.path.join(pasta, 'repo_texto')
+        criar_repositorio(repo_binario)
+        criar_repositorio(repo_texto)
+        cbf_scraper.DB_FILE = os.path.join(pasta, 'banco', 'brasileirao.db')
+        pasta_texto = os.path.join(repo_texto, 'dados')
+
+        tempos_exportacao = []
+        with contextlib.redirect_stdout(io.StringIO()):
+            cbf_scraper.criar_banco_de_dados()
+        for coleta in range(args.coletas + 1):
+            # Coleta 0: carga inicial. Depois, a rodada `coleta` tem os placares alterados.
+            rodada_alterada = (coleta - 1) % RODADAS + 1
+            for jogo in dados[3]:
+                if coleta and jogo['rodada'] == rodada_alterada:
+                    jogo['mandante_gols'] = str(coleta % 5)
+            with contextlib.redirect_stdout(io.StringIO()):
+                cbf_scraper.salvar_dados_no_banco(*dados)
+                inicio = time.perf_counter()
+                cbf_scraper.exportar_banco_para_texto(pasta_texto)
+                tempos_exportacao.append(time.perf_counter() - inicio)
+            shutil.copyfile(cbf_scraper.DB_FILE, os.path.join(repo_binario, 'brasileirao.db'))
+            commitar(repo_binario, f'coleta {coleta}')
+            commitar(repo_texto, f'coleta {coleta}')
+            if coleta == 0:
+                iniciais = tamanho_repositorio(repo_binario), tamanho_repositorio(repo_texto)
+
+        destino = os.path.join(pasta, 'reconstruido', 'brasileirao.db')
+        os.makedirs(os.path.dirname(destino))
+        inicio = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            total_importado = cbf_scraper.importar_banco_de_texto(pasta_texto, destino)
+        tempo_importacao = time.perf_counter() - inicio
+        iguais = linhas_por_tabela(destino) == linhas_por_tabela(cbf_scraper.DB_FILE)
+
+        tamanho_db = os.path.getsize(cbf_scraper.DB_FILE)
+        tamanho_binario = tamanho_repositorio(repo_binario)
+        tamanho_texto = tamanho_repositorio(repo_texto)
+    finally:
+        shutil.rmtree(pasta, ignore_errors=True)
+
+    print(f"Temporadas: {args.temporadas} | coletas: {args.coletas} (+ carga inicial) | banco: {tamanho_db / 1024:.0f} KiB")
+    print(f"Exportação NDJSON (mediana): {sorted(tempos_exportacao)[len(tempos_exportacao) // 2]:.2f}s")
+    print(f"Importação NDJSON          : {tempo_importacao:.2f}s ({total_importado} linhas, contagens iguais: {iguais})")
+    crescimento_binario = (tamanho_binario - iniciais[0]) / args.coletas
+    crescimento_texto = (tamanho_texto - iniciais[1]) / args.coletas
+    print(f"{'':27}{'carga inicial':>15}{'final':>12}{'por coleta':>13}")
+    print(f"Repositório com o .db      :{iniciais[0] / 1024:11.0f} KiB{tamanho_binario / 1024:8.0f} KiB{crescimento_binario / 1024:9.1f} KiB")
+    print(f"Repositório com o NDJSON   :{iniciais[1] / 1024:11.0f} KiB{tamanho_texto / 1024:8.0f} KiB{crescimento_texto / 1024:9.1f} KiB")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,126 @@
+"""
+Benchmark: processamento das rodadas da CBF acumulando tudo em memória x em fluxo.
+
+Monta um banco com N rodadas sintéticas (JSON no formato da API da CBF, gerado por
+gravacao_sintetica.py) já salvas em rodadas_cbf, como numa coleta incremental, e
+mede a etapa 1 do ciclo (ler, processar e gravar partidas/jogos finalizados):
+- antes: todos os JSON lidos do banco de uma vez, partidas e jogos finalizados de
+  todas as rodadas acumulados em listas e gravados no fim (como era até aqui);
+- fluxo: iterar_rodadas -> extrair_rodadas -> gravar_rodadas_em_fluxo, que também
+  monta o livro de cartões e ATLETAS (o caminho antigo só acumulava os atletas em
+  memória; ver bench_livro_cartoes.py para o custo dessa parte).
+
+Para cada N mostra o pico de memória do Python (tracemalloc; o cache de páginas do
+SQLite não entra), o tempo total e quanto tempo levou até a primeira linha ser
+enviada ao banco.
+
+Uso:
+    python benchmarks/bench_fluxo_rodadas.py [--rodadas 38 380 1520] [--pasta DIR]
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+import zlib
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import cbf_scraper  # noqa: E402
+from gravacao_sintetica import _rodada_cbf, _tabela_de_jogos, _times  # noqa: E402
+
+
+def montar_banco(caminho, num_rodadas):
+    """Banco novo com `num_rodadas` rodadas sintéticas (todas finalizadas) salvas em rodadas_cbf."""
+    rnd = random.Random(2025)
+    times = _times()
+    tabela = _tabela_de_jogos(len(times))
+    cbf_scraper.DB_FILE = caminho
+    with contextlib.redirect_stdout(io.StringIO()):
+        cbf_scraper.criar_banco_de_dados()
+        for inicio in range(1, num_rodadas + 1, 100):
+            cbf_scraper.salvar_rodadas_brutas(cbf_scraper.ID_COMPETICAO_CBF, {
+                rodada: _rodada_cbf(rodada, tabela[(rodada - 1) % len(tabela)], times, num_rodadas, rnd)
+                for rodada in range(inicio, min(inicio + 100, num_rodadas + 1))})
+
+
+def processar_acumulando(conn, num_rodadas):
+    """Reproduz o caminho antigo: tudo em memória, gravação no fim."""
+    linhas = conn.execute("SELECT rodada, payload FROM rodadas_cbf WHERE id_competicao = ?", (cbf_scraper.ID_COMPETICAO_CBF,))
+    dados_por_rodada = {rodada: json.loads(zlib.decompress(payload)) for rodada, payload in linhas}
+    times = {}
+    todas_as_partidas, jogos_finalizados = [], []
+    for rodada in range(1, num_rodadas + 1):
+        partidas, finalizados, _ = cbf_scraper.extrair_registros_da_rodada(dados_por_rodada[rodada], rodada, times)
+        todas_as_partidas += partidas
+        jogos_finalizados += finalizados
+    cbf_scraper.gravar_linhas_em_lote(conn, {
+        'partidas': [cbf_scraper.linha_partida(jogo) for jogo in todas_as_partidas],
+        'jogos_finalizados': [(jogo['id_jogo'], jogo['rodada']) for jogo in jogos_finalizados]})
+
+
+def processar_em_fluxo(conn, num_rodadas):
+    rodadas_salvas = cbf_scraper.ler_rodadas_salvas(cbf_scraper.ID_COMPETICAO_CBF)
+    rodadas = cbf_scraper.iterar_rodadas(cbf_scraper.ID_COMPETICAO_CBF, num_rodadas, rodadas_salvas, {})
+    cbf_scraper.gravar_rodadas_em_fluxo(conn, cbf_scraper.extrair_rodadas(rodadas, {}), cbf_scraper.ID_COMPETICAO_CBF)
+
+
+def medir(funcao, original, pasta, num_rodadas):
+    """Roda `funcao` numa cópia do banco. Retorna (pico de memória em bytes, tempo total, tempo até a 1ª gravação)."""
+    cbf_scraper.DB_FILE = os.path.join(pasta, f"{funcao.__name__}_{num_rodadas}.db")
+    shutil.copyfile(original, cbf_scraper.DB_FILE)
+    gravar_linhas_em_lote = cbf_scraper.gravar_linhas_em_lote
+    primeira_gravacao = []
+
+    def gravar_marcando(conn, linhas_por_tabela):
+        primeira_gravacao.append(primeira_gravacao[0] if primeira_gravacao else time.perf_counter())
+        return gravar_linhas_em_lote(conn, linhas_por_tabela)
+
+    cbf_scraper.gravar_linhas_em_lote = gravar_marcando
+    try:
+        with contextlib.redirect_stdout(io.StringIO()), cbf_scraper.conexao_da_execucao() as conn:
+            tracemalloc.start()
+            inicio = time.perf_counter()
+            with cbf_scraper.transacao(conn):
+                funcao(conn, num_rodadas)
+            tempo = time.perf_counter() - inicio
+            _, pico = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+    finally:
+        cbf_scraper.gravar_linhas_em_lote = gravar_linhas_em_lote
+    return pico, tempo, primeira_gravacao[0] - inicio
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rodadas', type=int, nargs='+', default=[38, 380, 1520])
+    parser.add_argument('--pasta', help='Onde criar os bancos temporários')
+    args = parser.parse_args()
+
+    pasta = tempfile.mkdtemp(prefix='bench_fluxo_rodadas_', dir=args.pasta)
+    resultados = []
+    try:
+        for num_rodadas in args.rodadas:
+            original = os.path.join(pasta, f"rodadas_{num_rodadas}.db")
+            montar_banco(original, num_rodadas)
+            resultados.append((num_rodadas, medir(processar_acumulando, original, pasta, num_rodadas),
+                               medir(processar_em_fluxo, original, pasta, num_rodadas)))
+    finally:
+        shutil.rmtree(pasta, ignore_errors=True)
+
+    print(f"{'Rodadas':>8}{'pico antes':>13}{'pico fluxo':>13}{'tempo antes':>13}{'tempo fluxo':>13}"
+          f"{'1ª gravação antes':>19}{'1ª gravação fluxo':>19}")
+    for num_rodadas, (pico_a, tempo_a, primeira_a), (pico_f, tempo_f, primeira_f) in resultados:
+        print(f"{num_rodadas:>8}{pico_a / 1024 ** 2:>10.1f} MiB{pico_f / 1024 ** 2:>9.1f} MiB{tempo_a:>12.2f}s{tempo_f:>12.2f}s"
+              f"{primeira_a * 1000:>16.0f} ms{primeira_f * 1000:>16.0f} ms")
+
+
+if __name__ == '__main__':
+    main()
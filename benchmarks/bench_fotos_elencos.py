@@ -0,0 +1,86 @@
+"""
+Benchmark: fotos dos elencos buscadas em 1 x N navegadores (buscar_fotos_jogadores).
+
+Reproduz as páginas de elenco de URLS_ELENCO_365 a partir de uma gravação (DriverFalso)
+com uma latência fixa por página, que faz o papel do carregamento do 365Scores (no
+modo reprodução o pausar(2) de cada time é ignorado). Para cada número de navegadores,
+mede o tempo de buscar_fotos_jogadores dentro de um navegador_compartilhado do mesmo
+tamanho e confere que o resultado é idêntico ao da busca com um navegador só.
+
+Uso:
+    python benchmarks/bench_fotos_elencos.py [--gravacao execucao.zip] [--navegadores 1 2 4 8]
+                                             [--latencia 0.25] [--repeticoes 3]
+"""
+import argparse
+import contextlib
+import io
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import cbf_scraper  # noqa: E402
+from gravacao_sintetica import gerar_gravacao  # noqa: E402
+
+
+def com_latencia(latencia):
+    """DriverFalso.get que espera `latencia` segundos, como o carregamento de uma página real."""
+    get_original = cbf_scraper.DriverFalso.get
+
+    def get(self, url):
+        time.sleep(latencia)
+        return get_original(self, url)
+    return get_original, get
+
+
+def medir(arquivo_gravacao, navegadores, repeticoes):
+    """Mediana (s) de buscar_fotos_jogadores com `navegadores` navegadores, e o último resultado."""
+    tempos = []
+    for _ in range(repeticoes):
+        with contextlib.redirect_stdout(io.StringIO()), \
+                cbf_scraper.modo_gravacao_reproducao(arquivo_reproduzir=arquivo_gravacao), \
+                cbf_scraper.navegador_compartilhado(navegadores):
+            inicio = time.perf_counter()
+            fotos = cbf_scraper.buscar_fotos_jogadores(navegadores=navegadores)
+            tempos.append(time.perf_counter() - inicio)
+    return statistics.median(tempos), fotos
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--gravacao', help='Arquivo .zip gerado com cbf_scraper.py --gravar (padrão: sintética)')
+    parser.add_argument('--navegadores', type=int, nargs='+', default=[1, 2, 4, 8])
+    parser.add_argument('--latencia', type=float, default=0.25, help='Espera simulada por página (s)')
+    parser.add_argument('--repeticoes', type=int, default=3)
+    args = parser.parse_args()
+
+    get_original, get_com_latencia = com_latencia(args.latencia)
+    resultados = []
+    with tempfile.TemporaryDirectory() as pasta_temporaria:
+        arquivo_gravacao = args.gravacao
+        if not arquivo_gravacao:
+            arquivo_gravacao = os.path.join(pasta_temporaria, 'gravacao_sintetica.zip')
+            with contextlib.redirect_stdout(io.StringIO()):
+                gerar_gravacao(arquivo_gravacao)
+        cbf_scraper.DriverFalso.get = get_com_latencia
+        try:
+            referencia = None
+            for navegadores in args.navegadores:
+                tempo, fotos = medir(arquivo_gravacao, navegadores, args.repeticoes)
+                referencia = fotos if referencia is None else referencia
+                resultados.append((navegadores, tempo, len(fotos), list(fotos.items()) == list(referencia.items())))
+        finally:
+            cbf_scraper.DriverFalso.get = get_original
+
+    print(f"{len(cbf_scraper.URLS_ELENCO_365)} elencos, {args.latencia:.2f} s por página (mediana de {args.repeticoes})")
+    print(f"{'Navegadores':>12}{'tempo':>10}{'ganho':>8}{'fotos':>8}{'iguais':>8}")
+    for navegadores, tempo, fotos, iguais in resultados:
+        print(f"{navegadores:>12}{tempo:>8.2f} s{resultados[0][1] / tempo:>7.1f}x{fotos:>8}{str(iguais):>8}")
+
+
+if __name__ == '__main__':
+    main()
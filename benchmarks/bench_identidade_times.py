@@ -0,0 +1,89 @@
+"""
+Benchmark: identidade dos times com o cache em TIMES (obter_identidade_times_365).
+
+Reproduz a classificação do 365Scores de uma gravação com uma latência fixa por
+página (ver bench_fotos_elencos.py; no modo reprodução o pausar(2) da página é
+ignorado, a latência faz o papel dele e do carregamento) contra um banco novo e
+mede a etapa de nomes e escudos em execuções seguidas, cada uma com o seu "agora":
+- cache vazio: a classificação é buscada (como em toda execução antes do cache);
+- cache em dia: nenhum navegador;
+- lista mudou: um time da CBF trocado por outro que o 365Scores não tem;
+- time ainda sem identidade: o mesmo time, dentro de ESPERA_NOVA_BUSCA_IDENTIDADE_HORAS;
+- cache vencido: VALIDADE_IDENTIDADE_TIMES_DIAS depois.
+Confere que todas chegam às mesmas identidades da busca sem cache.
+
+Uso:
+    python benchmarks/bench_identidade_times.py [--gravacao execucao.zip] [--latencia 2.5] [--pasta DIR]
+"""
+import argparse
+import contextlib
+import io
+import os
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import cbf_scraper  # noqa: E402
+from bench_fotos_elencos import com_latencia  # noqa: E402
+from gravacao_sintetica import _times, gerar_gravacao  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--gravacao', help='Arquivo .zip gerado com cbf_scraper.py --gravar (padrão: sintética)')
+    parser.add_argument('--latencia', type=float, default=2.5, help='Espera simulada pela página de classificação (s)')
+    parser.add_argument('--pasta', help='Onde criar o banco temporário')
+    args = parser.parse_args()
+
+    pasta = tempfile.mkdtemp(prefix='bench_identidade_times_', dir=args.pasta)
+    get_original, get_com_latencia = com_latencia(args.latencia)
+    times_cbf = {id_cbf: nome_cbf for id_cbf, nome_cbf, _, _ in _times()}
+    promovido = {**dict(list(times_cbf.items())[:-1]), 99999: 'Time Promovido Saf'}  # Um time rebaixado, outro promovido
+    inicio = datetime(2025, 6, 1, 12, 0)
+    cenarios = [
+        ('cache vazio', inicio, times_cbf),
+        ('cache em dia', inicio + timedelta(hours=1), times_cbf),
+        ('lista mudou', inicio + timedelta(hours=2), promovido),
+        ('time sem identidade', inicio + timedelta(hours=3), promovido),
+        ('cache vencido', inicio + timedelta(days=cbf_scraper.VALIDADE_IDENTIDADE_TIMES_DIAS, hours=3), promovido),
+    ]
+    resultados = []
+    try:
+        arquivo_gravacao = args.gravacao
+        if not arquivo_gravacao:
+            arquivo_gravacao = os.path.join(pasta, 'gravacao_sintetica.zip')
+            with contextlib.redirect_stdout(io.StringIO()):
+                gerar_gravacao(arquivo_gravacao)
+        cbf_scraper.DB_FILE = os.path.join(pasta, 'identidade.db')
+        cbf_scraper.DriverFalso.get = get_com_latencia
+        with contextlib.redirect_stdout(io.StringIO()):
+            cbf_scraper.criar_banco_de_dados()
+            with cbf_scraper.modo_gravacao_reproducao(arquivo_reproduzir=arquivo_gravacao):
+                referencia = cbf_scraper.buscar_identidade_times_365scores(cbf_scraper.MAPA_NOMES_365_PARA_CBF)
+        for nome, agora, times in cenarios:
+            with contextlib.redirect_stdout(io.StringIO()), \
+                    cbf_scraper.modo_gravacao_reproducao(arquivo_reproduzir=arquivo_gravacao), \
+                    cbf_scraper.navegador_compartilhado() as pool:
+                comeco = time.perf_counter()
+                identidades = cbf_scraper.obter_identidade_times_365(times, agora)
+                tempo = time.perf_counter() - comeco
+                navegadores = pool.relatorio().get('identidade_times_365', {}).get('usos', 0)
+            iguais = all(identidades.get(nome_cbf) == identidade for nome_cbf, identidade in referencia.items())
+            resultados.append((nome, tempo, navegadores, len(identidades), iguais))
+    finally:
+        cbf_scraper.DriverFalso.get = get_original
+        shutil.rmtree(pasta, ignore_errors=True)
+
+    print(f"{len(times_cbf)} times, {args.latencia:.2f} s pela página de classificação")
+    print(f"{'Cenário':<22}{'tempo':>10}{'navegadores':>13}{'times':>8}{'iguais':>8}")
+    for nome, tempo, navegadores, times, iguais in resultados:
+        print(f"{nome:<22}{tempo:>8.2f} s{navegadores:>13}{times:>8}{str(iguais):>8}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,141 @@
+"""
+Benchmark: imagens locais (atualizar_imagens_locais).
+
+Monta um banco com os 20 times e os elencos da gravação sintética, com url_escudo e
+url_foto apontando para um servidor local (servidor_local.py) que entrega PNGs de
+256 px com uma latência fixa; os jogadores além de JOGADORES_COM_FOTO têm todos a
+mesma silhueta, cada um na sua URL. Mede atualizar_imagens_locais em execuções
+seguidas sobre a mesma pasta de miniaturas:
+- pasta vazia: todas as URLs são baixadas;
+- tudo em dia: nenhuma URL é baixada;
+- fotos trocadas: N jogadores ganham URL e foto novas (só elas são baixadas);
+- miniaturas apagadas: a pasta some e as miniaturas são refeitas.
+Compara também o tamanho dos PNGs originais com o das miniaturas WebP gravadas.
+
+Uso:
+    python benchmarks/bench_imagens.py [--latencia 0.05] [--trocadas 10] [--pasta DIR]
+"""
+import argparse
+import contextlib
+import io
+import os
+import shutil
+import sys
+import tempfile
+import time
+from urllib.parse import urlsplit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import cbf_scraper  # noqa: E402
+from gravacao_sintetica import JOGADORES_COM_FOTO, _imagem_png, _times  # noqa: E402
+from servidor_local import ServidorLocal  # noqa: E402
+
+JOGADORES_POR_TIME = 25
+
+
+class ImagensFalsas:
+    """Responde /escudo/<id>.png e /atletas/<sigla>-<n>.png com um PNG por semente (a silhueta se n > JOGADORES_COM_FOTO)."""
+
+    def __init__(self):
+        self.silhueta = _imagem_png('silhueta')
+        self.conteudos = {}
+        self.bytes_servidos = 0
+
+    def conteudo(self, caminho):
+        if caminho not in self.conteudos:
+            nome = os.path.splitext(os.path.basename(caminho))[0]
+            n = nome.rsplit('-', 1)[-1]
+            com_foto = caminho.startswith('/escudo/') or not n.isdigit() or int(n) <= JOGADORES_COM_FOTO
+            self.conteudos[caminho] = _imagem_png(caminho) if com_foto else self.silhueta
+        return self.conteudos[caminho]
+
+    def __call__(self, caminho):
+        corpo = self.conteudo(urlsplit(caminho).path)
+        self.bytes_servidos += len(corpo)
+        return 200, 'image/png', corpo
+
+
+def montar_banco(caminho, url_base):
+    """Banco novo com os times (url_escudo) e JOGADORES_POR_TIME jogadores por time (url_foto)."""
+    cbf_scraper.DB_FILE = caminho
+    with contextlib.redirect_stdout(io.StringIO()):
+        cbf_scraper.criar_banco_de_dados()
+    with cbf_scraper.usar_conexao() as conn, cbf_scraper.transacao(conn):
+        for id_cbf, nome, _, _ in _times():
+            conn.execute("INSERT INTO times (id, nome, url_escudo, nome_curto) VALUES (?, ?, ?, ?)",
+                         (id_cbf, nome, f"{url_base}/escudo/{id_cbf}.png", nome[:3].upper()))
+            conn.executemany("INSERT INTO elenco (id_jogador, id_time, nome_jogador, numero, posicao, url_foto) "
+                             "VALUES (?, ?, ?, ?, ?, ?)",
+                             [(id_cbf * 100 + n, id_cbf, f"Jogador {n}", str(n), 'MEIA',
+                               f"{url_base}/atletas/{id_cbf}-{n}.png") for n in range(1, JOGADORES_POR_TIME + 1)])
+
+
+def trocar_fotos(conn, quantidade):
+    """Dá URL (e foto) nova aos `quantidade` primeiros jogadores com foto própria."""
+    jogadores = conn.execute("SELECT id_jogador, url_foto FROM elenco WHERE id_jogador % 100 <= ? "
+                             "ORDER BY id_jogador LIMIT ?", (JOGADORES_COM_FOTO, quantidade)).fetchall()
+    with cbf_scraper.transacao(conn):
+        conn.executemany("UPDATE elenco SET url_foto = ? WHERE id_jogador = ?",
+                         [(url.replace('.png', '-v2.png'), id_jogador) for id_jogador, url in jogadores])
+
+
+def tamanho_da_pasta(pasta):
+    arquivos = [os.path.join(pasta, nome) for nome in os.listdir(pasta)] if os.path.isdir(pasta) else []
+    return len(arquivos), sum(os.path.getsize(arquivo) for arquivo in arquivos)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--latencia', type=float, default=0.05, help='Latência artificial do servidor por imagem (s)')
+    parser.add_argument('--trocadas', type=int, default=10, help='Jogadores com foto nova no 3º cenário')
+    parser.add_argument('--pasta', help='Onde criar o banco e as miniaturas temporários')
+    args = parser.parse_args()
+
+    pasta = tempfile.mkdtemp(prefix='bench_imagens_', dir=args.pasta)
+    pasta_imagens = os.path.join(pasta, 'imagens')
+    imagens = ImagensFalsas()
+    cenarios = [
+        ('pasta vazia', None),
+        ('tudo em dia', None),
+        ('fotos trocadas', lambda conn: trocar_fotos(conn, args.trocadas)),
+        ('miniaturas apagadas', lambda conn: shutil.rmtree(pasta_imagens)),
+    ]
+    resultados = []
+    try:
+        cbf_scraper.LIMITE_REQUISICOES_POR_SEGUNDO = 1000.0  # Mede o pipeline, não o limite educado por host
+        with ServidorLocal(imagens, latencia=args.latencia) as servidor:
+            montar_banco(os.path.join(pasta, 'imagens.db'), servidor.url_base)
+            with cbf_scraper.usar_conexao() as conn:
+                for nome, preparar in cenarios:
+                    if preparar:
+                        preparar(conn)
+                    requisicoes, bytes_antes = servidor.total_requisicoes, imagens.bytes_servidos
+                    with contextlib.redirect_stdout(io.StringIO()):
+                        inicio = time.perf_counter()
+                        resumo = cbf_scraper.atualizar_imagens_locais(conn, pasta_imagens)
+                        tempo = time.perf_counter() - inicio
+                    resultados.append((nome, tempo, servidor.total_requisicoes - requisicoes,
+                                       imagens.bytes_servidos - bytes_antes, resumo))
+                sem_chave = conn.execute("SELECT (SELECT COUNT(*) FROM elenco WHERE chave_foto IS NULL) + "
+                                         "(SELECT COUNT(*) FROM times WHERE chave_escudo IS NULL)").fetchone()[0]
+                fotos, distintas = conn.execute("SELECT COUNT(*), COUNT(DISTINCT chave_foto) FROM elenco").fetchone()
+        arquivos, bytes_webp = tamanho_da_pasta(pasta_imagens)
+    finally:
+        shutil.rmtree(pasta, ignore_errors=True)
+
+    print(f"{resultados[0][4]['urls']} URLs ({fotos} fotos em {distintas} imagens distintas + 20 escudos), "
+          f"latência {args.latencia:.2f} s por imagem, {cbf_scraper.MAX_CONEXOES_HTTP} conexões")
+    print(f"{'Cenário':<22}{'tempo':>10}{'requisições':>13}{'KB baixados':>13}{'conteúdos novos':>17}"
+          f"{'miniaturas':>12}{'linhas alteradas':>18}")
+    for nome, tempo, requisicoes, baixados, resumo in resultados:
+        print(f"{nome:<22}{tempo:>8.2f} s{requisicoes:>13}{baixados / 1024:>13.0f}{resumo['conteudos_novos']:>17}"
+              f"{resumo['miniaturas']:>12}{resumo['alteradas']:>18}")
+    originais = sum(len(conteudo) for conteudo in {id(c): c for c in imagens.conteudos.values()}.values())
+    print(f"PNGs distintos servidos: {originais / 1024:.0f} KB | miniaturas WebP: {arquivos} arquivos, "
+          f"{bytes_webp / 1024:.0f} KB | linhas sem chave: {sem_chave}")
+
+
+if __name__ == '__main__':
+    main()
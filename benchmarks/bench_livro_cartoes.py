@@ -0,0 +1,123 @@
+"""
+Benchmark: totais de cartões dos atletas refeitos do zero x livro de cartões.
+
+Monta um banco com N rodadas sintéticas (gravacao_sintetica.py) já coletadas, com o
+livro de cartões (cartoes_eventos) e ATLETAS em dia, e mede a coleta da rodada
+seguinte, que chega com cartões novos:
+- do zero: todas as N + 1 rodadas relidas e reprocessadas, ATLETAS regravada (como
+  era até aqui, a contagem de cartões recomeçava a cada coleta);
+- livro: só os eventos da rodada nova entram no livro e são aplicados sobre a linha
+  atual dos atletas (registrar_eventos_de_cartoes + atualizar_atletas_pelos_eventos).
+Também mede reconstruir_atletas_pelo_livro (--reconstruir-cartoes) e confere que os
+três caminhos chegam aos mesmos ATLETAS.
+
+Uso:
+    python benchmarks/bench_livro_cartoes.py [--rodadas 38 380 1520] [--repeticoes 5] [--pasta DIR]
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import zlib
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import cbf_scraper  # noqa: E402
+from bench_fluxo_rodadas import montar_banco  # noqa: E402
+
+
+def ler_rodadas(conn):
+    linhas = conn.execute("SELECT rodada, payload FROM rodadas_cbf WHERE id_competicao = ? ORDER BY rodada",
+                          (cbf_scraper.ID_COMPETICAO_CBF,))
+    return [(rodada, json.loads(zlib.decompress(payload))) for rodada, payload in linhas]
+
+
+def do_zero(conn, rodadas, _):
+    """Caminho antigo: todos os cartões de todas as rodadas somados de novo e ATLETAS inteira regravada."""
+    atletas = {}
+    for rodada, dados in rodadas:
+        _, _, eventos = cbf_scraper.extrair_registros_da_rodada(dados, rodada, {})
+        for evento in eventos:
+            atleta = atletas.setdefault(evento[1], cbf_scraper.atleta_sem_cartoes(evento[5], evento[4]))
+            cbf_scraper.acumular_cartoes(atleta, [(evento[3], evento[6])])
+    cbf_scraper.gravar_linhas_em_lote(conn, {'atletas': [cbf_scraper.linha_atleta(i, a) for i, a in atletas.items()]})
+
+
+def registrar_rodada(conn, rodada_nova):
+    rodada, dados = rodada_nova
+    partidas, _, eventos = cbf_scraper.extrair_registros_da_rodada(dados, rodada, {})
+    return cbf_scraper.registrar_eventos_de_cartoes(conn, [jogo['id_jogo'] for jogo in partidas], eventos)
+
+
+def pelo_livro(conn, _, rodada_nova):
+    cbf_scraper.atualizar_atletas_pelos_eventos(conn, *registrar_rodada(conn, rodada_nova))
+
+
+def reconstruir(conn, _, rodada_nova):
+    """A rodada nova entra no livro e todos os atletas são refeitos a partir dele."""
+    registrar_rodada(conn, rodada_nova)
+    cbf_scraper.reconstruir_atletas_pelo_livro(conn)
+
+
+def medir(funcao, original, pasta, repeticoes):
+    """Roda `funcao` em cópias do banco original. Retorna (mediana do tempo, ATLETAS ao final)."""
+    tempos = []
+    for repeticao in range(repeticoes):
+        cbf_scraper.DB_FILE = os.path.join(pasta, f"{funcao.__name__}_{repeticao}.db")
+        shutil.copyfile(original, cbf_scraper.DB_FILE)
+        with contextlib.redirect_stdout(io.StringIO()), cbf_scraper.conexao_da_execucao() as conn:
+            rodadas = ler_rodadas(conn)
+            inicio = time.perf_counter()
+            with cbf_scraper.transacao(conn):
+                funcao(conn, rodadas, rodadas[-1])
+            tempos.append(time.perf_counter() - inicio)
+            atletas = sorted(conn.execute("SELECT * FROM atletas"))
+    return statistics.median(tempos), atletas
+
+
+def preparar(original, num_rodadas):
+    """Banco com N + 1 rodadas salvas, mas só as N primeiras coletadas (livro e ATLETAS em dia)."""
+    montar_banco(original, num_rodadas + 1)
+    with contextlib.redirect_stdout(io.StringIO()), cbf_scraper.conexao_da_execucao() as conn:
+        rodadas = ler_rodadas(conn)[:num_rodadas]
+        with cbf_scraper.transacao(conn):
+            cbf_scraper.gravar_rodadas_em_fluxo(conn, cbf_scraper.extrair_rodadas(iter(rodadas), {}), cbf_scraper.ID_COMPETICAO_CBF)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rodadas', type=int, nargs='+', default=[38, 380, 1520])
+    parser.add_argument('--repeticoes', type=int, default=5)
+    parser.add_argument('--pasta', help='Onde criar os bancos temporários')
+    args = parser.parse_args()
+
+    pasta = tempfile.mkdtemp(prefix='bench_livro_cartoes_', dir=args.pasta)
+    resultados = []
+    try:
+        for num_rodadas in args.rodadas:
+            original = os.path.join(pasta, f"rodadas_{num_rodadas}.db")
+            preparar(original, num_rodadas)
+            medidas = [medir(funcao, original, pasta, args.repeticoes) for funcao in (do_zero, pelo_livro, reconstruir)]
+            with cbf_scraper.usar_conexao() as conn:
+                eventos = conn.execute("SELECT COUNT(*) FROM cartoes_eventos").fetchone()[0]
+            iguais = medidas[0][1] == medidas[1][1] == medidas[2][1]
+            resultados.append((num_rodadas, eventos, [tempo for tempo, _ in medidas], iguais))
+    finally:
+        shutil.rmtree(pasta, ignore_errors=True)
+
+    print(f"Coleta da rodada N + 1 (mediana de {args.repeticoes})")
+    print(f"{'Rodadas N':>10}{'eventos no livro':>18}{'do zero':>12}{'livro':>12}{'ganho':>8}{'reconstruir':>14}{'iguais':>8}")
+    for num_rodadas, eventos, (zero, livro, refazer), iguais in resultados:
+        print(f"{num_rodadas:>10}{eventos:>18}{zero * 1000:>9.1f} ms{livro * 1000:>9.1f} ms{zero / livro:>7.1f}x"
+              f"{refazer * 1000:>11.1f} ms{str(iguais):>8}")
+
+
+if __name__ == '__main__':
+    main()
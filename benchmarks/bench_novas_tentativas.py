@@ -0,0 +1,140 @@
+"""
+Benchmark: busca das rodadas da CBF contra um servidor que limita a taxa (429)
+e tem falhas passageiras (503).
+
+Compara a política antiga (sleep fixo de 10s e UMA nova tentativa após 429;
+qualquer outra falha descarta a rodada) com a política atual do motor HTTP
+(Retry-After, backoff exponencial com jitter, taxa adaptativa por host,
+circuit breaker e orçamento global de novas tentativas).
+
+Uso:
+    python benchmarks/bench_novas_tentativas.py [--rodadas 38] [--limite 3]
+                                                [--falha-a-cada 5] [--latencia 0.05]
+"""
+import argparse
+import collections
+import math
+import os
+import re
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import formatdate
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import cbf_scraper  # noqa: E402
+from bench_rodadas_cbf import ID_COMPETICAO, responder as responder_rodada  # noqa: E402
+from servidor_local import ServidorLocal  # noqa: E402
+
+
+class CenarioInstavel:
+    """
+    Simula o servidor sob carga: acima de `limite` requisições por segundo
+    responde 429 com Retry-After, alternando as duas formas do cabeçalho (1 segundo
+    ou a data HTTP do próximo segundo cheio + 1), e a 1ª requisição de cada rodada
+    múltipla de `falha_a_cada` recebe um 503 passageiro.
+    """
+
+    def __init__(self, limite, falha_a_cada):
+        self.limite = limite
+        self.falha_a_cada = falha_a_cada
+        self._lock = threading.Lock()
+        self.reiniciar()
+
+    def reiniciar(self):
+        with self._lock:
+            self._recentes = collections.deque()
+            self._rodadas_vistas = set()
+            self.total_429 = 0
+            self.total_429_com_data = 0
+            self.total_503 = 0
+
+    def responder(self, caminho):
+        achado = re.search(r'/rodada/(\d+)/fase', caminho)
+        rodada = int(achado.group(1)) if achado else None
+        with self._lock:
+            agora = time.monotonic()
+            while self._recentes and agora - self._recentes[0] > 1.0:
+                self._recentes.popleft()
+            if len(self._recentes) >= self.limite:
+                self.total_429 += 1
+                if self.total_429 % 2:
+                    return 429, 'text/plain', b'muitas requisicoes', {'Retry-After': '1'}
+                self.total_429_com_data += 1
+                retry_after = formatdate(math.ceil(time.time()) + 1, usegmt=True)
+                return 429, 'text/plain', b'muitas requisicoes', {'Retry-After': retry_after}
+            self._recentes.append(agora)
+            if rodada and self.falha_a_cada and rodada % self.falha_a_cada == 0 and rodada not in self._rodadas_vistas:
+                self._rodadas_vistas.add(rodada)
+                self.total_503 += 1
+                return 503, 'text/plain', b'indisponivel'
+        return responder_rodada(caminho)
+
+
+def reiniciar_motor_http():
+    """Zera limitadores, circuit breakers e orçamento entre as medições."""
+    cbf_scraper._baldes_por_host.clear()
+    cbf_scraper._disjuntores_por_host.clear()
+    cbf_scraper._orcamento_novas_tentativas = None
+
+
+def politica_antiga(num_rodadas):
+    """Reproduz o comportamento anterior: sleep(10) + 1 nova tentativa só para 429."""
+    sessao = cbf_scraper.obter_sessao_http()
+
+    def _buscar(rodada):
+        url = cbf_scraper.montar_url_rodada_cbf(ID_COMPETICAO, rodada)
+        cbf_scraper.obter_balde_do_host(url).adquirir()
+        try:
+            response = sessao.get(url, timeout=cbf_scraper.TIMEOUT_REQUISICAO_HTTP)
+            if response.status_code == 429:
+                time.sleep(10)
+                cbf_scraper.obter_balde_do_host(url).adquirir()
+                response = sessao.get(url, timeout=cbf_scraper.TIMEOUT_REQUISICAO_HTTP)
+            response.raise_for_status()
+            return response.json()
+        except Exception:
+            return None
+
+    with ThreadPoolExecutor(max_workers=cbf_scraper.MAX_CONEXOES_HTTP) as executor:
+        return dict(zip(range(1, num_rodadas + 1), executor.map(_buscar, range(1, num_rodadas + 1))))
+
+
+def medir(nome, funcao, cenario, num_rodadas):
+    reiniciar_motor_http()
+    cenario.reiniciar()
+    inicio = time.perf_counter()
+    resultados = funcao(num_rodadas)
+    tempo = time.perf_counter() - inicio
+    perdidas = sorted(r for r, dados in resultados.items() if dados is None)
+    print(f"{nome:<16}: {tempo:7.2f}s | rodadas perdidas: {len(perdidas):2d} {perdidas if perdidas else ''}"
+          f" | 429 recebidos: {cenario.total_429} ({cenario.total_429_com_data} com data HTTP)"
+          f" | 503 recebidos: {cenario.total_503}")
+    return tempo, perdidas
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rodadas', type=int, default=38)
+    parser.add_argument('--limite', type=float, default=3, help='Requisições por segundo aceitas pelo servidor')
+    parser.add_argument('--falha-a-cada', type=int, default=5, help='Rodadas múltiplas deste número recebem um 503 passageiro')
+    parser.add_argument('--latencia', type=float, default=0.05, help='Latência artificial do servidor (s)')
+    args = parser.parse_args()
+
+    cenario = CenarioInstavel(args.limite, args.falha_a_cada)
+    with ServidorLocal(cenario.responder, latencia=args.latencia) as servidor:
+        cbf_scraper.URL_BASE_CBF = servidor.url_base
+        cbf_scraper.USAR_CACHE_HTTP = False  # Mede só o transporte, sem requisições condicionais
+
+        print(f"Rodadas: {args.rodadas} | servidor aceita {args.limite} req/s | cliente: "
+              f"{cbf_scraper.LIMITE_REQUISICOES_POR_SEGUNDO} req/s por host, {cbf_scraper.MAX_CONEXOES_HTTP} conexões")
+        medir('Política antiga', politica_antiga, cenario, args.rodadas)
+        medir('Política atual', lambda n: cbf_scraper.buscar_rodadas_concorrente(ID_COMPETICAO, range(1, n + 1)),
+              cenario, args.rodadas)
+
+
+if __name__ == '__main__':
+    main()
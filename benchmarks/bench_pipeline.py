@@ -0,0 +1,108 @@
+"""
+Benchmark: pipeline completo (main_run) reproduzido offline a partir de uma gravação.
+
+Roda o main_run em modo de reprodução (servidor HTTP local + driver falso) contra
+um banco temporário e mede o tempo de parede. Sem --gravacao, gera antes uma
+gravação sintética com benchmarks/gravacao_sintetica.py.
+
+Com --competicoes N, o main_run recebe N cópias da competição (cada uma com o
+seu banco), para ver como o tempo cresce com o número de competições; também é
+mostrado quantos navegadores foram abertos.
+
+Com --referencia, compara a mediana com o tempo salvo no JSON e termina com
+código 1 se ficar mais lenta que a tolerância (útil para pegar regressões).
+
+Uso:
+    python benchmarks/bench_pipeline.py [--gravacao execucao.zip] [--repeticoes 3] [--competicoes 1]
+                                        [--referencia ref.json] [--tolerancia 0.25]
+                                        [--salvar-referencia]
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import cbf_scraper  # noqa: E402
+from gravacao_sintetica import gerar_gravacao  # noqa: E402
+
+
+def executar_uma_vez(arquivo_gravacao, pasta_temporaria, indice, mostrar_log, num_competicoes=1):
+    """Roda o main_run em reprodução contra bancos novos. Retorna (tempo gasto em s, navegadores abertos)."""
+    base = cbf_scraper.competicao_atual()
+    competicoes = [dict(base, nome=f"{base['nome']} #{n + 1}",
+                        db_file=os.path.join(pasta_temporaria, f'execucao_{indice}', f'competicao_{n + 1}.db'))
+                   for n in range(num_competicoes)]
+    # Imagens locais também novas a cada execução, como os bancos
+    cbf_scraper.PASTA_IMAGENS = os.path.join(pasta_temporaria, f'execucao_{indice}', 'imagens')
+    iniciar_navegador = cbf_scraper._iniciar_navegador
+    navegadores = []
+    cbf_scraper._iniciar_navegador = lambda: navegadores.append(1) or iniciar_navegador()
+    saida = contextlib.nullcontext() if mostrar_log else contextlib.redirect_stdout(io.StringIO())
+    try:
+        inicio = time.perf_counter()
+        with saida, cbf_scraper.modo_gravacao_reproducao(arquivo_reproduzir=arquivo_gravacao):
+            cbf_scraper.main_run(competicoes)
+        return time.perf_counter() - inicio, len(navegadores)
+    finally:
+        cbf_scraper._iniciar_navegador = iniciar_navegador
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--gravacao', help='Arquivo .zip gerado com cbf_scraper.py --gravar (padrão: sintética)')
+    parser.add_argument('--repeticoes', type=int, default=3)
+    parser.add_argument('--competicoes', type=int, default=1, help='Quantas competições o main_run coleta juntas')
+    parser.add_argument('--referencia', help='JSON com o tempo de referência para comparar')
+    parser.add_argument('--tolerancia', type=float, default=0.25, help='Folga aceita sobre a referência (0.25 = 25%%)')
+    parser.add_argument('--salvar-referencia', action='store_true', help='Grava a mediana medida em --referencia')
+    parser.add_argument('--log', action='store_true', help='Mostra a saída do main_run')
+    args = parser.parse_args()
+
+    # Na reprodução o servidor é local: o limite por host só atrasaria a medição
+    cbf_scraper.LIMITE_REQUISICOES_POR_SEGUNDO = 1000.0
+
+    with tempfile.TemporaryDirectory() as pasta_temporaria:
+        arquivo_gravacao = args.gravacao
+        if not arquivo_gravacao:
+            arquivo_gravacao = os.path.join(pasta_temporaria, 'gravacao_sintetica.zip')
+            with contextlib.redirect_stdout(io.StringIO()):
+                gerar_gravacao(arquivo_gravacao)
+
+        tempos = []
+        for i in range(args.repeticoes):
+            tempo, navegadores = executar_uma_vez(arquivo_gravacao, pasta_temporaria, i, args.log, args.competicoes)
+            tempos.append(tempo)
+            print(f"Execução {i + 1}/{args.repeticoes}: {tempo:.2f}s ({args.competicoes} competições, {navegadores} navegadores abertos)")
+
+    mediana = statistics.median(tempos)
+    print(f"\nMediana: {mediana:.2f}s  (mín {min(tempos):.2f}s, máx {max(tempos):.2f}s)")
+
+    if not args.referencia:
+        return 0
+    if args.salvar_referencia:
+        with open(args.referencia, 'w', encoding='utf-8') as f:
+            json.dump({'mediana_s': round(mediana, 3), 'repeticoes': args.repeticoes}, f, indent=2)
+        print(f"💾 Referência salva em {args.referencia}")
+        return 0
+
+    with open(args.referencia, encoding='utf-8') as f:
+        referencia = json.load(f)['mediana_s']
+    limite = referencia * (1 + args.tolerancia)
+    print(f"Referência: {referencia:.2f}s  |  limite com tolerância: {limite:.2f}s")
+    if mediana > limite:
+        print("❌ Regressão de desempenho: o pipeline ficou mais lento que a referência.")
+        return 1
+    print("✅ Dentro da referência.")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
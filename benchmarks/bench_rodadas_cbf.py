@@ -0,0 +1,97 @@
+"""
+Benchmark: busca das rodadas da API da CBF (loop sequencial antigo x motor concorrente).
+
+Sobe um servidor local que imita o endpoint
+/api/proxy?path=/jogos/campeonato/{id}/rodada/{i}/fase com latência artificial
+e mede as duas estratégias contra ele.
+
+Uso:
+    python benchmarks/bench_rodadas_cbf.py [--rodadas 38] [--latencia 0.3] [--pausa 1.0]
+"""
+import argparse
+import json
+import os
+import re
+import sys
+import time
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import cbf_scraper  # noqa: E402
+from servidor_local import ServidorLocal  # noqa: E402
+
+ID_COMPETICAO = 12606
+
+
+def gerar_rodada_sintetica(rodada):
+    """Monta um JSON no formato da API da CBF com 10 jogos e alguns cartões."""
+    jogos = []
+    for j in range(10):
+        mandante_id, visitante_id = 100 + 2 * j, 101 + 2 * j
+        jogos.append({
+            'id_jogo': rodada * 1000 + j,
+            'data': '01/01/2025', 'hora': '16:00', 'local': 'Estádio',
+            'mandante': {'id': mandante_id, 'nome': f'Time {mandante_id}', 'url_escudo': '', 'gols': '1'},
+            'visitante': {'id': visitante_id, 'nome': f'Time {visitante_id}', 'url_escudo': '', 'gols': '0'},
+            'documentos': [{'url': 'sumula.pdf'}],
+            'penalidades': [
+                {'tipo': 'PENALIDADE', 'atleta_camisa': '10', 'atleta_id': mandante_id * 100 + (rodada % 5),
+                 'clube_id': mandante_id, 'atleta_apelido': f'Jogador {rodada % 5}', 'resultado': 'AMARELO'},
+            ],
+        })
+    return {'jogos': [{'jogo': jogos}]}
+
+
+def responder(caminho):
+    achado = re.search(r'/rodada/(\d+)/fase', caminho)
+    if not achado:
+        return 404, 'text/plain', b'nao encontrado'
+    corpo = json.dumps(gerar_rodada_sintetica(int(achado.group(1)))).encode('utf-8')
+    return 200, 'application/json', corpo
+
+
+def loop_sequencial_antigo(num_rodadas, pausa):
+    """Reproduz o laço original: uma conexão nova por rodada + pausa fixa."""
+    resultados = {}
+    for i in range(1, num_rodadas + 1):
+        time.sleep(pausa)
+        response = requests.get(cbf_scraper.montar_url_rodada_cbf(ID_COMPETICAO, i), headers=cbf_scraper.HEADERS, timeout=20)
+        response.raise_for_status()
+        resultados[i] = response.json()
+    return resultados
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rodadas', type=int, default=38)
+    parser.add_argument('--latencia', type=float, default=0.3, help='Latência artificial do servidor (s)')
+    parser.add_argument('--pausa', type=float, default=1.0, help='Pausa fixa do loop antigo entre rodadas (s)')
+    args = parser.parse_args()
+
+    with ServidorLocal(responder, latencia=args.latencia) as servidor:
+        cbf_scraper.URL_BASE_CBF = servidor.url_base
+        cbf_scraper.USAR_CACHE_HTTP = False  # Mede só o transporte, sem requisições condicionais
+
+        inicio = time.perf_counter()
+        antigo = loop_sequencial_antigo(args.rodadas, args.pausa)
+        tempo_antigo = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        novo = cbf_scraper.buscar_rodadas_concorrente(ID_COMPETICAO, range(1, args.rodadas + 1))
+        tempo_novo = time.perf_counter() - inicio
+
+    assert list(novo.keys()) == sorted(novo.keys()), "Rodadas fora de ordem"
+    assert novo == antigo, "Resultados divergentes entre as duas estratégias"
+
+    print(f"Rodadas: {args.rodadas} | latência: {args.latencia}s | pausa antiga: {args.pausa}s")
+    print(f"Loop sequencial antigo : {tempo_antigo:7.2f}s")
+    print(f"Motor concorrente      : {tempo_novo:7.2f}s "
+          f"({cbf_scraper.MAX_CONEXOES_HTTP} conexões, {cbf_scraper.LIMITE_REQUISICOES_POR_SEGUNDO} req/s por host)")
+    print(f"Ganho                  : {tempo_antigo / tempo_novo:7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,117 @@
+"""
+Benchmark: motor de suspensões (vw_suspensoes_por_jogo).
+
+Monta um banco com N rodadas sintéticas (gravacao_sintetica.py), todas coletadas
+pelo fluxo de rodadas (livro de cartões incluído) e as últimas ainda por disputar.
+Mede:
+- o motor: calcular_suspensoes_por_jogo (uma passada pelo livro) e a atualização
+  de todas as tabelas de leitura, em que ele entra;
+- a tela do jogo: a consulta de pendurados do app (getPendurados, atletas x times
+  com amarelos % 3 = 2, que não sabe quem está suspenso) ao lado de uma busca pela
+  chave em vw_suspensoes_por_jogo, que já traz suspensos e pendurados de cada lado.
+
+Uso:
+    python benchmarks/bench_suspensoes.py [--rodadas 38 380 1520] [--a-disputar 5] [--repeticoes 200] [--pasta DIR]
+"""
+import argparse
+import contextlib
+import io
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import cbf_scraper  # noqa: E402
+from bench_consultas import CONSULTAS_DO_APP  # noqa: E402
+from gravacao_sintetica import _rodada_cbf, _tabela_de_jogos, _times  # noqa: E402
+
+CONSULTA_PENDURADOS_APP = dict(CONSULTAS_DO_APP)['getPendurados']
+CONSULTA_SUSPENSOES = "SELECT * FROM vw_suspensoes_por_jogo WHERE jogo_id = ?"
+
+
+def montar_banco(caminho, num_rodadas, a_disputar):
+    """Banco com `num_rodadas` rodadas coletadas; as `a_disputar` últimas ainda sem resultado."""
+    rnd = random.Random(2025)
+    times = _times()
+    tabela = _tabela_de_jogos(len(times))
+    finalizadas = num_rodadas - a_disputar
+    rodadas = ((rodada, _rodada_cbf(rodada, tabela[(rodada - 1) % len(tabela)], times, finalizadas, rnd))
+               for rodada in range(1, num_rodadas + 1))
+    cbf_scraper.DB_FILE = caminho
+    with contextlib.redirect_stdout(io.StringIO()):
+        cbf_scraper.criar_banco_de_dados()
+        with cbf_scraper.conexao_da_execucao() as conn, cbf_scraper.transacao(conn):
+            times_info = {}
+            fluxo = cbf_scraper.gravar_rodadas_em_fluxo(conn, cbf_scraper.extrair_rodadas(rodadas, times_info),
+                                                        cbf_scraper.ID_COMPETICAO_CBF)
+            cbf_scraper.salvar_dados_no_banco({}, times_info, [], [], {}, {}, [], fluxo_rodadas=fluxo)
+
+
+def medir_motor(conn, repeticoes):
+    """Mediana (s) de calcular_suspensoes_por_jogo e de atualizar_tabelas_de_leitura."""
+    motor, leitura = [], []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        linhas = cbf_scraper.calcular_suspensoes_por_jogo(conn)
+        motor.append(time.perf_counter() - inicio)
+        inicio = time.perf_counter()
+        cbf_scraper.atualizar_tabelas_de_leitura(conn)
+        leitura.append(time.perf_counter() - inicio)
+    return statistics.median(motor), statistics.median(leitura), linhas
+
+
+def medir_tela(conn, repeticoes):
+    """p50 (ms) da tela do jogo: pendurados pela consulta do app x busca em vw_suspensoes_por_jogo."""
+    jogos = conn.execute("SELECT p.id_jogo, m.nome, v.nome FROM partidas p JOIN times m ON m.id = p.mandante_id "
+                         "JOIN times v ON v.id = p.visitante_id "
+                         "WHERE p.id_jogo NOT IN (SELECT id_jogo FROM jogos_finalizados) ORDER BY p.id_jogo").fetchall()
+    tempos_app, tempos_tabela = [], []
+    for i in range(repeticoes):
+        id_jogo, mandante, visitante = jogos[i % len(jogos)]
+        inicio = time.perf_counter()
+        conn.execute(CONSULTA_PENDURADOS_APP, (mandante, visitante)).fetchall()
+        tempos_app.append((time.perf_counter() - inicio) * 1000)
+        inicio = time.perf_counter()
+        conn.execute(CONSULTA_SUSPENSOES, (id_jogo,)).fetchall()
+        tempos_tabela.append((time.perf_counter() - inicio) * 1000)
+    return statistics.median(tempos_app), statistics.median(tempos_tabela)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rodadas', type=int, nargs='+', default=[38, 380, 1520])
+    parser.add_argument('--a-disputar', type=int, default=5)
+    parser.add_argument('--repeticoes', type=int, default=200)
+    parser.add_argument('--pasta', help='Onde criar os bancos temporários')
+    args = parser.parse_args()
+
+    pasta = tempfile.mkdtemp(prefix='bench_suspensoes_', dir=args.pasta)
+    resultados = []
+    try:
+        for num_rodadas in args.rodadas:
+            montar_banco(os.path.join(pasta, f"rodadas_{num_rodadas}.db"), num_rodadas, args.a_disputar)
+            with cbf_scraper.usar_conexao() as conn:
+                eventos = conn.execute("SELECT COUNT(*) FROM cartoes_eventos").fetchone()[0]
+                motor, leitura, linhas = medir_motor(conn, max(3, args.repeticoes // 40))
+                app, tabela = medir_tela(conn, args.repeticoes)
+            suspensos = sum(1 for linha in linhas if linha[2] == 'SUSPENSO')
+            resultados.append((num_rodadas, eventos, suspensos, len(linhas) - suspensos, motor, leitura, app, tabela))
+    finally:
+        shutil.rmtree(pasta, ignore_errors=True)
+
+    print(f"{args.a_disputar} rodadas a disputar | tela do jogo: p50 de {args.repeticoes} execuções")
+    print(f"{'Rodadas':>8}{'eventos':>9}{'suspensos':>11}{'pendurados':>12}{'motor':>11}{'tabelas vw_*':>14}"
+          f"{'app (pendurados)':>18}{'vw_suspensoes':>15}")
+    for num_rodadas, eventos, suspensos, pendurados, motor, leitura, app, tabela in resultados:
+        print(f"{num_rodadas:>8}{eventos:>9}{suspensos:>11}{pendurados:>12}{motor * 1000:>8.1f} ms{leitura * 1000:>11.1f} ms"
+              f"{app:>15.3f} ms{tabela:>12.3f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,124 @@
+"""
+Benchmark: banco único com todo o histórico x um banco (shard) por temporada.
+
+Gera N temporadas sintéticas (bench_escrita.py) e monta:
+- banco único: todas as temporadas no mesmo arquivo (como era o brasileirao.db);
+- shards: um arquivo por temporada em PASTA_TEMPORADAS + catálogo.
+
+Mede a coleta da temporada ATUAL (a última) com a rodada 38 alterada:
+tempo de salvar_dados_no_banco, páginas gravadas e tamanho do arquivo a publicar.
+Também mede uma consulta que atravessa todas as temporadas, no banco único e
+via consultar_temporadas (ATTACH dos shards).
+
+Uso:
+    python benchmarks/bench_temporadas.py [--temporadas 10] [--repeticoes 3] [--pasta DIR]
+"""
+import argparse
+import contextlib
+import io
+import os
+import shutil
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import cbf_scraper  # noqa: E402
+from bench_escrita import RODADAS, gerar_dados_sinteticos  # noqa: E402
+
+CONSULTA_HISTORICO = "SELECT apelido, cartoes_amarelos FROM {t}.atletas WHERE cartoes_vermelhos >= 2"
+
+
+def dados_da_temporada(dados, temporada):
+    """Filtra as estruturas de gerar_dados_sinteticos para uma temporada (ids de time = temporada * 1000 + n)."""
+    (estatisticas_jogadores, times_info, jogos_finalizados_info, todas_as_partidas_info,
+     estatisticas_times, todas_as_escalacoes, lista_final_elenco) = dados
+    do_time = lambda time_id: time_id // 1000 == temporada  # noqa: E731
+    do_jogo = lambda id_jogo: id_jogo // 100000 == temporada  # noqa: E731
+    return ({k: v for k, v in estatisticas_jogadores.items() if do_time(v['time_id'])},
+            {k: v for k, v in times_info.items() if do_time(k)},
+            [j for j in jogos_finalizados_info if do_jogo(j['id_jogo'])],
+            [j for j in todas_as_partidas_info if do_jogo(j['id_jogo'])],
+            {k: v for k, v in estatisticas_times.items() if do_time(k)},
+            {k: v for k, v in todas_as_escalacoes.items() if do_jogo(k)},
+            [j for j in lista_final_elenco if do_time(j['id_time'])])
+
+
+def gravar(caminho, dados):
+    cbf_scraper.DB_FILE = caminho
+    with contextlib.redirect_stdout(io.StringIO()):
+        cbf_scraper.criar_banco_de_dados()
+        cbf_scraper.salvar_dados_no_banco(*dados)
+
+
+def coletar_temporada_atual(caminho, dados_atuais, placar):
+    """Regrava a temporada atual com os placares da última rodada trocados. Retorna (tempo, páginas)."""
+    for jogo in dados_atuais[3]:
+        if jogo['rodada'] == RODADAS:
+            jogo['mandante_gols'] = str(placar)
+    cbf_scraper.DB_FILE = caminho
+    saida = io.StringIO()
+    with contextlib.redirect_stdout(saida):
+        inicio = time.perf_counter()
+        with cbf_scraper.conexao_da_execucao():
+            cbf_scraper.salvar_dados_no_banco(*dados_atuais)
+        tempo = time.perf_counter() - inicio
+    paginas = int(saida.getvalue().rsplit('nesta execução:', 1)[1].split()[0])
+    return tempo, paginas
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--temporadas', type=int, default=10)
+    parser.add_argument('--repeticoes', type=int, default=3)
+    parser.add_argument('--pasta', help='Onde criar os bancos temporários')
+    args = parser.parse_args()
+
+    dados = gerar_dados_sinteticos(args.temporadas)
+    atual = args.temporadas - 1
+    pasta = tempfile.mkdtemp(prefix='bench_temporadas_', dir=args.pasta)
+    try:
+        banco_unico = os.path.join(pasta, 'unico', 'brasileirao.db')
+        gravar(banco_unico, dados)
+
+        cbf_scraper.PASTA_TEMPORADAS = os.path.join(pasta, 'temporadas')
+        cbf_scraper.CATALOGO_DB_FILE = os.path.join(pasta, 'catalogo.db')
+        shards = {}
+        for temporada in range(args.temporadas):
+            shards[temporada] = os.path.join(cbf_scraper.PASTA_TEMPORADAS, cbf_scraper.ARQUIVO_BANCO_TEMPORADA.format(
+                ano=2000 + temporada, id_competicao=cbf_scraper.ID_COMPETICAO_CBF))
+            gravar(shards[temporada], dados_da_temporada(dados, temporada))
+
+        resultados = {}
+        for nome, caminho in (('Banco único', banco_unico), ('Shard da temporada', shards[atual])):
+            medidas = [coletar_temporada_atual(caminho, dados_da_temporada(dados, atual), placar)
+                       for placar in range(1, args.repeticoes + 1)]
+            resultados[nome] = (statistics.median(t for t, _ in medidas), statistics.median(p for _, p in medidas),
+                                os.path.getsize(caminho))
+
+        conn = sqlite3.connect(banco_unico)
+        inicio = time.perf_counter()
+        linhas_unico = conn.execute(CONSULTA_HISTORICO.format(t='main')).fetchall()
+        tempo_unico = time.perf_counter() - inicio
+        conn.close()
+        inicio = time.perf_counter()
+        linhas_shards = cbf_scraper.consultar_temporadas(CONSULTA_HISTORICO)
+        tempo_shards = time.perf_counter() - inicio
+    finally:
+        shutil.rmtree(pasta, ignore_errors=True)
+
+    print(f"Temporadas: {args.temporadas} | coleta da temporada atual com a rodada {RODADAS} alterada "
+          f"(mediana de {args.repeticoes})")
+    for nome, (tempo, paginas, tamanho) in resultados.items():
+        print(f"{nome:<20}: {tempo:6.3f}s | páginas gravadas: {paginas:5.0f} | arquivo a publicar: {tamanho / 1024:8.0f} KiB")
+    print(f"\nConsulta em todo o histórico ({len(linhas_unico)} linhas no banco único, {len(linhas_shards)} via shards):")
+    print(f"{'Banco único':<20}: {tempo_unico * 1000:7.1f} ms")
+    print(f"{'ATTACH dos shards':<20}: {tempo_shards * 1000:7.1f} ms (inclui atualizar o catálogo)")
+
+
+if __name__ == '__main__':
+    main()
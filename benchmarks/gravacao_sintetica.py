@@ -0,0 +1,244 @@
+"""
+Gera uma gravação SINTÉTICA (mesmo formato de `python cbf_scraper.py --gravar`)
+com 20 times, 38 rodadas da API da CBF, a tabela de classificação da CBF e todas
+as páginas do 365Scores que o robô visita (estatísticas, classificação, lista de
+jogos, escalações e elencos), além das fotos e escudos que elas referenciam.
+
+Serve para rodar e cronometrar o pipeline inteiro offline quando não há uma
+gravação real à mão:
+
+    python benchmarks/gravacao_sintetica.py /tmp/gravacao.zip [--finalizadas 20]
+    python cbf_scraper.py --reproduzir /tmp/gravacao.zip
+"""
+import argparse
+import io
+import json
+import os
+import random
+import sys
+from types import SimpleNamespace
+
+from PIL import Image
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import cbf_scraper  # noqa: E402
+
+URL_365 = "https://www.365scores.com/pt-br/football/league/brasileirao-serie-a-113"
+JOGADORES_POR_TIME = 26
+JOGADORES_COM_FOTO = 22  # Os demais têm a mesma silhueta padrão, cada um na sua URL (como no 365Scores)
+
+
+def _times():
+    """[(id_cbf, nome_cbf_api, nome_365, nome_site_cbf)] dos 20 times."""
+    cbf_para_365 = {cbf: nome_365 for nome_365, cbf in cbf_scraper.MAPA_NOMES_365_PARA_CBF.items()}
+    times = []
+    for n, nome_cbf in enumerate(sorted(cbf_para_365)):
+        nome_site = cbf_scraper.MAPA_NORMALIZACAO_NOME_CBF_SITE.get(nome_cbf, nome_cbf)
+        times.append((20000 + n, nome_cbf, cbf_para_365[nome_cbf], nome_site))
+    return times
+
+
+def _tabela_de_jogos(num_times):
+    """Turno e returno pelo método do círculo: lista de rodadas com pares (mandante, visitante)."""
+    indices = list(range(num_times))
+    turno = []
+    for r in range(num_times - 1):
+        pares = [(indices[i], indices[num_times - 1 - i]) for i in range(num_times // 2)]
+        turno.append([(a, b) if r % 2 == 0 else (b, a) for a, b in pares])
+        indices = [indices[0]] + [indices[-1]] + indices[1:-1]
+    return turno + [[(b, a) for a, b in rodada] for rodada in turno]
+
+
+def _nome_jogador(sigla, n):
+    return f"Jogador {sigla} {n:02d}"
+
+
+def _sigla(nome_365):
+    return ''.join(ch for ch in nome_365 if ch.isalpha())[:3].upper()
+
+
+def _rodada_cbf(rodada, jogos, times, finalizadas, rnd):
+    lista = []
+    for k, (m, v) in enumerate(jogos):
+        mandante, visitante = times[m], times[v]
+        fechado = rodada <= finalizadas
+        jogo = {
+            'id_jogo': rodada * 100 + k,
+            'data': f"{1 + (rodada * 7) % 28:02d}/{1 + rodada // 4:02d}/2025", 'hora': '16:00', 'local': 'Estádio',
+            'mandante': {'id': mandante[0], 'nome': mandante[1], 'url_escudo': f"https://cbf.example/escudos/{mandante[0]}.png",
+                         'gols': str(rnd.randint(0, 3)) if fechado else None},
+            'visitante': {'id': visitante[0], 'nome': visitante[1], 'url_escudo': f"https://cbf.example/escudos/{visitante[0]}.png",
+                          'gols': str(rnd.randint(0, 3)) if fechado else None},
+            'documentos': [{'url': 'sumula.pdf'}] if fechado else [],
+            'penalidades': [],
+        }
+        if fechado:
+            for time_cbf in (mandante, visitante):
+                for _ in range(rnd.randint(0, 4)):
+                    n = rnd.randint(1, JOGADORES_POR_TIME)
+                    jogo['penalidades'].append({
+                        'tipo': 'PENALIDADE', 'atleta_camisa': str(n), 'atleta_id': time_cbf[0] * 100 + n,
+                        'clube_id': time_cbf[0], 'atleta_apelido': f"Atleta {n}",
+                        'resultado': rnd.choices(['AMARELO', 'VERMELHO', 'VERMELHO2AMARELO'], [20, 1, 1])[0],
+                    })
+        lista.append(jogo)
+    return {'jogos': [{'jogo': lista}]}
+
+
+def _pagina_classificacao_cbf(times, rnd):
+    linhas = []
+    for pos, t in enumerate(rnd.sample(times, len(times)), start=1):
+        celulas = [f'<td><strong class="styles_position__x">{pos}</strong><strong>{t[3]}</strong></td>',
+                   f'<td>{60 - pos * 2}</td>', '<td>20</td>'] + ['<td>0</td>'] * 9
+        svgs = ''.join(f'<svg><circle fill="{rnd.choice(["#24C796", "#B7B7B7", "#F00"])}"></circle></svg>' for _ in range(5))
+        celulas.append(f'<td><div>{svgs}</div></td>')
+        linhas.append(f"<tr>{''.join(celulas)}</tr>")
+    return (f'<html><body><div class="styles_tableContent__dh0gO"><table><tbody>{"".join(linhas)}'
+            f'</tbody></table></div></body></html>')
+
+
+def _pagina_stats_365(times, rnd):
+    blocos = []
+    for titulo in ("Gols por jogo", "Escanteios por jogo", "Cartões Amarelos", "Cartões Vermelhos"):
+        linhas = ''.join(
+            f'<a class="entity-stats-widget_row__a1"><span class="entity-stats-widget_player_name__b2">{t[2]}</span>'
+            f'<div class="entity-stats-widget_stats_value__c3">{rnd.randint(1, 60)}</div></a>' for t in times)
+        blocos.append(f'<div class="entity-stats-widget_content__d4"><h2>{titulo}</h2>{linhas}<div>Ver mais</div></div>')
+    return (f'<html><body><div class="secondary-tabs_tab_button__e5">Times</div>{"".join(blocos)}'
+            f'<span>Grêmio</span></body></html>')
+
+
+def _pagina_identidade_365(times):
+    linhas = ''.join(
+        f'<tr class="standings-widget_table_row__f6"><td><img class="competitor_logo__g7" src="{_url_escudo(t[0])}"/>'
+        f'<div class="competitor_name_text__h8">{t[2]}</div></td></tr>' for t in times)
+    return f'<html><body><div class="standings-widget_container__i9"><table>{linhas}</table></div></body></html>'
+
+
+def _url_jogo(rodada, k):
+    return f"https://www.365scores.com/pt-br/football/match/brasileirao-serie-a-113/jogo-{rodada}-{k}"
+
+
+def _pagina_jogos_365(tabela, times, rodadas):
+    grupos = []
+    for rodada in rodadas:
+        cards = ''.join(
+            f'<a class="game-card_game_card_link__L3moj" href="{_url_jogo(rodada, k)}">'
+            f'<div class="game-card-competitor_name__j1">{times[m][2]}</div><div class="game-card-competitor_name__j1">{times[v][2]}</div></a>'
+            for k, (m, v) in enumerate(tabela[rodada - 1]))
+        grupos.append(f'<div class="entity-scores-widget-group_container__k2">'
+                      f'<div class="entity-scores-widget-group_header_title__l3">Rodada {rodada}</div>{cards}</div>')
+    return f'<html><body>{"".join(grupos)}</body></html>'
+
+
+def _pagina_escalacao(time_365, rnd):
+    sigla = _sigla(time_365)
+    numeros = rnd.sample(range(1, JOGADORES_POR_TIME + 1), 23)
+    titulares = ''.join(
+        f'<a class="field-formation_player_container__m4" style="left: {rnd.randint(0, 300)}px; bottom: {rnd.randint(0, 500)}px;">'
+        f'<div class="field-formation_player_name__n5">{_nome_jogador(sigla, n)}</div>'
+        f'<div class="field-formation_player_number_text__o6">{n}</div></a>' for n in numeros[:11])
+    reservas = ''.join(
+        f'<a class="players-list-item__p7"><div class="players-list-item-player-name__q8">{_nome_jogador(sigla, n)}</div>'
+        f'<div class="players-list-item-player-number__r9"><div>{n}</div></div>'
+        f'<div class="players-list-item-player-position__s1">Meio-campo</div></a>' for n in numeros[11:20])
+    ausentes = ''.join(
+        f'<a class="players-list-item__p7"><div class="players-list-item-player-name__q8">{_nome_jogador(sigla, n)}</div>'
+        f'<div class="injuries__t2"></div><div class="players-list-item-player-position__s1">Atacante</div></a>' for n in numeros[20:])
+    return ('<html><body><div id="navigation-tabs_game-center_lineups">Escalações</div>'
+            '<div class="secondary-tabs_tab_button_container__u3">Mandante</div><div class="secondary-tabs_tab_button_container__u3">Visitante</div>'
+            '<div class="game-center-widget_content__v4"><bdi class="lineups-widget_status_text__w5">4-3-3</bdi>'
+            '<div class="field-formation_field_container__x6"><div class="field-formation_canvas_relative_container__y7" style="width: 300px; height: 500px;">'
+            f'{titulares}</div></div>'
+            f'<div class="players-list-container__z8"><h2 class="card-title_title__a9">Banco</h2>{reservas}</div>'
+            f'<div class="players-list-container__z8"><h2 class="card-title_title__a9">Fora do jogo</h2>{ausentes}</div>'
+            '</div></body></html>')
+
+
+def _url_foto(sigla, n):
+    return f"https://imagecache.365scores.com/atletas/{sigla}-{n}.png"
+
+
+def _url_escudo(id_cbf):
+    return f"https://imagecache.365scores.com/escudo/{id_cbf}.png"
+
+
+def _imagem_png(semente, lado=256):
+    """PNG de `lado` px com um degradê de cor sorteada a partir de `semente`."""
+    r, g, b = random.Random(semente).choices(range(256), k=3)
+    degrade = Image.linear_gradient('L').resize((lado, lado)).point(lambda v: (v + b) % 256)
+    imagem = Image.merge('RGB', (Image.new('L', (lado, lado), r), Image.new('L', (lado, lado), g), degrade))
+    buffer = io.BytesIO()
+    imagem.save(buffer, 'PNG')
+    return buffer.getvalue()
+
+
+def _pagina_elenco(time_365):
+    sigla = _sigla(time_365)
+    linhas = ''.join(
+        f'<a class="squad-widget_row__b1"><span class="squad-widget_player_name__c2">{_nome_jogador(sigla, n)}</span>'
+        f'<img class="squad-widget_athlete_logo__d3" src="{_url_foto(sigla, n)}"/></a>'
+        for n in range(1, JOGADORES_POR_TIME + 1))
+    return f'<html><body>{linhas}</body></html>'
+
+
+def _com_banners(html):
+    """Inclui o banner de cookies e o botão de fechar propaganda que o robô tenta clicar."""
+    banners = ('<button id="didomi-notice-agree-button">Aceitar</button>'
+               '<div class="external-ad_close_button__e1">x</div>')
+    return html.replace('<body>', '<body>' + banners, 1)
+
+
+def gerar_gravacao(arquivo, finalizadas=20, semente=2025):
+    """Escreve em `arquivo` uma gravação sintética com `finalizadas` rodadas encerradas."""
+    rnd = random.Random(semente)
+    times = _times()
+    tabela = _tabela_de_jogos(len(times))
+    gravador = cbf_scraper.GravadorExecucao(arquivo)
+
+    def resposta(corpo, content_type):
+        return SimpleNamespace(status_code=200, headers={'Content-Type': content_type}, content=corpo)
+
+    # --- CBF (HTTP) ---
+    for rodada in range(1, len(tabela) + 1):
+        dados = _rodada_cbf(rodada, tabela[rodada - 1], times, finalizadas, rnd)
+        gravador.registrar_http(cbf_scraper.montar_url_rodada_cbf(cbf_scraper.ID_COMPETICAO_CBF, rodada),
+                                resposta(json.dumps(dados, ensure_ascii=False).encode('utf-8'), 'application/json'))
+    gravador.registrar_http(cbf_scraper.montar_url_classificacao_cbf(cbf_scraper.ANO_COMPETICAO),
+                            resposta(_pagina_classificacao_cbf(times, rnd).encode('utf-8'), 'text/html; charset=utf-8'))
+
+    # --- 365Scores (Selenium) ---
+    gravador.registrar_pagina(f"{URL_365}/stats", _com_banners(_pagina_stats_365(times, rnd)))
+    gravador.registrar_pagina(f"{URL_365}/standings", _com_banners(_pagina_identidade_365(times)))
+    for time_365, url in cbf_scraper.URLS_ELENCO_365.items():
+        gravador.registrar_pagina(url, _com_banners(_pagina_elenco(time_365)))
+    proxima = min(finalizadas + 1, len(tabela))
+    gravador.registrar_pagina(f"{URL_365}/matches#fixtures",
+                              _com_banners(_pagina_jogos_365(tabela, times, range(proxima, min(proxima + 3, len(tabela) + 1)))), tipo='dom')
+    for k, (m, v) in enumerate(tabela[proxima - 1]):
+        gravador.registrar_pagina(_url_jogo(proxima, k), _com_banners(_pagina_escalacao(times[m][2], rnd)))
+        gravador.registrar_pagina(_url_jogo(proxima, k), _com_banners(_pagina_escalacao(times[v][2], rnd)))
+
+    # --- Imagens (HTTP) ---
+    silhueta = _imagem_png('silhueta')
+    for id_cbf, _, time_365, _ in times:
+        gravador.registrar_http(_url_escudo(id_cbf), resposta(_imagem_png(id_cbf), 'image/png'))
+        sigla = _sigla(time_365)
+        for n in range(1, JOGADORES_POR_TIME + 1):
+            foto = _imagem_png(f"{sigla}-{n}") if n <= JOGADORES_COM_FOTO else silhueta
+            gravador.registrar_http(_url_foto(sigla, n), resposta(foto, 'image/png'))
+    gravador.salvar()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('arquivo')
+    parser.add_argument('--finalizadas', type=int, default=20, help='Quantas rodadas já estão encerradas')
+    parser.add_argument('--semente', type=int, default=2025)
+    args = parser.parse_args()
+    gerar_gravacao(args.arquivo, args.finalizadas, args.semente)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+"""
+Servidor HTTP local usado como "dublê" da CBF/365Scores nos benchmarks.
+
+Cada requisição passa por uma função `responder(caminho_com_query)` que
+retorna (status, content_type, corpo_bytes) ou, para enviar cabeçalhos extras
+(ex.: Retry-After), (status, content_type, corpo_bytes, {cabecalho: valor}).
+Uma latência artificial pode ser adicionada para simular a rede real.
+"""
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class ServidorLocal:
+    """Sobe um ThreadingHTTPServer em 127.0.0.1 numa porta livre (use com `with`)."""
+
+    def __init__(self, responder, latencia=0.0):
+        self.responder = responder
+        self.latencia = latencia
+        self.total_requisicoes = 0
+        self._lock = threading.Lock()
+        self._servidor = None
+        self._thread = None
+
+    @property
+    def url_base(self):
+        host, porta = self._servidor.server_address[:2]
+        return f"http://{host}:{porta}"
+
+    def __enter__(self):
+        dono = self
+
+        class _Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # Permite keep-alive
+
+            def do_GET(self):
+                with dono._lock:
+                    dono.total_requisicoes += 1
+                if dono.latencia:
+                    time.sleep(dono.latencia)
+                status, content_type, corpo, *extras = dono.responder(self.path)
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                for nome, valor in (extras[0] if extras else {}).items():
+                    self.send_header(nome, valor)
+                self.send_header("Content-Length", str(len(corpo)))
+                self.end_headers()
+                self.wfile.write(corpo)
+
+            def log_message(self, *args):
+                pass
+
+        self._servidor = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        self._servidor.daemon_threads = True
+        self._thread = threading.Thread(target=self._servidor.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._servidor.shutdown()
+        self._servidor.server_close()
+        return False
@@ -1,15 +1,42 @@
 import os
+import io
 import sys
 import re
 import time
+import random
 import sqlite3
+import json
+import zlib
+import gzip
+import hashlib
+import asyncio
+import weakref
+import threading
+import zipfile
+import subprocess
+import itertools
+import bisect
 from typing import Optional
-from datetime import datetime
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, urljoin, quote, unquote
+from urllib.request import pathname2url
+from concurrent.futures import Future, ThreadPoolExecutor
 from unidecode import unidecode
 
+# Agregação vetorizada (ver AGREGADOS POR TIME)
+import numpy as np
+
+# Miniaturas das fotos e escudos (ver IMAGENS LOCAIS)
+from PIL import Image, UnidentifiedImageError
+
 # Bibliotecas para Web Scraping
 import requests
+from requests.adapters import HTTPAdapter
 from bs4 import BeautifulSoup
+import lxml.html
 
 # Bibliotecas para Web Scraping Dinâmico (Selenium)
 from selenium import webdriver
@@ -18,28 +45,105 @@ from webdriver_manager.chrome import ChromeDriverManager
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import NoSuchElementException, SessionNotCreatedException, WebDriverException
 
 # ==============================================================================
 # VARIÁVEIS GLOBAIS E CONSTANTES (A SEREM PREENCHIDAS)
 # ==============================================================================
 
+# Constantes da Competição (a em andamento: trocadas por usar_competicao, ver COMPETICOES)
+NOME_COMPETICAO = 'Brasileirão Série A'
+ID_COMPETICAO_CBF = 12606  # Substituir pelo ID real da competição na API da CBF
+ANO_COMPETICAO = 2025
+TOTAL_RODADAS = 38
+CAMINHO_TABELA_CBF = 'campeonato-brasileiro/serie-a'  # Trecho da URL da tabela de classificação no site da CBF
+LIGA_365_SCORES = 'brasileirao-serie-a-113'            # Trecho da URL da liga no 365Scores
+
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 DB_FOLDER_PATH = os.path.join(SCRIPT_DIR, 'database')
-DB_FILE = os.path.join(DB_FOLDER_PATH, 'brasileirao.db')
+# Um banco (shard) por temporada/competição: a coleta só grava no da temporada atual,
+# e o histórico fica em arquivos separados, consultados juntos pelo catálogo (ver consultar_temporadas)
+PASTA_TEMPORADAS = os.path.join(DB_FOLDER_PATH, 'temporadas')
+ARQUIVO_BANCO_TEMPORADA = 'brasileirao_{ano}_{id_competicao}.db'
+DB_FILE = os.path.join(PASTA_TEMPORADAS, ARQUIVO_BANCO_TEMPORADA.format(ano=ANO_COMPETICAO, id_competicao=ID_COMPETICAO_CBF))
+# Banco antigo, único para todas as temporadas (adotado como shard da temporada atual, ver adotar_banco_legado)
+DB_FILE_LEGADO = os.path.join(DB_FOLDER_PATH, 'brasileirao.db')
+CATALOGO_DB_FILE = os.path.join(DB_FOLDER_PATH, 'catalogo.db')
+# Exportação do banco em texto, que é o que vai para o git (ver exportar_banco_para_texto), uma pasta por temporada
+PASTA_EXPORTACAO_TEXTO = os.path.join(DB_FOLDER_PATH, 'dados', f"{ANO_COMPETICAO}_{ID_COMPETICAO_CBF}")
 
 if not os.path.exists(DB_FOLDER_PATH):
     os.makedirs(DB_FOLDER_PATH, exist_ok=True)
     print(f"📁 Pasta do banco de dados criada em: {DB_FOLDER_PATH}")
 
-# Constantes da Competição
-ID_COMPETICAO_CBF = 12606  # Substituir pelo ID real da competição na API da CBF
-ANO_COMPETICAO = 2025
-TOTAL_RODADAS = 38
+# Ajustes do SQLite para a gravação em lote (ver abrir_conexao_escrita)
+PRAGMAS_ESCRITA_SQLITE = (
+    ('journal_mode', 'WAL'),    # Escrita sequencial no log, sem reescrever páginas do banco a cada commit
+    ('synchronous', 'NORMAL'),  # Com WAL, fsync só no checkpoint (seguro contra queda do processo)
+    ('temp_store', 'MEMORY'),   # Índices/ordenações temporárias em memória
+    ('cache_size', -65536),     # Cache de páginas de ~64 MB (valor negativo = KiB)
+    ('wal_autocheckpoint', 0),  # Um único checkpoint ao fechar (fechar_conexao_escrita), que também conta as páginas gravadas
+)
+
+# Coleta incremental: rodadas já fechadas (todos os jogos com súmula) são lidas do banco em vez da API
+MODO_INCREMENTAL = True
+JANELA_REVISAO_RODADAS = 2  # Quantas das rodadas fechadas mais recentes ainda são baixadas de novo da API a cada execução
+EVENTOS_POR_LOTE_ATLETAS = 2000  # Eventos de cartão novos acumulados no fluxo de rodadas antes de atualizar ATLETAS
+
+# Endereço base da API/site da CBF (pode ser trocado por um servidor local em testes/benchmarks)
+URL_BASE_CBF = "https://www.cbf.com.br"
 
 # Headers para requisições HTTP
 HEADERS = {
-    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+    'Accept-Encoding': 'gzip, deflate',
+}
+
+# Configuração do motor de coleta HTTP
+MAX_CONEXOES_HTTP = 8                # Requisições simultâneas (e tamanho do pool de conexões keep-alive)
+LIMITE_REQUISICOES_POR_SEGUNDO = 4.0 # Taxa sustentada permitida POR HOST (token bucket)
+RAJADA_MAXIMA_POR_HOST = 4           # Quantas requisições podem sair de uma vez antes de o limite atuar
+TIMEOUT_REQUISICAO_HTTP = 20         # Timeout de conexão/leitura de cada requisição (s)
+TIMEOUT_TOTAL_REQUISICAO_HTTP = 90   # Prazo máximo de uma requisição na camada asyncio, incluindo esperas e novas tentativas (s)
+
+# Política de novas tentativas (429, 5xx e erros de rede)
+MAX_TENTATIVAS_HTTP = 4              # Tentativas por requisição (a 1ª + até 3 novas)
+BACKOFF_BASE_HTTP = 1.0              # Espera base do backoff exponencial com jitter (s): ~1, 2, 4...
+BACKOFF_MAXIMO_HTTP = 30.0           # Teto de cada espera do backoff (s)
+RETRY_AFTER_MAXIMO_HTTP = 60.0       # Retry-After maior que isso: desiste em vez de travar a execução (s)
+ORCAMENTO_NOVAS_TENTATIVAS = 0.2     # Novas tentativas permitidas por requisição feita (20% do tráfego)...
+MINIMO_NOVAS_TENTATIVAS = 10         # ...mais esta reserva fixa, para execuções com poucas requisições
+FALHAS_PARA_ABRIR_CIRCUITO = 5       # Falhas seguidas no mesmo host que abrem o circuito
+TEMPO_CIRCUITO_ABERTO = 30.0         # Tempo com o circuito aberto antes de uma requisição de teste (s)
+
+# Pool de navegadores (Chrome headless) das etapas de Selenium
+TAMANHO_POOL_NAVEGADORES = 4         # Navegadores abertos ao mesmo tempo, no máximo (abertos sob demanda)
+NAVEGADORES_FOTOS = 4                # Navegadores buscando os elencos em paralelo (ver buscar_fotos_jogadores; 1 = um time por vez)
+
+# Cache das fotos dos elencos no banco (ver obter_fotos_jogadores)
+VALIDADE_FOTOS_ELENCO_DIAS = 7       # Elenco buscado há mais tempo que isso é buscado de novo
+ESPERA_NOVA_BUSCA_ELENCO_HORAS = 12  # Jogador da escalação sem foto só faz o elenco ser rebuscado depois disso
+
+# Cache da identidade dos times no 365Scores em TIMES (ver obter_identidade_times_365)
+VALIDADE_IDENTIDADE_TIMES_DIAS = 30  # Nomes e escudos buscados há mais tempo que isso são buscados de novo
+ESPERA_NOVA_BUSCA_IDENTIDADE_HORAS = 12  # Time da CBF sem identidade só faz a classificação ser rebuscada depois disso
+
+# Chromedriver: resolvido uma vez por processo e guardado em um manifesto local (ver resolver_chromedriver)
+ARQUIVO_MANIFESTO_CHROMEDRIVER = os.path.join(DB_FOLDER_PATH, 'chromedriver.json')
+VALIDADE_MANIFESTO_CHROMEDRIVER = 7 * 24 * 3600  # Depois disso o ChromeDriverManager é consultado de novo (s)
+CHROMEDRIVER_FIXO = None             # Caminho de um chromedriver local (--chromedriver): modo offline, sem o host de downloads
+
+# Imagens locais: fotos e escudos baixados uma vez e guardados como miniaturas WebP (ver atualizar_imagens_locais)
+PASTA_IMAGENS = os.path.join(DB_FOLDER_PATH, 'imagens')
+TAMANHOS_MINIATURAS = {              # Lado máximo (px) de cada miniatura: tamanhos das telas do app em densidade 3x
+    'escudo': (72, 120, 150),        # 24 dp (classificação), 40 dp (jogos, estatísticas), 50 dp (atletas)
+    'foto': (96,),                   # 32 dp (CircleAvatar das escalações)
 }
+QUALIDADE_WEBP = 80
+
+# Cache HTTP em disco (requisições condicionais + hash do conteúdo) para a API e o site da CBF
+USAR_CACHE_HTTP = True
+PASTA_CACHE_HTTP = os.path.join(DB_FOLDER_PATH, 'cache_http')
 
 # MAPAS DE NORMALIZAÇÃO CRÍTICOS (Exemplos)
 # Usado para mapear o nome longo da API CBF para o nome curto no site CBF (para o scraping)
@@ -141,410 +245,3188 @@ URLS_ELENCO_365 = {
      "Vitória": "https://www.365scores.com/pt-br/football/team/vitoria-1228/squad"
  }
 
+# Competições coletadas em cada execução (ver main_run), todas no mesmo processo.
+# Cada uma tem o seu banco em PASTA_TEMPORADAS e a sua pasta de exportação em texto;
+# a PRIMEIRA é a do app (é o banco publicado, ver --mostrar-banco).
+# Para incluir outra (ex.: Série B), acrescente um dicionário com as mesmas chaves:
+# {'nome': 'Brasileirão Série B', 'id_competicao': <ID na API da CBF>, 'ano': 2025, 'total_rodadas': 38,
+#  'caminho_tabela_cbf': 'campeonato-brasileiro/serie-b', 'liga_365': '<liga>-<id> no 365Scores',
+#  'mapa_nomes_365_para_cbf': {...}, 'urls_elenco_365': {...}}
+COMPETICOES = [
+    {
+        'nome': NOME_COMPETICAO,
+        'id_competicao': ID_COMPETICAO_CBF,
+        'ano': ANO_COMPETICAO,
+        'total_rodadas': TOTAL_RODADAS,
+        'caminho_tabela_cbf': CAMINHO_TABELA_CBF,
+        'liga_365': LIGA_365_SCORES,
+        'mapa_nomes_365_para_cbf': MAPA_NOMES_365_PARA_CBF,
+        'urls_elenco_365': URLS_ELENCO_365,
+    },
+]
+
 # ==============================================================================
-# FUNÇÕES PLACEHOLDER (Assumidas das Partes não enviadas)
+# MOTOR DE COLETA HTTP (Sessão compartilhada + Limitador de taxa por host)
 # ==============================================================================
 
-def calcular_rodada_atual(jogos_finalizados, todas_as_partidas, TOTAL_RODADAS):
+class BaldeDeTokens:
     """
-    Calcula a rodada atual do campeonato com base nos jogos finalizados.
-    A rodada atual é a próxima a ser jogada após a última rodada finalizada.
+    Limitador de taxa no estilo "token bucket" (seguro para várias threads).
+    O balde começa cheio com `capacidade` tokens e é reabastecido a `taxa`
+    tokens por segundo. Cada requisição consome um token.
+
+    A taxa é adaptativa: cada 429 do host corta a taxa pela metade (e pode
+    congelar o balde até o Retry-After); cada sucesso devolve um pouco da taxa
+    original. Assim, sob throttling, a vazão cai aos poucos em vez de travar.
     """
-    
-    # 1. Encontra a última rodada completamente finalizada
-    if jogos_finalizados:
-        rodada_ultima_finalizada = max([jogo['rodada'] for jogo in jogos_finalizados])
-    else:
-        # Se nenhum jogo finalizado, a rodada inicial é 1
-        return 1
-    
-    # Se já chegamos ao final do campeonato
-    if rodada_ultima_finalizada >= TOTAL_RODADAS:
-        print("⚠️ Campeonato finalizado. Usando a última rodada finalizada.")
-        return TOTAL_RODADAS
-    
-    proxima_rodada = rodada_ultima_finalizada + 1
 
-    # 2. Verificação de partidas restantes na rodada_ultima_finalizada:
-    # Verifica se a rodada finalizada contém todos os seus jogos na lista de finalizados.
-    # Se houver jogos da rodada_ultima_finalizada que AINDA NÃO estão em jogos_finalizados,
-    # significa que a rodada ainda não terminou, então a rodada ATUAL é a última finalizada.
-    
-    # Cria um conjunto de IDs de jogos finalizados para lookup rápido
-    ids_finalizados = {jogo['id_jogo'] for jogo in jogos_finalizados}
-    
-    # Encontra todos os jogos da rodada que é supostamente a última finalizada
-    jogos_na_ultima_finalizada = [jogo for jogo in todas_as_partidas if jogo['rodada'] == rodada_ultima_finalizada]
+    def __init__(self, taxa: float, capacidade: int):
+        self.taxa = float(taxa)
+        self.taxa_nominal = self.taxa
+        self.capacidade = max(1, int(capacidade))
+        self._tokens = float(self.capacidade)
+        self._ultimo_abastecimento = time.monotonic()
+        self._bloqueado_ate = 0.0
+        self._ultima_reducao = float('-inf')
+        self._lock = threading.Lock()
 
-    # Verifica se todos os jogos dessa rodada foram de fato finalizados
-    if len(jogos_na_ultima_finalizada) != len([jogo for jogo in jogos_na_ultima_finalizada if jogo['id_jogo'] in ids_finalizados]):
-        # Se os totais não baterem, há jogos faltando, a rodada AINDA NÃO ACABOU.
-        return rodada_ultima_finalizada
+    def reduzir_taxa(self, pausa: float = 0.0):
+        """
+        Throttling do host: divide a taxa por 2 (mínimo 1/8 da nominal) e, se `pausa` > 0,
+        congela o balde. Vários 429 da mesma rajada (dentro de 1s) contam como um só corte.
+        """
+        with self._lock:
+            agora = time.monotonic()
+            if agora - self._ultima_reducao >= 1.0:
+                self.taxa = max(self.taxa_nominal / 8, self.taxa / 2)
+                self._ultima_reducao = agora
+            self._tokens = min(self._tokens, 0.0)
+            if pausa > 0:
+                self._bloqueado_ate = max(self._bloqueado_ate, agora + pausa)
 
-    # Se a última rodada finalizada realmente terminou, a próxima rodada é a atual.
-    return proxima_rodada
+    def recuperar_taxa(self):
+        """Sucesso no host: aumenta a taxa em 5% da nominal, até voltar a ela."""
+        with self._lock:
+            if self.taxa < self.taxa_nominal:
+                self.taxa = min(self.taxa_nominal, self.taxa + self.taxa_nominal * 0.05)
 
-def ler_ultima_rodada_salva() -> int:
+    def _tempo_ate_proximo_token(self) -> float:
+        """Reabastece o balde e consome um token se houver. Retorna quanto esperar (0 = liberado)."""
+        with self._lock:
+            agora = time.monotonic()
+            if agora < self._bloqueado_ate:
+                self._ultimo_abastecimento = self._bloqueado_ate
+                return self._bloqueado_ate - agora
+            decorrido = agora - self._ultimo_abastecimento
+            self._tokens = min(self.capacidade, self._tokens + decorrido * self.taxa)
+            self._ultimo_abastecimento = agora
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0.0
+            return (1 - self._tokens) / self.taxa
+
+    def adquirir(self):
+        """Bloqueia a thread atual até que um token esteja disponível."""
+        if self.taxa <= 0:
+            return
+        while True:
+            espera = self._tempo_ate_proximo_token()
+            if espera <= 0:
+                return
+            time.sleep(espera)
+
+    async def adquirir_async(self):
+        """Igual a adquirir(), mas aguarda no event loop sem bloquear a thread."""
+        if self.taxa <= 0:
+            return
+        while True:
+            espera = self._tempo_ate_proximo_token()
+            if espera <= 0:
+                return
+            await asyncio.sleep(espera)
+
+
+_sessao_http: Optional[requests.Session] = None
+_baldes_por_host = {}
+_lock_motor_http = threading.Lock()
+
+def obter_sessao_http() -> requests.Session:
     """
-    Lê a última rodada de escalações que foi salva com sucesso no banco de dados.
-    
-    Retorna:
-        int: O número da última rodada processada. Retorna 0 se não for encontrado.
+    Retorna a sessão HTTP compartilhada do processo (keep-alive + gzip).
+    O pool de conexões é dimensionado para MAX_CONEXOES_HTTP requisições simultâneas.
+    """
+    global _sessao_http
+    with _lock_motor_http:
+        if _sessao_http is None:
+            sessao = requests.Session()
+            adaptador = HTTPAdapter(pool_connections=MAX_CONEXOES_HTTP, pool_maxsize=MAX_CONEXOES_HTTP)
+            sessao.mount('http://', adaptador)
+            sessao.mount('https://', adaptador)
+            sessao.headers.update(HEADERS)
+            _sessao_http = sessao
+        return _sessao_http
+
+def obter_balde_do_host(url: str) -> BaldeDeTokens:
+    """Retorna (criando se necessário) o limitador de taxa do host da URL."""
+    host = urlsplit(url).netloc
+    with _lock_motor_http:
+        if host not in _baldes_por_host:
+            _baldes_por_host[host] = BaldeDeTokens(LIMITE_REQUISICOES_POR_SEGUNDO, RAJADA_MAXIMA_POR_HOST)
+        return _baldes_por_host[host]
+
+# ------------------------------------------------------------------------------
+# Política de novas tentativas (Retry-After, backoff com jitter, circuit breaker)
+# ------------------------------------------------------------------------------
+
+STATUS_COM_NOVA_TENTATIVA = {429, 500, 502, 503, 504}
+ERROS_COM_NOVA_TENTATIVA = (requests.ConnectionError, requests.Timeout)
+
+class CircuitoAbertoError(requests.RequestException):
+    """O host teve falhas seguidas demais e está temporariamente bloqueado (sem requisição de rede)."""
+
+
+class DisjuntorHost:
     """
-    conn: Optional[sqlite3.Connection] = None
+    Circuit breaker de um host. Depois de `limite_falhas` falhas seguidas o
+    circuito ABRE e as requisições falham na hora por `tempo_aberto` segundos;
+    passado esse tempo, UMA requisição de teste é liberada (meio-aberto): se der
+    certo o circuito fecha, se falhar ele abre de novo.
+    """
+
+    def __init__(self, limite_falhas: int, tempo_aberto: float):
+        self.limite_falhas = max(1, int(limite_falhas))
+        self.tempo_aberto = float(tempo_aberto)
+        self._falhas_seguidas = 0
+        self._aberto_ate = None
+        self._teste_ate = 0.0  # Requisição de teste em andamento (vale até este instante)
+        self._lock = threading.Lock()
+
+    def liberar(self, host: str):
+        """Levanta CircuitoAbertoError se o circuito não deixar a requisição sair."""
+        with self._lock:
+            if self._aberto_ate is None:
+                return
+            agora = time.monotonic()
+            if agora < self._aberto_ate or agora < self._teste_ate:
+                raise CircuitoAbertoError(f"Circuito aberto para {host} (falhas seguidas: {self._falhas_seguidas})")
+            self._teste_ate = agora + self.tempo_aberto
+
+    def registrar_sucesso(self):
+        with self._lock:
+            self._falhas_seguidas = 0
+            self._aberto_ate = None
+            self._teste_ate = 0.0
+
+    def registrar_falha(self):
+        with self._lock:
+            self._falhas_seguidas += 1
+            if self._aberto_ate is not None or self._falhas_seguidas >= self.limite_falhas:
+                self._aberto_ate = time.monotonic() + self.tempo_aberto
+            self._teste_ate = 0.0
+
+
+class OrcamentoNovasTentativas:
+    """
+    Orçamento GLOBAL de novas tentativas: cada requisição feita libera
+    `proporcao` de uma nova tentativa, além de uma reserva fixa `minimo`.
+    Quando todos os hosts estão falhando, impede que as novas tentativas
+    multipliquem o tráfego (e o tempo de execução).
+    """
+
+    def __init__(self, proporcao: float, minimo: int):
+        self.proporcao = float(proporcao)
+        self.minimo = int(minimo)
+        self._requisicoes = 0
+        self._novas_tentativas = 0
+        self._lock = threading.Lock()
+
+    def registrar_requisicao(self):
+        with self._lock:
+            self._requisicoes += 1
+
+    def consumir(self) -> bool:
+        """Reserva uma nova tentativa. Retorna False se o orçamento acabou."""
+        with self._lock:
+            if self._novas_tentativas >= self.minimo + self.proporcao * self._requisicoes:
+                return False
+            self._novas_tentativas += 1
+            return True
+
+
+_disjuntores_por_host = {}
+_orcamento_novas_tentativas: Optional[OrcamentoNovasTentativas] = None
+
+def obter_disjuntor_do_host(url: str) -> DisjuntorHost:
+    """Retorna (criando se necessário) o circuit breaker do host da URL."""
+    host = urlsplit(url).netloc
+    with _lock_motor_http:
+        if host not in _disjuntores_por_host:
+            _disjuntores_por_host[host] = DisjuntorHost(FALHAS_PARA_ABRIR_CIRCUITO, TEMPO_CIRCUITO_ABERTO)
+        return _disjuntores_por_host[host]
+
+def obter_orcamento_novas_tentativas() -> OrcamentoNovasTentativas:
+    global _orcamento_novas_tentativas
+    with _lock_motor_http:
+        if _orcamento_novas_tentativas is None:
+            _orcamento_novas_tentativas = OrcamentoNovasTentativas(ORCAMENTO_NOVAS_TENTATIVAS, MINIMO_NOVAS_TENTATIVAS)
+        return _orcamento_novas_tentativas
+
+def ler_retry_after(response: requests.Response) -> Optional[float]:
+    """Segundos pedidos pelo cabeçalho Retry-After (número ou data HTTP). None se ausente/inválido."""
+    valor = response.headers.get('Retry-After')
+    if not valor:
+        return None
+    valor = valor.strip()
+    if valor.isdigit():
+        return float(valor)
     try:
-        conn = sqlite3.connect(DB_FILE)
-        cursor = conn.cursor()
-        
-        # Cria a tabela de status se ela não existir
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS status_coleta (
-                chave TEXT PRIMARY KEY,
-                valor INTEGER
-            );
-        """)
-        conn.commit()
-        
-        # Tenta ler o valor
-        cursor.execute("SELECT valor FROM status_coleta WHERE chave = 'ultima_rodada_processada'")
-        resultado = cursor.fetchone()
-        
-        if resultado:
-            return int(resultado[0])
-        else:
-            return 0  # Retorna 0 se nunca foi salvo
-            
-    except sqlite3.Error as e:
-        print(f"❌ Erro ao ler a última rodada salva: {e}")
-        return 0
-    finally:
-        if conn:
-            conn.close()
+        instante = parsedate_to_datetime(valor)
+    except (TypeError, ValueError):
+        return None
+    if instante.tzinfo is None:
+        instante = instante.replace(tzinfo=timezone.utc)
+    return max(0.0, (instante - datetime.now(timezone.utc)).total_seconds())
 
-def salvar_ultima_rodada_processada(rodada: int):
+def calcular_backoff(tentativa: int) -> float:
+    """Backoff exponencial com 'full jitter': sorteio entre 0 e base * 2^(tentativa-1), limitado ao teto."""
+    return random.uniform(0, min(BACKOFF_MAXIMO_HTTP, BACKOFF_BASE_HTTP * 2 ** (tentativa - 1)))
+
+def decidir_nova_tentativa(url: str, tentativa: int, response: Optional[requests.Response] = None,
+                           erro: Optional[Exception] = None) -> Optional[float]:
     """
-    Salva o número da rodada processada no banco de dados.
-    
+    Avalia o resultado de uma tentativa e atualiza o limitador e o circuit breaker do host.
+
     Args:
-        rodada (int): O número da rodada que foi salva com sucesso.
+        url (str): URL requisitada.
+        tentativa (int): Número da tentativa que acabou de terminar (começa em 1).
+        response: Resposta recebida (None se houve erro de rede).
+        erro: Erro de rede/timeout da tentativa (None se houve resposta).
+
+    Retorna:
+        float | None: Segundos a esperar antes da próxima tentativa, ou None se
+        não deve haver nova tentativa (sucesso, erro definitivo, limite de
+        tentativas, Retry-After longo demais ou orçamento global esgotado).
+    """
+    balde = obter_balde_do_host(url)
+    disjuntor = obter_disjuntor_do_host(url)
+    status = response.status_code if response is not None else None
+
+    if erro is None and status not in STATUS_COM_NOVA_TENTATIVA:
+        # Sucesso ou erro definitivo (404 etc.): o host está respondendo normalmente
+        disjuntor.registrar_sucesso()
+        balde.recuperar_taxa()
+        return None
+
+    espera = calcular_backoff(tentativa)
+    if status == 429:
+        # Throttling não indica host fora do ar: não conta para o circuit breaker,
+        # mas desacelera TODAS as requisições para o host (até o Retry-After, se houver).
+        disjuntor.registrar_sucesso()
+        retry_after = ler_retry_after(response)
+        if retry_after is not None:
+            if retry_after > RETRY_AFTER_MAXIMO_HTTP:
+                balde.reduzir_taxa()
+                return None
+            espera = retry_after + random.uniform(0, BACKOFF_BASE_HTTP)
+        balde.reduzir_taxa(pausa=retry_after or 0.0)
+    else:
+        disjuntor.registrar_falha()
+
+    if tentativa >= MAX_TENTATIVAS_HTTP or not obter_orcamento_novas_tentativas().consumir():
+        return None
+    return espera
+
+def _resultado_final(response: Optional[requests.Response], erro: Optional[Exception]) -> requests.Response:
+    """Levanta o erro da última tentativa (rede ou status HTTP) ou devolve a resposta."""
+    if erro is not None:
+        raise erro
+    response.raise_for_status()
+    return response
+
+# ------------------------------------------------------------------------------
+# Cache HTTP em disco (ETag / Last-Modified + hash do conteúdo)
+# ------------------------------------------------------------------------------
+
+class CacheHTTP:
+    """
+    Cache em disco das respostas GET, indexado pela URL.
+
+    Para cada URL guarda o corpo (gzip), o ETag/Last-Modified e o SHA-256 do
+    conteúdo. Nas próximas buscas envia `If-None-Match`/`If-Modified-Since`;
+    um 304 (ou um 200 com o mesmo hash) marca a URL como INALTERADA nesta
+    execução, permitindo pular o reprocessamento e as escritas no banco.
+    Também guarda resultados derivados do conteúdo (ex.: a tabela já parseada),
+    descartados automaticamente quando o hash muda.
+    """
+
+    def __init__(self, pasta: str):
+        self.pasta = pasta
+        self._arquivo_indice = os.path.join(pasta, 'indice.json')
+        self._lock = threading.Lock()
+        self._inalteradas = set()
+        os.makedirs(pasta, exist_ok=True)
+        try:
+            with open(self._arquivo_indice, 'r', encoding='utf-8') as f:
+                self._indice = json.load(f)
+        except (OSError, ValueError):
+            self._indice = {}
+
+    def _arquivo_corpo(self, url: str) -> str:
+        return os.path.join(self.pasta, hashlib.sha256(url.encode('utf-8')).hexdigest()[:32] + '.gz')
+
+    def _salvar_indice(self):
+        temporario = self._arquivo_indice + '.tmp'
+        with open(temporario, 'w', encoding='utf-8') as f:
+            json.dump(self._indice, f, ensure_ascii=False, sort_keys=True, indent=1)
+        os.replace(temporario, self._arquivo_indice)
+
+    def cabecalhos_condicionais(self, url: str) -> dict:
+        """Cabeçalhos If-None-Match/If-Modified-Since para a URL (vazio se não houver cache)."""
+        with self._lock:
+            entrada = self._indice.get(url)
+        if not entrada or not os.path.exists(self._arquivo_corpo(url)):
+            return {}
+        cabecalhos = {}
+        if entrada.get('etag'):
+            cabecalhos['If-None-Match'] = entrada['etag']
+        if entrada.get('last_modified'):
+            cabecalhos['If-Modified-Since'] = entrada['last_modified']
+        return cabecalhos
+
+    def registrar(self, url: str, response: requests.Response):
+        """
+        Atualiza o cache com a resposta recebida. Em caso de 304, preenche a
+        resposta com o corpo guardado (assim quem chamou pode usar .content/.json()).
+        """
+        if response.status_code == 304:
+            with gzip.open(self._arquivo_corpo(url), 'rb') as f:
+                response._content = f.read()
+            with self._lock:
+                self._inalteradas.add(url)
+            return
+        if response.status_code != 200:
+            return
+
+        conteudo = response.content
+        hash_conteudo = hashlib.sha256(conteudo).hexdigest()
+        with self._lock:
+            anterior = self._indice.get(url, {})
+            inalterado = anterior.get('hash') == hash_conteudo
+            if inalterado:
+                self._inalteradas.add(url)
+            else:
+                self._inalteradas.discard(url)
+                with gzip.open(self._arquivo_corpo(url), 'wb') as f:
+                    f.write(conteudo)
+            self._indice[url] = {
+                'etag': response.headers.get('ETag'),
+                'last_modified': response.headers.get('Last-Modified'),
+                'hash': hash_conteudo,
+                'atualizado_em': datetime.now().isoformat(timespec='seconds'),
+                'derivados': anterior.get('derivados', {}) if inalterado else {},
+            }
+            self._salvar_indice()
+
+    def inalterado(self, url: str) -> bool:
+        """True se, nesta execução, a URL respondeu 304 ou devolveu o mesmo conteúdo da última vez."""
+        with self._lock:
+            return url in self._inalteradas
+
+    def obter_derivado(self, url: str, nome: str):
+        """Resultado derivado guardado para o conteúdo ATUAL da URL (None se não houver)."""
+        with self._lock:
+            return self._indice.get(url, {}).get('derivados', {}).get(nome)
+
+    def guardar_derivado(self, url: str, nome: str, valor):
+        """Guarda um resultado derivado (serializável em JSON) do conteúdo atual da URL."""
+        with self._lock:
+            if url in self._indice:
+                self._indice[url].setdefault('derivados', {})[nome] = valor
+                self._salvar_indice()
+
+
+_cache_http: Optional[CacheHTTP] = None
+
+def obter_cache_http() -> Optional[CacheHTTP]:
+    """Cache HTTP do processo (None se USAR_CACHE_HTTP estiver desligado)."""
+    global _cache_http
+    if not USAR_CACHE_HTTP:
+        return None
+    with _lock_motor_http:
+        if _cache_http is None or _cache_http.pasta != PASTA_CACHE_HTTP:
+            _cache_http = CacheHTTP(PASTA_CACHE_HTTP)
+        return _cache_http
+
+def http_get(url: str, timeout: Optional[float] = None) -> requests.Response:
     """
-    conn: Optional[sqlite3.Connection] = None
+    GET através da sessão compartilhada, respeitando o limite de taxa do host e
+    a política de novas tentativas (Retry-After, backoff com jitter, circuit breaker).
+    Lança exceção (requests.HTTPError, erro de rede ou CircuitoAbertoError) se a
+    resposta final não for de sucesso.
+    """
+    timeout = timeout or TIMEOUT_REQUISICAO_HTTP
+    tentativa = 1
+    while True:
+        obter_disjuntor_do_host(url).liberar(urlsplit(url).netloc)
+        obter_balde_do_host(url).adquirir()
+        response, erro = _tentar_requisicao(url, timeout)
+        espera = decidir_nova_tentativa(url, tentativa, response, erro)
+        if espera is None:
+            return _resultado_final(response, erro)
+        time.sleep(espera)
+        tentativa += 1
+
+def _tentar_requisicao(url: str, timeout: float, usar_cache: bool = True):
+    """Uma tentativa de GET. Retorna (response, None) ou (None, erro) para erros de rede passíveis de nova tentativa."""
+    obter_orcamento_novas_tentativas().registrar_requisicao()
     try:
-        conn = sqlite3.connect(DB_FILE)
-        cursor = conn.cursor()
-        
-        # Usa INSERT OR REPLACE para garantir que sempre haja apenas uma entrada
-        cursor.execute("""
-            INSERT OR REPLACE INTO status_coleta (chave, valor) 
-            VALUES (?, ?);
-        """, ('ultima_rodada_processada', rodada))
-        
-        conn.commit()
-        print(f"✅ Status: Rodada **{rodada}** salva com sucesso como a última rodada processada.")
-        
-    except sqlite3.Error as e:
-        print(f"❌ Erro ao salvar a última rodada processada: {e}")
-    finally:
-        if conn:
-            conn.close()
-def criar_banco_de_dados():
-    # Supondo que DB_FOLDER_PATH e DB_FILE estejam definidos no escopo global/do módulo
-    # Se não estiverem, você precisará defini-los ou passá-los como argumentos.
+        return _requisitar_na_sessao(url, timeout, usar_cache), None
+    except ERROS_COM_NOVA_TENTATIVA as e:
+        return None, e
+
+def _requisitar_na_sessao(url: str, timeout: float, usar_cache: bool = True) -> requests.Response:
+    """
+    Executa UMA tentativa de GET bloqueante na sessão compartilhada (o token do
+    limitador já deve ter sido consumido), passando pelo cache HTTP em disco quando
+    ativo (e `usar_cache`). Respostas com status passível de nova tentativa (429/5xx)
+    voltam sem levantar exceção, para a política de novas tentativas decidir o que fazer.
+    """
+    sessao = obter_sessao_http()
+    cache = obter_cache_http() if usar_cache else None
+    cabecalhos = cache.cabecalhos_condicionais(url) if cache else {}
+    # No modo reprodução a requisição vai para o servidor local com as respostas gravadas
+    url_efetiva = _servidor_reproducao.url_local(url) if _servidor_reproducao else url
+    response = sessao.get(url_efetiva, timeout=timeout, headers=cabecalhos)
+    if response.status_code in STATUS_COM_NOVA_TENTATIVA:
+        return response
+    response.raise_for_status()
+    if cache:
+        cache.registrar(url, response)
+    if _gravador:
+        _gravador.registrar_http(url, response)
+    return response
+
+def montar_url_rodada_cbf(id_competicao, rodada: int) -> str:
+    return f"{URL_BASE_CBF}/api/proxy?path=/jogos/campeonato/{id_competicao}/rodada/{rodada}/fase"
+
+def montar_url_classificacao_cbf(ano_competicao, caminho_tabela: Optional[str] = None) -> str:
+    return f"{URL_BASE_CBF}/futebol-brasileiro/tabelas/{caminho_tabela or CAMINHO_TABELA_CBF}/{ano_competicao}"
+
+# ------------------------------------------------------------------------------
+# Camada asyncio: várias fontes HTTP em paralelo, com concorrência limitada
+# ------------------------------------------------------------------------------
+# O `requests` é bloqueante, então cada GET roda num pool de threads dedicado
+# enquanto o event loop coordena limite de concorrência, timeouts e cancelamento.
+
+_executor_http: Optional[ThreadPoolExecutor] = None
+_semaforos_por_loop = weakref.WeakKeyDictionary()
+
+def obter_executor_http() -> ThreadPoolExecutor:
+    global _executor_http
+    with _lock_motor_http:
+        if _executor_http is None:
+            _executor_http = ThreadPoolExecutor(max_workers=MAX_CONEXOES_HTTP, thread_name_prefix='http')
+        return _executor_http
+
+def _semaforo_http() -> asyncio.Semaphore:
+    """Semáforo global de requisições do event loop em execução (limita a concorrência total)."""
+    loop = asyncio.get_running_loop()
+    if loop not in _semaforos_por_loop:
+        _semaforos_por_loop[loop] = asyncio.Semaphore(MAX_CONEXOES_HTTP)
+    return _semaforos_por_loop[loop]
+
+async def http_get_async(url: str, timeout: Optional[float] = None, timeout_total: Optional[float] = None,
+                         usar_cache: bool = True) -> requests.Response:
+    """
+    Versão assíncrona do http_get.
+
+    Args:
+        url (str): Endereço a buscar.
+        timeout (float): Timeout de conexão/leitura repassado ao `requests`
+            (padrão: TIMEOUT_REQUISICAO_HTTP).
+        timeout_total (float): Prazo máximo da requisição inteira, incluindo a espera no
+            limitador e as novas tentativas (padrão: TIMEOUT_TOTAL_REQUISICAO_HTTP).
+            Estourado o prazo, levanta asyncio.TimeoutError.
+        usar_cache (bool): False para não passar pelo cache HTTP em disco (ex.: imagens,
+            que já têm o seu próprio controle em atualizar_imagens_locais).
+
+    Durante o backoff entre tentativas a vaga do semáforo é liberada, para que
+    as outras requisições continuem andando. Se a tarefa for cancelada, o
+    resultado da thread em andamento é descartado.
+    """
+    timeout = timeout or TIMEOUT_REQUISICAO_HTTP
+    timeout_total = timeout_total or TIMEOUT_TOTAL_REQUISICAO_HTTP
+
+    async def _executar():
+        loop = asyncio.get_running_loop()
+        tentativa = 1
+        while True:
+            async with _semaforo_http():
+                obter_disjuntor_do_host(url).liberar(urlsplit(url).netloc)
+                await obter_balde_do_host(url).adquirir_async()
+                response, erro = await loop.run_in_executor(obter_executor_http(), _tentar_requisicao, url, timeout, usar_cache)
+            espera = decidir_nova_tentativa(url, tentativa, response, erro)
+            if espera is None:
+                return _resultado_final(response, erro)
+            await asyncio.sleep(espera)
+            tentativa += 1
+    return await asyncio.wait_for(_executar(), timeout=timeout_total)
+
+async def buscar_rodadas_async(id_competicao, rodadas):
+    """
+    Busca o JSON de várias rodadas da API da CBF de forma concorrente.
+
+    Retorna:
+        dict: {rodada: dados_api} em ordem crescente de rodada. Rodadas com erro
+              ficam com valor None (o erro é impresso).
+    """
+    rodadas = sorted(set(rodadas))
+
+    async def _buscar(rodada):
+        response = await http_get_async(montar_url_rodada_cbf(id_competicao, rodada))
+        return response.json()
+
+    # return_exceptions=True: a falha de uma rodada não cancela as demais
+    respostas = await asyncio.gather(*(_buscar(rodada) for rodada in rodadas), return_exceptions=True)
+
+    # A junção é feita na ordem das rodadas (e não na ordem de chegada) para ser determinística
+    resultados = {}
+    for rodada, resposta in zip(rodadas, respostas):
+        if isinstance(resposta, BaseException):
+            if isinstance(resposta, asyncio.CancelledError):
+                raise resposta
+            descricao = 'tempo esgotado' if isinstance(resposta, asyncio.TimeoutError) else resposta
+            print(f"   > Erro ao buscar rodada {rodada}: {descricao}. "
+                  f"Será usada a versão salva no banco, se houver.")
+            resultados[rodada] = None
+        else:
+            resultados[rodada] = resposta
+    return resultados
+
+async def buscar_html_classificacao_async(ano_competicao, caminho_tabela: Optional[str] = None):
+    """Baixa o HTML da tabela de classificação da CBF. Retorna None em caso de erro."""
     try:
-        # Tenta simular a definição se as variáveis não existirem (apenas para este bloco)
-        DB_FOLDER_PATH = "database" 
-        DB_FILE = os.path.join(DB_FOLDER_PATH, "brasileirao.db")
-    except NameError:
-        pass # Ignora se já estiverem definidas
-    
-    os.makedirs(DB_FOLDER_PATH, exist_ok=True)
-    conn = sqlite3.connect(DB_FILE)
-    cursor = conn.cursor()
-    
-    # 1. DROP NAS TABELAS ANTIGAS/REMOVIDAS (Para limpar a estrutura anterior)
-    cursor.execute("DROP TABLE IF EXISTS escalacoes")
-    cursor.execute("DROP TABLE IF EXISTS atletas")
-    
-    # DROP NAS TABELAS EXISTENTES (Para garantir que o schema é o novo)
-    cursor.execute("DROP TABLE IF EXISTS elenco")
-    cursor.execute("DROP TABLE IF EXISTS partidas_elenco")
-    cursor.execute("DROP TABLE IF EXISTS times")
-    cursor.execute("DROP TABLE IF EXISTS jogos_finalizados")
-    cursor.execute("DROP TABLE IF EXISTS partidas")
-    cursor.execute("DROP TABLE IF EXISTS estatisticas_time")
-    
-    # 2. CRIAÇÃO DAS TABELAS BASE
-    
-    # Tabela TIMES (id é o ID CBF)
-    cursor.execute('CREATE TABLE IF NOT EXISTS times (id INTEGER PRIMARY KEY, nome TEXT NOT NULL UNIQUE, url_escudo TEXT, nome_curto TEXT)')
-    
-    # Tabela ELENCO (Novo Cadastro Mestre de Jogadores)
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS elenco (
-            id_jogador INTEGER PRIMARY KEY, -- Novo ID único global do jogador
-            id_time INTEGER NOT NULL,      -- ID do time (Chave estrangeira)
-            nome_jogador TEXT NOT NULL,
-            numero TEXT,
-            posicao TEXT,                  -- Posição principal do jogador (Ex: ZAGUEIRO, MEIA, ATACANTE)
-            url_foto TEXT,
-            UNIQUE(id_time, nome_jogador), -- Garante unicidade do jogador DENTRO DO TIME
-            FOREIGN KEY (id_time) REFERENCES times (id)
-        )
-    ''')
-    
-    # Tabela ATLETAS (Mantida para dados de Cartões/Suspensão da API CBF)
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS atletas (
-            id INTEGER PRIMARY KEY, 
-            apelido TEXT NOT NULL, 
-            cartoes_amarelos INTEGER DEFAULT 0, 
-            cartoes_vermelhos INTEGER DEFAULT 0, 
-            rodada_ultimo_vermelho INTEGER DEFAULT 0, 
-            rodada_suspensao_amarelo INTEGER DEFAULT 0, 
-            time_id INTEGER, 
-            FOREIGN KEY (time_id) REFERENCES times (id)
-        )
-    ''')
+        response = await http_get_async(montar_url_classificacao_cbf(ano_competicao, caminho_tabela))
+        return response.content
+    except Exception as e:
+        descricao = 'tempo esgotado' if isinstance(e, asyncio.TimeoutError) else e
+        print(f"   > Erro ao baixar a tabela de classificação da CBF: {descricao}")
+        return None
 
-    # Tabela JOGOS FINALIZADOS
-    cursor.execute('''CREATE TABLE IF NOT EXISTS jogos_finalizados (id_jogo INTEGER PRIMARY KEY, rodada INTEGER NOT NULL)''')
-    
-    # Tabela PARTIDAS (ID de jogo é o ID CBF, referenciado por ID de time)
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS partidas (
-            id_jogo INTEGER PRIMARY KEY, 
-            rodada INTEGER NOT NULL, 
-            data TEXT, hora TEXT, local TEXT,
-            mandante_id INTEGER, 
-            mandante_url_escudo TEXT, 
-            mandante_gols TEXT, 
-            mandante_formacao TEXT,
-            visitante_id INTEGER, 
-            visitante_url_escudo TEXT, 
-            visitante_gols TEXT, 
-            visitante_formacao TEXT,
-            FOREIGN KEY (mandante_id) REFERENCES times (id),
-            FOREIGN KEY (visitante_id) REFERENCES times (id)
-        )
-    ''')
-    
-    # Tabela ESTATISTICAS_TIME
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS estatisticas_time (
-            time_id INTEGER PRIMARY KEY, 
-            posicao INTEGER, 
-            pontos INTEGER, 
-            ultimos_jogos TEXT,
-            media_cartoes_amarelos REAL,
-            total_cartoes_vermelhos INTEGER, 
-            media_escanteios REAL,
-            FOREIGN KEY (time_id)
-            REFERENCES times (id)
-        )
-    ''')
-    
-    # Tabela de LIGAÇÃO PARTIDAS_ELENCO (Mapeia qual jogador jogou em qual jogo)
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS partidas_elenco (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            jogo_id INTEGER NOT NULL,
-            id_time INTEGER NOT NULL,              -- Para saber de qual time a escalação pertence
-            id_jogador INTEGER NOT NULL,           -- Chave para o jogador no ELENCO
-            papel TEXT NOT NULL,                   -- TITULAR, RESERVA, AUSENTE
-            pos_x REAL,                            -- Posição X (apenas se titular)
-            pos_y REAL,                            -- Posição Y (apenas se titular)
-            motivo TEXT,                           -- Lesão/Suspensão (apenas se AUSENTE)
-            UNIQUE(jogo_id, id_time, id_jogador),  -- Garante que o jogador só aparece uma vez por time/jogo
-            FOREIGN KEY (jogo_id) REFERENCES partidas (id_jogo),
-            FOREIGN KEY (id_time) REFERENCES times (id),
-            FOREIGN KEY (id_jogador) REFERENCES elenco (id_jogador)
+def executar_coleta_http(*corotinas, timeout_total: Optional[float] = None):
+    """
+    Wrapper síncrono da camada asyncio: executa as corotinas JUNTAS em um event
+    loop próprio e devolve os resultados na mesma ordem em que foram passadas.
+    Se `timeout_total` estourar, todas as requisições pendentes são canceladas
+    e asyncio.TimeoutError é propagado.
+
+    Ex.: dados_rodadas, html = executar_coleta_http(buscar_rodadas_async(...), buscar_html_classificacao_async(...))
+    """
+    async def _todas():
+        return await asyncio.wait_for(asyncio.gather(*corotinas), timeout=timeout_total)
+    return asyncio.run(_todas())
+
+def iniciar_coleta_http_em_segundo_plano(*corotinas, timeout_total: Optional[float] = None) -> Future:
+    """
+    Igual a executar_coleta_http, mas roda em uma thread separada e devolve um
+    Future imediatamente, permitindo sobrepor a coleta HTTP às etapas do Selenium.
+    Use `.result()` para obter a lista de resultados.
+    """
+    executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='coleta-http')
+    futuro = executor.submit(executar_coleta_http, *corotinas, timeout_total=timeout_total)
+    executor.shutdown(wait=False)
+    return futuro
+
+def buscar_rodadas_concorrente(id_competicao, rodadas):
+    """Versão síncrona de buscar_rodadas_async (mesmo retorno: {rodada: dados_api ou None})."""
+    return executar_coleta_http(buscar_rodadas_async(id_competicao, rodadas))[0]
+
+# ==============================================================================
+# GRAVAÇÃO / REPRODUÇÃO (execução offline e reprodutível do pipeline)
+# ==============================================================================
+# - Modo GRAVAR: toda resposta HTTP e todo `page_source` lido do Selenium são
+#   guardados em um arquivo .zip comprimido. Páginas consultadas só via
+#   find_element(s) (ex.: lista de jogos) também ganham um snapshot do DOM.
+# - Modo REPRODUZIR: as respostas HTTP são servidas por um servidor local
+#   (127.0.0.1) e o Chrome é substituído por um driver falso que devolve os
+#   snapshots gravados, avaliando os XPaths com o lxml. As pausas fixas das
+#   etapas de Selenium (pausar) viram no-op.
+#
+# Uso: python cbf_scraper.py --gravar gravacao.zip   /   --reproduzir gravacao.zip
+
+VERSAO_FORMATO_GRAVACAO = 1
+
+class GravadorExecucao:
+    """Acumula respostas HTTP e snapshots de página e grava tudo num .zip ao final."""
+
+    def __init__(self, arquivo: str):
+        self.arquivo = arquivo
+        self._lock = threading.Lock()
+        self._http = []      # [(url, status, content_type, corpo_bytes)]
+        self._paginas = []   # [(url, tipo, html)] - tipo: 'page_source' ou 'dom'
+
+    def registrar_http(self, url: str, response: requests.Response):
+        with self._lock:
+            self._http.append((url, 200 if response.status_code == 304 else response.status_code,
+                               response.headers.get('Content-Type', ''), response.content))
+
+    def registrar_pagina(self, url: str, html: str, tipo: str = 'page_source'):
+        with self._lock:
+            self._paginas.append((url, tipo, html))
+
+    def salvar(self):
+        pasta = os.path.dirname(os.path.abspath(self.arquivo))
+        os.makedirs(pasta, exist_ok=True)
+        manifesto = {'versao': VERSAO_FORMATO_GRAVACAO, 'criado_em': datetime.now().isoformat(timespec='seconds'), 'http': [], 'paginas': []}
+        with self._lock, zipfile.ZipFile(self.arquivo, 'w', compression=zipfile.ZIP_DEFLATED, compresslevel=9) as zf:
+            for n, (url, status, content_type, corpo) in enumerate(self._http):
+                nome = f"http/{n:05d}.bin"
+                zf.writestr(nome, corpo)
+                manifesto['http'].append({'url': url, 'status': status, 'content_type': content_type, 'arquivo': nome})
+            for n, (url, tipo, html) in enumerate(self._paginas):
+                nome = f"paginas/{n:05d}.html"
+                zf.writestr(nome, html)
+                manifesto['paginas'].append({'url': url, 'tipo': tipo, 'arquivo': nome})
+            zf.writestr('manifesto.json', json.dumps(manifesto, ensure_ascii=False, indent=1))
+        print(f"💾 Gravação salva em {self.arquivo}: {len(self._http)} respostas HTTP e {len(self._paginas)} snapshots de página.")
+
+
+class GravacaoExecucao:
+    """Conteúdo de um arquivo de gravação, pronto para ser reproduzido."""
+
+    def __init__(self, arquivo: str):
+        self.arquivo = arquivo
+        self.http = {}      # url -> [(status, content_type, corpo)] na ordem gravada
+        self.paginas = {}   # url -> [html] dos page_source, na ordem gravada
+        self.doms = {}      # url -> [html] dos snapshots de DOM, na ordem gravada
+        with zipfile.ZipFile(arquivo) as zf:
+            manifesto = json.loads(zf.read('manifesto.json'))
+            for item in manifesto['http']:
+                self.http.setdefault(item['url'], []).append((item['status'], item['content_type'], zf.read(item['arquivo'])))
+            for item in manifesto['paginas']:
+                destino = self.doms if item.get('tipo') == 'dom' else self.paginas
+                destino.setdefault(item['url'], []).append(zf.read(item['arquivo']).decode('utf-8'))
+        self._proxima_http = {}
+        self._lock = threading.Lock()
+
+    def proxima_resposta(self, url: str):
+        """Próxima resposta gravada para a URL (repete a última quando acabam). None se nunca foi gravada."""
+        with self._lock:
+            respostas = self.http.get(url)
+            if not respostas:
+                return None
+            indice = self._proxima_http.get(url, 0)
+            self._proxima_http[url] = indice + 1
+            return respostas[min(indice, len(respostas) - 1)]
+
+
+class ServidorReproducao:
+    """Servidor HTTP local que devolve as respostas gravadas. A URL original vai codificada no caminho."""
+
+    def __init__(self, gravacao: GravacaoExecucao):
+        self.gravacao = gravacao
+        gravacao_servida = gravacao
+
+        class _Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                resposta = gravacao_servida.proxima_resposta(unquote(self.path.lstrip('/')))
+                status, content_type, corpo = resposta if resposta else (404, 'text/plain', b'nao gravado')
+                self.send_response(status)
+                self.send_header('Content-Type', content_type or 'application/octet-stream')
+                self.send_header('Content-Length', str(len(corpo)))
+                self.end_headers()
+                self.wfile.write(corpo)
+
+            def log_message(self, *args):
+                pass
+
+        self._servidor = ThreadingHTTPServer(('127.0.0.1', 0), _Handler)
+        self._servidor.daemon_threads = True
+        threading.Thread(target=self._servidor.serve_forever, daemon=True, name='servidor-reproducao').start()
+
+    def url_local(self, url: str) -> str:
+        host, porta = self._servidor.server_address[:2]
+        return f"http://{host}:{porta}/{quote(url, safe='')}"
+
+    def encerrar(self):
+        self._servidor.shutdown()
+        self._servidor.server_close()
+
+
+class DriverGravador:
+    """
+    Envolve o Chrome real e grava cada leitura de `page_source` (associada à URL
+    aberta com get()). Após get()/execute_script(), a primeira busca de elementos
+    bem-sucedida também grava um snapshot do DOM.
+    """
+
+    def __init__(self, driver, gravador: GravadorExecucao):
+        self._driver = driver
+        self._gravador = gravador
+        self._url_aberta = None
+        self._dom_pendente = False
+
+    def get(self, url):
+        self._url_aberta = url
+        self._dom_pendente = True
+        return self._driver.get(url)
+
+    def execute_script(self, script, *args):
+        self._dom_pendente = True
+        return self._driver.execute_script(script, *args)
+
+    def _gravar_dom_se_pendente(self):
+        if self._dom_pendente:
+            self._dom_pendente = False
+            self._gravador.registrar_pagina(self._url_aberta, self._driver.page_source, tipo='dom')
+
+    def find_element(self, by, valor):
+        elemento = self._driver.find_element(by, valor)
+        self._gravar_dom_se_pendente()
+        return elemento
+
+    def find_elements(self, by, valor):
+        elementos = self._driver.find_elements(by, valor)
+        if elementos:
+            self._gravar_dom_se_pendente()
+        return elementos
+
+    @property
+    def page_source(self):
+        html = self._driver.page_source
+        self._gravador.registrar_pagina(self._url_aberta, html)
+        return html
+
+    def __getattr__(self, nome):
+        return getattr(self._driver, nome)
+
+
+class ElementoFalso:
+    """Elemento do DriverFalso: um nó do lxml com a parte da API do WebElement usada pelo robô."""
+
+    def __init__(self, no, driver):
+        self._no = no
+        self._driver = driver
+
+    @property
+    def text(self):
+        return ' '.join(self._no.text_content().split())
+
+    def get_attribute(self, nome):
+        valor = self._no.get(nome)
+        if nome in ('href', 'src') and valor:
+            return urljoin(self._driver.current_url or '', valor)
+        return valor
+
+    def find_element(self, by, valor):
+        return _primeiro_elemento(self.find_elements(by, valor), by, valor)
+
+    def find_elements(self, by, valor):
+        return [ElementoFalso(no, self._driver) for no in self._no.xpath(_xpath_do_localizador(by, valor))]
+
+    def click(self):
+        pass
+
+    def is_displayed(self):
+        return True
+
+    def is_enabled(self):
+        return True
+
+
+# Seletores CSS simples: compostos de tag, #id, .classe, [atributo] e [atributo=valor],
+# ligados por espaço (descendente) ou '>' (filho). Pseudo-classes, ',' '+' e '~' não.
+_COMBINADOR_CSS = re.compile(r"\s*>\s*|\s+")
+_COMPOSTO_CSS = re.compile(r"""([\w-]+|\*)?((?:[#.][\w-]+|\[[\w-]+(?:=(?:"[^"]*"|'[^']*'|[\w-]+))?\])*)""")
+_PARTE_CSS = re.compile(r"""([#.])([\w-]+)|\[([\w-]+)(?:=(?:"([^"]*)"|'([^']*)'|([\w-]+)))?\]""")
+LOCALIZADORES_REPRODUCAO = ('xpath', 'id', 'name', 'class name', 'tag name', 'link text', 'partial link text', 'css selector')
+
+def _literal_xpath(texto: str) -> str:
+    """`texto` como literal de XPath 1.0 (que não tem escape de aspas)."""
+    if "'" not in texto:
+        return f"'{texto}'"
+    if '"' not in texto:
+        return f'"{texto}"'
+    return "concat('" + "', \"'\", '".join(texto.split("'")) + "')"
+
+def _condicao_de_classe(classe: str) -> str:
+    return f"contains(concat(' ', normalize-space(@class), ' '), {_literal_xpath(f' {classe} ')})"
+
+def _xpath_do_css(seletor: str) -> str:
+    """XPath (relativo ao nó da busca) de um seletor CSS simples; ValueError se não for suportado."""
+    partes, combinadores, inicio = [], ['.//'], 0
+    for separador in itertools.chain(_COMBINADOR_CSS.finditer(seletor.strip()), [None]):
+        fim = separador.start() if separador else len(seletor.strip())
+        composto = _COMPOSTO_CSS.fullmatch(seletor.strip()[inicio:fim])
+        if not composto or not any(composto.groups()):
+            raise ValueError(f"Seletor CSS '{seletor}' não suportado no modo reprodução "
+                             "(só tag, #id, .classe, [atributo], [atributo=valor], ' ' e '>').")
+        condicoes = []
+        for parte in _PARTE_CSS.finditer(composto.group(2)):
+            tipo, nome, atributo = parte.group(1, 2, 3)
+            valor = next((v for v in parte.group(4, 5, 6) if v is not None), None)
+            if tipo == '#':
+                condicoes.append(f"@id={_literal_xpath(nome)}")
+            elif tipo == '.':
+                condicoes.append(_condicao_de_classe(nome))
+            else:
+                condicoes.append(f"@{atributo}={_literal_xpath(valor)}" if valor is not None else f"@{atributo}")
+        partes.append(f"{composto.group(1) or '*'}{''.join(f'[{condicao}]' for condicao in condicoes)}")
+        if separador:
+            combinadores.append('/' if '>' in separador.group() else '//')
+            inicio = separador.end()
+    return ''.join(combinador + parte for combinador, parte in zip(combinadores, partes))
+
+def _xpath_do_localizador(by, valor) -> str:
+    """
+    XPath equivalente a um localizador do Selenium, avaliado pelo lxml no modo reprodução.
+    Fora By.XPATH, as buscas são relativas ao nó (como find_element de um WebElement).
+    Levanta ValueError para localizadores fora de LOCALIZADORES_REPRODUCAO.
+    """
+    if by == By.XPATH:
+        return valor
+    if by == By.ID:
+        return f".//*[@id={_literal_xpath(valor)}]"
+    if by == By.NAME:
+        return f".//*[@name={_literal_xpath(valor)}]"
+    if by == By.CLASS_NAME:
+        return f".//*[{_condicao_de_classe(valor)}]"
+    if by == By.TAG_NAME:
+        return f".//{valor}"
+    if by == By.LINK_TEXT:
+        return f".//a[normalize-space(.)={_literal_xpath(' '.join(valor.split()))}]"
+    if by == By.PARTIAL_LINK_TEXT:
+        return f".//a[contains(normalize-space(.), {_literal_xpath(' '.join(valor.split()))})]"
+    if by == By.CSS_SELECTOR:
+        return _xpath_do_css(valor)
+    raise ValueError(f"Localizador '{by}' não suportado no modo reprodução "
+                     f"(suportados: {', '.join(LOCALIZADORES_REPRODUCAO)}).")
+
+def _primeiro_elemento(elementos, by, valor):
+    if not elementos:
+        raise NoSuchElementException(f"{by}={valor} (modo reprodução)")
+    return elementos[0]
+
+
+class DriverFalso:
+    """
+    Substituto do Chrome no modo reprodução. Cada get(url) posiciona na fila de
+    snapshots gravados daquela URL; cada leitura de page_source consome o próximo.
+    As buscas de elementos usam o snapshot corrente (o próximo a ser servido) ou,
+    se a página nunca teve page_source lido, o último snapshot de DOM gravado.
+    """
+
+    def __init__(self, gravacao: GravacaoExecucao):
+        self._gravacao = gravacao
+        self.current_url = None
+        self._snapshots = []
+        self._indice = 0
+        self._dom_cache = {}
+
+    def get(self, url):
+        self.current_url = url
+        self._snapshots = self._gravacao.paginas.get(url) or self._gravacao.doms.get(url, [])[-1:]
+        self._indice = 0
+
+    def _html_corrente(self) -> str:
+        if not self._snapshots:
+            return '<html><body></body></html>'
+        return self._snapshots[min(self._indice, len(self._snapshots) - 1)]
+
+    @property
+    def page_source(self):
+        html = self._html_corrente()
+        self._indice += 1
+        return html
+
+    def _dom(self):
+        html = self._html_corrente()
+        chave = id(html)
+        if chave not in self._dom_cache:
+            self._dom_cache = {chave: lxml.html.document_fromstring(html)}
+        return self._dom_cache[chave]
+
+    def find_element(self, by, valor):
+        return _primeiro_elemento(self.find_elements(by, valor), by, valor)
+
+    def find_elements(self, by, valor):
+        return [ElementoFalso(no, self) for no in self._dom().xpath(_xpath_do_localizador(by, valor))]
+
+    def execute_script(self, script, *args):
+        if 'scrollHeight' in script:
+            return 1000  # Altura fixa: o laço de rolagem termina na segunda iteração
+        for argumento in args:
+            if isinstance(argumento, ElementoFalso) and 'click' in script:
+                argumento.click()
+        return None
+
+    def quit(self):
+        pass
+
+
+_gravador: Optional[GravadorExecucao] = None
+_reproducao: Optional[GravacaoExecucao] = None
+_servidor_reproducao: Optional[ServidorReproducao] = None
+
+@contextmanager
+def modo_gravacao_reproducao(arquivo_gravar: Optional[str] = None, arquivo_reproduzir: Optional[str] = None):
+    """
+    Ativa o modo gravação OU reprodução durante o bloco `with` (sem argumentos, não faz nada).
+    Na gravação, a coleta incremental e o cache HTTP são desligados para que o
+    arquivo contenha TODAS as respostas necessárias para uma reprodução a partir do zero.
+    """
+    global _gravador, _reproducao, _servidor_reproducao, MODO_INCREMENTAL, USAR_CACHE_HTTP
+    configuracao_original = (MODO_INCREMENTAL, USAR_CACHE_HTTP)
+    try:
+        if arquivo_gravar:
+            print(f"🎙️ Modo GRAVAÇÃO ativo: {arquivo_gravar}")
+            _gravador = GravadorExecucao(arquivo_gravar)
+            MODO_INCREMENTAL, USAR_CACHE_HTTP = False, False
+        elif arquivo_reproduzir:
+            print(f"▶️ Modo REPRODUÇÃO ativo: {arquivo_reproduzir}")
+            _reproducao = GravacaoExecucao(arquivo_reproduzir)
+            _servidor_reproducao = ServidorReproducao(_reproducao)
+            USAR_CACHE_HTTP = False
+        yield
+    finally:
+        if _gravador:
+            _gravador.salvar()
+        if _servidor_reproducao:
+            _servidor_reproducao.encerrar()
+        _gravador = _reproducao = _servidor_reproducao = None
+        MODO_INCREMENTAL, USAR_CACHE_HTTP = configuracao_original
+
+def pausar(segundos: float):
+    """Pausa fixa das etapas de Selenium (ignorada no modo reprodução, em que a página já está pronta)."""
+    if _reproducao is None:
+        time.sleep(segundos)
+
+# ------------------------------------------------------------------------------
+# Pool de navegadores compartilhado entre as etapas (e competições) de uma execução
+# ------------------------------------------------------------------------------
+# Abrir o Chrome custa alguns segundos por etapa. Dentro de navegador_compartilhado(),
+# criar_driver() empresta um navegador do pool (aberto na primeira vez em que falta
+# um livre, até TAMANHO_POOL_NAVEGADORES) e o quit() das etapas o devolve limpo
+# (cookies, storage e janelas extras descartados): os navegadores só são fechados
+# ao sair do bloco, que imprime o custo de partida e de limpeza de cada etapa.
+
+class DriverCompartilhado:
+    """Driver emprestado por criar_driver dentro de navegador_compartilhado: quit() o devolve ao pool."""
+
+    def __init__(self, driver, pool):
+        self._driver = driver
+        self._pool = pool
+
+    def quit(self):
+        if self._pool is not None:
+            pool, self._pool = self._pool, None
+            pool.devolver(self._driver)
+
+    def __getattr__(self, nome):
+        return getattr(self._driver, nome)
+
+class PoolDeNavegadores:
+    """
+    Navegadores abertos uma vez por execução e emprestados às etapas de Selenium.
+    Abre um navegador novo só quando nenhum está livre e o pool ainda não chegou a
+    `tamanho`; caso contrário, a etapa espera a devolução de um deles. Um navegador
+    cuja limpeza falha (travou ou caiu durante a etapa) é fechado e sai do pool.
+
+    Por etapa, registra: usos, partidas a frio e o tempo gasto abrindo o Chrome,
+    esperando um navegador livre e limpando-o na devolução (ver relatorio).
+    """
+
+    def __init__(self, tamanho: Optional[int] = None):
+        self.tamanho = max(1, tamanho or TAMANHO_POOL_NAVEGADORES)
+        self._livres = []
+        self._abertos = 0
+        self._etapa_do_driver = {}
+        self._tempos = {}
+        self._condicao = threading.Condition()
+
+    def _tempos_da_etapa(self, etapa: str) -> dict:
+        return self._tempos.setdefault(etapa, {'usos': 0, 'partidas': 0, 'partida': 0.0, 'espera': 0.0, 'limpeza': 0.0})
+
+    def emprestar(self, etapa: str) -> DriverCompartilhado:
+        inicio = time.perf_counter()
+        with self._condicao:
+            while not self._livres and self._abertos >= self.tamanho:
+                self._condicao.wait()
+            driver = self._livres.pop() if self._livres else None
+            if driver is None:
+                self._abertos += 1
+            tempos = self._tempos_da_etapa(etapa)
+            tempos['usos'] += 1
+            tempos['espera'] += time.perf_counter() - inicio
+        if driver is None:
+            inicio = time.perf_counter()
+            try:
+                driver = _iniciar_navegador()
+            except Exception:
+                with self._condicao:
+                    self._abertos -= 1
+                    self._condicao.notify()
+                raise
+            with self._condicao:
+                tempos['partidas'] += 1
+                tempos['partida'] += time.perf_counter() - inicio
+        with self._condicao:
+            self._etapa_do_driver[id(driver)] = etapa
+        return DriverCompartilhado(driver, self)
+
+    def devolver(self, driver):
+        with self._condicao:
+            etapa = self._etapa_do_driver.pop(id(driver), None)
+        inicio = time.perf_counter()
+        try:
+            _limpar_navegador(driver)
+            limpo = True
+        except WebDriverException as e:
+            print(f"   > Navegador descartado após a etapa '{etapa}' ({type(e).__name__}); outro será aberto se preciso.")
+            _fechar_navegador(driver)
+            limpo = False
+        with self._condicao:
+            if etapa is not None:
+                self._tempos_da_etapa(etapa)['limpeza'] += time.perf_counter() - inicio
+            if limpo:
+                self._livres.append(driver)
+            else:
+                self._abertos -= 1
+            self._condicao.notify()
+
+    def encerrar(self) -> int:
+        """Fecha os navegadores livres. Retorna quantos foram fechados."""
+        with self._condicao:
+            livres, self._livres = self._livres, []
+            self._abertos -= len(livres)
+        for driver in livres:
+            _fechar_navegador(driver)
+        return len(livres)
+
+    def relatorio(self) -> dict:
+        """{etapa: {'usos', 'partidas', 'partida', 'espera', 'limpeza'}}, tempos em segundos, na ordem do 1º uso."""
+        with self._condicao:
+            return {etapa: dict(tempos) for etapa, tempos in self._tempos.items()}
+
+_pool_navegadores: Optional[PoolDeNavegadores] = None
+
+def _limpar_navegador(driver):
+    """Deixa o navegador como recém-aberto para a próxima etapa: uma janela, sem cookies nem storage, em about:blank."""
+    if isinstance(driver, DriverFalso):
+        return  # O get() da próxima etapa já reposiciona o DriverFalso
+    chrome = getattr(driver, '_driver', driver)  # Sem passar pelo DriverGravador: nada disto entra na gravação
+    janelas = chrome.window_handles
+    for janela in janelas[1:]:
+        chrome.switch_to.window(janela)
+        chrome.close()
+    chrome.switch_to.window(janelas[0])
+    try:
+        chrome.execute_script("window.localStorage.clear(); window.sessionStorage.clear();")
+    except WebDriverException:
+        pass  # Página sem storage acessível (about:blank, data:, erro de carregamento)
+    chrome.delete_all_cookies()
+    chrome.execute_cdp_cmd('Network.clearBrowserCookies', {})  # Cookies de todos os domínios, não só o da página aberta
+    chrome.get('about:blank')
+
+def _fechar_navegador(driver):
+    try:
+        driver.quit()
+    except WebDriverException:
+        pass
+
+@contextmanager
+def navegador_compartilhado(tamanho: Optional[int] = None):
+    """
+    Faz as etapas de Selenium do bloco `with` pegarem emprestados os navegadores de
+    um pool (ver PoolDeNavegadores e criar_driver). Ao sair, fecha os navegadores e
+    imprime o custo de cada etapa. Blocos aninhados usam o pool do bloco externo.
+    """
+    global _pool_navegadores
+    if _pool_navegadores is not None:
+        yield _pool_navegadores
+        return
+    _pool_navegadores = pool = PoolDeNavegadores(tamanho)
+    try:
+        yield pool
+    finally:
+        _pool_navegadores = None
+        fechados = pool.encerrar()
+        imprimir_relatorio_navegadores(pool.relatorio(), fechados)
+
+def imprimir_relatorio_navegadores(relatorio: dict, fechados: int):
+    """Relatório do pool de navegadores: partidas a frio, espera e limpeza por etapa."""
+    if not relatorio:
+        return
+    usos = sum(tempos['usos'] for tempos in relatorio.values())
+    partidas = sum(tempos['partidas'] for tempos in relatorio.values())
+    print(f"🌐 Navegadores: {partidas} abertos para {usos} usos ({usos - partidas} reaproveitados); {fechados} fechados ao final.")
+    for etapa, tempos in relatorio.items():
+        print(f"   > {etapa}: {tempos['usos']} usos, {tempos['partidas']} partidas a frio ({tempos['partida']:.2f} s), "
+              f"espera {tempos['espera']:.2f} s, limpeza {tempos['limpeza']:.2f} s")
+
+def criar_driver(etapa: str = 'selenium'):
+    """
+    Cria o Chrome headless usado pelas etapas de Selenium. No modo gravação o
+    driver é envolvido pelo DriverGravador; no modo reprodução, devolve o DriverFalso.
+    Dentro de navegador_compartilhado(), empresta um navegador do pool em nome de
+    `etapa` (o nome que aparece no relatório); o quit() da etapa o devolve.
+    """
+    if _pool_navegadores is not None:
+        return _pool_navegadores.emprestar(etapa)
+    return _iniciar_navegador()
+
+def _iniciar_navegador():
+    if _reproducao is not None:
+        return DriverFalso(_reproducao)
+    options = webdriver.ChromeOptions()
+    options.add_argument('--headless')
+    options.add_argument('--no-sandbox')
+    chromedriver = resolver_chromedriver()
+    try:
+        driver = webdriver.Chrome(service=ChromeService(chromedriver['caminho']), options=options)
+    except SessionNotCreatedException:
+        # O Chrome foi atualizado desde que o driver do manifesto foi resolvido: resolve de novo, uma vez
+        if chromedriver['origem'] != 'manifesto':
+            raise
+        print("   > O Chrome recusou o chromedriver do manifesto. Resolvendo o driver de novo...")
+        chromedriver = resolver_chromedriver(forcar=True)
+        driver = webdriver.Chrome(service=ChromeService(chromedriver['caminho']), options=options)
+    return DriverGravador(driver, _gravador) if _gravador else driver
+
+# ------------------------------------------------------------------------------
+# Chromedriver resolvido uma vez por processo
+# ------------------------------------------------------------------------------
+# ChromeDriverManager().install() descobre a versão do Chrome, consulta o host de
+# downloads e confere os arquivos a cada chamada. resolver_chromedriver() faz isso
+# uma vez por processo e guarda caminho e versão em um manifesto local, que as
+# execuções seguintes reaproveitam enquanto o binário estiver lá e o manifesto na
+# validade. Com CHROMEDRIVER_FIXO (--chromedriver), usa só aquele binário, sem rede.
+
+_chromedriver_resolvido: Optional[dict] = None
+_lock_chromedriver = threading.Lock()
+
+def versao_do_chromedriver(caminho: str) -> str:
+    """Versão informada pelo binário ('ChromeDriver 120.0.6099.109 (...)' -> '120.0.6099.109'), ou '' se não der para ler."""
+    try:
+        saida = subprocess.run([caminho, '--version'], capture_output=True, text=True, timeout=10).stdout
+    except (OSError, subprocess.SubprocessError):
+        return ''
+    achado = re.search(r'\d+(?:\.\d+)+', saida)
+    return achado.group(0) if achado else ''
+
+def _executavel(caminho) -> bool:
+    return bool(caminho) and os.path.isfile(caminho) and os.access(caminho, os.X_OK)
+
+def ler_manifesto_chromedriver() -> dict:
+    """Entrada do manifesto ({'caminho', 'versao', 'tamanho', 'resolvido_em'}), ou {} se não houver uma válida."""
+    try:
+        with open(ARQUIVO_MANIFESTO_CHROMEDRIVER, 'r', encoding='utf-8') as f:
+            entrada = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    caminho = entrada.get('caminho')
+    if (not _executavel(caminho) or os.path.getsize(caminho) != entrada.get('tamanho')
+            or time.time() - entrada.get('resolvido_em', 0) > VALIDADE_MANIFESTO_CHROMEDRIVER):
+        return {}
+    return entrada
+
+def _gravar_manifesto_chromedriver(entrada: dict):
+    temporario = ARQUIVO_MANIFESTO_CHROMEDRIVER + '.tmp'
+    with open(temporario, 'w', encoding='utf-8') as f:
+        json.dump(entrada, f, ensure_ascii=False, sort_keys=True, indent=1)
+    os.replace(temporario, ARQUIVO_MANIFESTO_CHROMEDRIVER)
+
+def resolver_chromedriver(forcar: bool = False) -> dict:
+    """
+    Chromedriver usado pelos navegadores deste processo, resolvido na primeira chamada.
+
+    Args:
+        forcar (bool): Ignora o que já foi resolvido e o manifesto (ex.: o Chrome
+            foi atualizado e não aceita mais o driver guardado).
+
+    Retorna:
+        dict: {'caminho', 'versao', 'origem'}, em que 'origem' é 'fixo'
+              (CHROMEDRIVER_FIXO), 'manifesto' (resolvido por uma execução anterior)
+              ou 'download' (ChromeDriverManager, e o manifesto é atualizado).
+    """
+    global _chromedriver_resolvido
+    with _lock_chromedriver:
+        if _chromedriver_resolvido is not None and not forcar:
+            return _chromedriver_resolvido
+        if CHROMEDRIVER_FIXO:
+            if not _executavel(CHROMEDRIVER_FIXO):
+                raise FileNotFoundError(f"Chromedriver fixo não encontrado ou sem permissão de execução: {CHROMEDRIVER_FIXO}")
+            resolvido = {'caminho': CHROMEDRIVER_FIXO, 'versao': versao_do_chromedriver(CHROMEDRIVER_FIXO), 'origem': 'fixo'}
+        else:
+            entrada = {} if forcar else ler_manifesto_chromedriver()
+            if entrada:
+                resolvido = {'caminho': entrada['caminho'], 'versao': entrada.get('versao', ''), 'origem': 'manifesto'}
+            else:
+                caminho = ChromeDriverManager().install()
+                resolvido = {'caminho': caminho, 'versao': versao_do_chromedriver(caminho), 'origem': 'download'}
+                _gravar_manifesto_chromedriver({'caminho': caminho, 'versao': resolvido['versao'],
+                                                'tamanho': os.path.getsize(caminho), 'resolvido_em': time.time()})
+        print(f"   > Chromedriver {resolvido['versao'] or '(versão desconhecida)'} ({resolvido['origem']}): {resolvido['caminho']}")
+        _chromedriver_resolvido = resolvido
+        return resolvido
+
+# ==============================================================================
+# FUNÇÕES PLACEHOLDER (Assumidas das Partes não enviadas)
+# ==============================================================================
+
+def calcular_rodada_atual(resumo_rodadas, TOTAL_RODADAS):
+    """
+    Calcula a rodada atual do campeonato com base nos jogos finalizados.
+    A rodada atual é a próxima a ser jogada após a última rodada finalizada.
+
+    Args:
+        resumo_rodadas (dict): {rodada: (jogos, jogos finalizados)}, como devolvido
+            por gravar_rodadas_em_fluxo.
+    """
+    
+    # 1. Encontra a última rodada completamente finalizada
+    rodadas_com_finalizados = [rodada for rodada, (_, finalizados) in resumo_rodadas.items() if finalizados]
+    if rodadas_com_finalizados:
+        rodada_ultima_finalizada = max(rodadas_com_finalizados)
+    else:
+        # Se nenhum jogo finalizado, a rodada inicial é 1
+        return 1
+    
+    # Se já chegamos ao final do campeonato
+    if rodada_ultima_finalizada >= TOTAL_RODADAS:
+        print("⚠️ Campeonato finalizado. Usando a última rodada finalizada.")
+        return TOTAL_RODADAS
+    
+    proxima_rodada = rodada_ultima_finalizada + 1
+
+    # 2. Verificação de partidas restantes na rodada_ultima_finalizada:
+    # Se houver jogos da rodada_ultima_finalizada que AINDA NÃO foram finalizados,
+    # significa que a rodada ainda não terminou, então a rodada ATUAL é a última finalizada.
+    jogos_na_ultima_finalizada, finalizados_na_ultima = resumo_rodadas[rodada_ultima_finalizada]
+
+    # Verifica se todos os jogos dessa rodada foram de fato finalizados
+    if jogos_na_ultima_finalizada != finalizados_na_ultima:
+        # Se os totais não baterem, há jogos faltando, a rodada AINDA NÃO ACABOU.
+        return rodada_ultima_finalizada
+
+    # Se a última rodada finalizada realmente terminou, a próxima rodada é a atual.
+    return proxima_rodada
+
+def ler_ultima_rodada_salva() -> int:
+    """
+    Lê a última rodada de escalações que foi salva com sucesso no banco de dados.
+    
+    Retorna:
+        int: O número da última rodada processada. Retorna 0 se não for encontrado.
+    """
+    try:
+        # A tabela STATUS_COLETA é criada pela migração 001 (criar_banco_de_dados)
+        with usar_conexao() as conn:
+            resultado = conn.execute("SELECT valor FROM status_coleta WHERE chave = 'ultima_rodada_processada'").fetchone()
+        
+        if resultado:
+            return int(resultado[0])
+        else:
+            return 0  # Retorna 0 se nunca foi salvo
+            
+    except sqlite3.Error as e:
+        if _conexao_da_execucao is not None:
+            raise
+        print(f"❌ Erro ao ler a última rodada salva: {e}")
+        return 0
+
+def salvar_ultima_rodada_processada(rodada: int):
+    """
+    Salva o número da rodada processada no banco de dados.
+
+    Chamada dentro da transação da gravação final (main_run), o status só é
+    confirmado junto com os dados; um erro aqui é repassado e desfaz tudo.
+    
+    Args:
+        rodada (int): O número da rodada que foi salva com sucesso.
+    """
+    with usar_conexao() as conn, transacao(conn):
+        # Usa INSERT OR REPLACE para garantir que sempre haja apenas uma entrada
+        conn.execute("""
+            INSERT OR REPLACE INTO status_coleta (chave, valor) 
+            VALUES (?, ?);
+        """, ('ultima_rodada_processada', rodada))
+    print(f"✅ Status: Rodada **{rodada}** registrada como a última rodada processada.")
+
+def ler_ids_elenco_salvos() -> dict:
+    """
+    Lê os IDs já atribuídos no ELENCO, para que um jogador mantenha o mesmo
+    id_jogador entre as execuções (o banco não é mais recriado a cada coleta).
+
+    Retorna:
+        dict: {(id_time, nome_normalizado): id_jogador}. Vazio se não houver nada salvo.
+    """
+    try:
+        with usar_conexao() as conn:
+            linhas = conn.execute("SELECT id_jogador, id_time, nome_jogador FROM elenco").fetchall()
+        return {(id_time, unidecode(nome).lower().strip()): id_jogador for id_jogador, id_time, nome in linhas}
+    except sqlite3.Error as e:
+        if _conexao_da_execucao is not None:
+            raise
+        print(f"❌ Erro ao ler o elenco salvo: {e}")
+        return {}
+
+# ------------------------------------------------------------------------------
+# COLETA INCREMENTAL DA API DA CBF
+# ------------------------------------------------------------------------------
+# O JSON bruto de cada rodada fica guardado (comprimido) na tabela RODADAS_CBF.
+# Uma rodada é considerada FECHADA quando todos os seus jogos estão finalizados
+# (têm `documentos`, o mesmo critério de JOGOS_FINALIZADOS); rodadas fechadas não
+# mudam mais e são reprocessadas a partir do banco, sem tráfego na API.
+
+def rodada_esta_finalizada(dados_api) -> bool:
+    """True se a rodada tem jogos e TODOS possuem documentos (súmula publicada)."""
+    jogos = [jogo for grupo in dados_api.get('jogos', []) for jogo in grupo.get('jogo', []) if jogo.get('id_jogo')]
+    if not jogos:
+        return False
+    return all(isinstance(jogo.get('documentos'), list) and len(jogo['documentos']) > 0 for jogo in jogos)
+
+def ler_rodadas_salvas(id_competicao) -> dict:
+    """
+    Lê do banco quais rodadas da competição já foram coletadas. O JSON bruto de
+    cada uma só é lido quando a rodada é processada (ver iterar_rodadas).
+
+    Retorna:
+        dict: {rodada: {'finalizada': bool}}. Vazio se não houver nada salvo.
+    """
+    try:
+        with usar_conexao() as conn:
+            linhas = conn.execute("SELECT rodada, finalizada FROM rodadas_cbf WHERE id_competicao = ?", (id_competicao,)).fetchall()
+        return {rodada: {'finalizada': bool(finalizada)} for rodada, finalizada in linhas}
+    except sqlite3.Error as e:
+        if _conexao_da_execucao is not None:
+            raise
+        print(f"❌ Erro ao ler as rodadas salvas: {e}")
+        return {}
+
+def ler_payload_rodada(id_competicao, rodada: int) -> Optional[dict]:
+    """JSON bruto de uma rodada salva em RODADAS_CBF (None se não houver ou, fora de uma execução, em caso de erro)."""
+    try:
+        with usar_conexao() as conn:
+            linha = conn.execute("SELECT payload FROM rodadas_cbf WHERE id_competicao = ? AND rodada = ?", (id_competicao, rodada)).fetchone()
+        return json.loads(zlib.decompress(linha[0])) if linha else None
+    except sqlite3.Error as e:
+        if _conexao_da_execucao is not None:
+            raise
+        print(f"❌ Erro ao ler a rodada {rodada} salva: {e}")
+        return None
+
+def salvar_rodadas_brutas(id_competicao, dados_por_rodada):
+    """
+    Guarda (comprimido) o JSON das rodadas baixadas com sucesso nesta execução.
+
+    Dentro de uma execução a gravação faz parte da transação de quem chamou
+    (transacao não abre outra): um erro é repassado para que ela seja desfeita
+    inteira, em vez de confirmada pela metade. Só numa chamada avulsa o erro é
+    apenas informado.
+    """
+    linhas = [
+        (id_competicao, rodada, comprimir_payload_rodada(dados_api),
+         int(rodada_esta_finalizada(dados_api)), datetime.now().isoformat(timespec='seconds'))
+        for rodada, dados_api in dados_por_rodada.items() if dados_api is not None
+    ]
+    if not linhas:
+        return
+    try:
+        with usar_conexao() as conn, transacao(conn):
+            # Rodada com o mesmo JSON de antes não é regravada (nem tem o atualizado_em trocado)
+            conn.executemany(montar_sql_upsert('rodadas_cbf', ('id_competicao', 'rodada'), ('payload', 'finalizada', 'atualizado_em'),
+                                               comparar=('payload', 'finalizada')), linhas)
+    except sqlite3.Error as e:
+        if _conexao_da_execucao is not None:
+            raise
+        print(f"❌ Erro ao salvar as rodadas brutas: {e}")
+
+def planejar_rodadas_a_buscar(num_rodadas, rodadas_salvas, janela_revisao=None) -> list:
+    """
+    Decide quais rodadas precisam ser baixadas da API: todas as que não estão
+    fechadas no banco + as `janela_revisao` rodadas fechadas mais recentes
+    (para captar correções tardias de súmula).
+    """
+    janela_revisao = JANELA_REVISAO_RODADAS if janela_revisao is None else janela_revisao
+    fechadas = sorted(r for r, info in rodadas_salvas.items() if info['finalizada'] and 1 <= r <= num_rodadas)
+    revisar = set(fechadas[-janela_revisao:]) if janela_revisao > 0 else set()
+    return [r for r in range(1, num_rodadas + 1) if r not in fechadas or r in revisar]
+
+def iterar_rodadas(id_competicao, num_rodadas, rodadas_salvas, dados_baixados):
+    """
+    Primeira etapa do fluxo de rodadas: gera (rodada, dados_api) em ordem de rodada,
+    juntando o que foi baixado agora com o que está salvo no banco. Se o download
+    de uma rodada falhou (ou ela não foi pedida), usa a última versão salva (se
+    existir), lida do banco só quando chega a vez dela.
+
+    As rodadas entregues saem de `dados_baixados`: depois de processada e gravada,
+    o JSON de uma rodada não fica mais em memória.
+    """
+    for rodada in range(1, num_rodadas + 1):
+        dados_api = dados_baixados.pop(rodada, None)
+        if dados_api is None and rodada in rodadas_salvas:
+            dados_api = ler_payload_rodada(id_competicao, rodada)
+        yield rodada, dados_api
+
+# ==============================================================================
+# ESQUEMA DO BANCO (Migrações versionadas por PRAGMA user_version)
+# ==============================================================================
+# O banco NÃO é mais apagado a cada execução: cada migração leva o esquema da
+# versão anterior para a seguinte e só roda uma vez (o número da última
+# migração aplicada fica gravado em PRAGMA user_version). Para mudar o esquema,
+# acrescente uma nova função ao FINAL de MIGRACOES_BANCO - nunca altere uma
+# migração que já foi publicada.
+
+def _migracao_001_esquema_inicial(cursor):
+    """Tabelas base. Usa IF NOT EXISTS para adotar bancos criados antes das migrações."""
+    # Tabela antiga/removida (Para limpar a estrutura anterior)
+    cursor.execute("DROP TABLE IF EXISTS escalacoes")
+
+    # Tabela TIMES (id é o ID CBF)
+    cursor.execute('CREATE TABLE IF NOT EXISTS times (id INTEGER PRIMARY KEY, nome TEXT NOT NULL UNIQUE, url_escudo TEXT, nome_curto TEXT)')
+
+    # Tabela ELENCO (Novo Cadastro Mestre de Jogadores)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS elenco (
+            id_jogador INTEGER PRIMARY KEY, -- Novo ID único global do jogador
+            id_time INTEGER NOT NULL,      -- ID do time (Chave estrangeira)
+            nome_jogador TEXT NOT NULL,
+            numero TEXT,
+            posicao TEXT,                  -- Posição principal do jogador (Ex: ZAGUEIRO, MEIA, ATACANTE)
+            url_foto TEXT,
+            UNIQUE(id_time, nome_jogador), -- Garante unicidade do jogador DENTRO DO TIME
+            FOREIGN KEY (id_time) REFERENCES times (id)
+        )
+    ''')
+
+    # Tabela ATLETAS (Mantida para dados de Cartões/Suspensão da API CBF)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS atletas (
+            id INTEGER PRIMARY KEY, 
+            apelido TEXT NOT NULL, 
+            cartoes_amarelos INTEGER DEFAULT 0, 
+            cartoes_vermelhos INTEGER DEFAULT 0, 
+            rodada_ultimo_vermelho INTEGER DEFAULT 0, 
+            rodada_suspensao_amarelo INTEGER DEFAULT 0, 
+            time_id INTEGER, 
+            FOREIGN KEY (time_id) REFERENCES times (id)
+        )
+    ''')
+
+    # Tabela RODADAS_CBF (JSON bruto de cada rodada para a coleta incremental)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS rodadas_cbf (
+            id_competicao INTEGER NOT NULL,
+            rodada INTEGER NOT NULL,
+            payload BLOB NOT NULL,         -- JSON da API comprimido com zlib
+            finalizada INTEGER NOT NULL,   -- 1 se todos os jogos da rodada têm súmula
+            atualizado_em TEXT,
+            PRIMARY KEY (id_competicao, rodada)
+        )
+    ''')
+
+    # Tabela JOGOS FINALIZADOS
+    cursor.execute('''CREATE TABLE IF NOT EXISTS jogos_finalizados (id_jogo INTEGER PRIMARY KEY, rodada INTEGER NOT NULL)''')
+
+    # Tabela PARTIDAS (ID de jogo é o ID CBF, referenciado por ID de time)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS partidas (
+            id_jogo INTEGER PRIMARY KEY, 
+            rodada INTEGER NOT NULL, 
+            data TEXT, hora TEXT, local TEXT,
+            mandante_id INTEGER, 
+            mandante_url_escudo TEXT, 
+            mandante_gols TEXT, 
+            mandante_formacao TEXT,
+            visitante_id INTEGER, 
+            visitante_url_escudo TEXT, 
+            visitante_gols TEXT, 
+            visitante_formacao TEXT,
+            FOREIGN KEY (mandante_id) REFERENCES times (id),
+            FOREIGN KEY (visitante_id) REFERENCES times (id)
         )
     ''')
-    
-    conn.commit()
-    conn.close()
+
+    # Tabela ESTATISTICAS_TIME
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS estatisticas_time (
+            time_id INTEGER PRIMARY KEY, 
+            posicao INTEGER, 
+            pontos INTEGER, 
+            ultimos_jogos TEXT,
+            media_cartoes_amarelos REAL,
+            total_cartoes_vermelhos INTEGER, 
+            media_escanteios REAL,
+            FOREIGN KEY (time_id)
+            REFERENCES times (id)
+        )
+    ''')
+
+    # Tabela de LIGAÇÃO PARTIDAS_ELENCO (Mapeia qual jogador jogou em qual jogo)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS partidas_elenco (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            jogo_id INTEGER NOT NULL,
+            id_time INTEGER NOT NULL,              -- Para saber de qual time a escalação pertence
+            id_jogador INTEGER NOT NULL,           -- Chave para o jogador no ELENCO
+            papel TEXT NOT NULL,                   -- TITULAR, RESERVA, AUSENTE
+            pos_x REAL,                            -- Posição X (apenas se titular)
+            pos_y REAL,                            -- Posição Y (apenas se titular)
+            motivo TEXT,                           -- Lesão/Suspensão (apenas se AUSENTE)
+            UNIQUE(jogo_id, id_time, id_jogador),  -- Garante que o jogador só aparece uma vez por time/jogo
+            FOREIGN KEY (jogo_id) REFERENCES partidas (id_jogo),
+            FOREIGN KEY (id_time) REFERENCES times (id),
+            FOREIGN KEY (id_jogador) REFERENCES elenco (id_jogador)
+        )
+    ''')
+
+    # Tabela STATUS_COLETA (chave/valor do andamento da coleta)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS status_coleta (
+            chave TEXT PRIMARY KEY,
+            valor INTEGER
+        )
+    ''')
+
+def _migracao_002_indices_de_leitura(cursor):
+    """Índices para as consultas do app (bdkard/.../database_helper.dart)."""
+    # partidas WHERE rodada = ? ORDER BY data
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_partidas_rodada_data ON partidas (rodada, data)")
+    # atletas a JOIN times t ON a.time_id = t.id [WHERE t.nome = ?] ORDER BY t.nome, a.apelido
+    # (t.nome já é indexado pelo UNIQUE; com (time_id, apelido) os atletas saem ordenados por time)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_atletas_time_apelido ON atletas (time_id, apelido)")
+    # SELECT MAX(rodada) FROM jogos_finalizados
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_jogos_finalizados_rodada ON jogos_finalizados (rodada)")
+    # partidas_elenco WHERE jogo_id = ? já usa o índice do UNIQUE(jogo_id, id_time, id_jogador)
+    cursor.execute("ANALYZE")
+
+def _migracao_003_tabelas_de_leitura(cursor):
+    """Tabelas desnormalizadas das telas do app (preenchidas por atualizar_tabelas_de_leitura)."""
+    # Classificação: já com nome/escudo do time, lida por faixa da chave (ORDER BY posicao)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS vw_classificacao (
+            posicao INTEGER NOT NULL,
+            time_id INTEGER NOT NULL,
+            nome TEXT,
+            url_escudo TEXT,
+            pontos INTEGER,
+            ultimos_jogos TEXT,
+            PRIMARY KEY (posicao, time_id)
+        ) WITHOUT ROWID
+    ''')
+
+    # Pendurados (amarelos % 3 = 2) dos dois times de cada jogo ainda não disputado,
+    # na ordem da tela (time, apelido): WHERE jogo_id = ? percorre só a faixa da chave
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS vw_pendurados_por_jogo (
+            jogo_id INTEGER NOT NULL,
+            time_nome TEXT NOT NULL,
+            apelido TEXT NOT NULL,
+            atleta_id INTEGER NOT NULL,
+            time_id INTEGER,
+            url_escudo TEXT,
+            cartoes_amarelos INTEGER,
+            cartoes_vermelhos INTEGER,
+            PRIMARY KEY (jogo_id, time_nome, apelido, atleta_id)
+        ) WITHOUT ROWID
+    ''')
+
+    # Pré-jogo: estatísticas de mandante e visitante de cada jogo ainda não disputado
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS vw_pre_jogo (
+            jogo_id INTEGER NOT NULL,
+            lado TEXT NOT NULL,                    -- MANDANTE, VISITANTE
+            time_id INTEGER,
+            nome TEXT,
+            url_escudo TEXT,
+            posicao INTEGER,
+            pontos INTEGER,
+            ultimos_jogos TEXT,
+            media_cartoes_amarelos REAL,
+            total_cartoes_vermelhos INTEGER,
+            media_escanteios REAL,
+            PRIMARY KEY (jogo_id, lado)
+        ) WITHOUT ROWID
+    ''')
+
+def _migracao_004_livro_de_cartoes(cursor):
+    """
+    Livro de cartões: uma linha por penalidade da súmula (ver registrar_eventos_de_cartoes).
+    Começa vazio: na primeira coleta todos os eventos entram como novos e os totais
+    de ATLETAS são refeitos a partir dele.
+    """
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS cartoes_eventos (
+            id_jogo INTEGER NOT NULL,
+            atleta_id INTEGER NOT NULL,
+            sequencia INTEGER NOT NULL,            -- Ordem do evento do atleta no jogo (0, 1...)
+            rodada INTEGER NOT NULL,
+            time_id INTEGER,
+            apelido TEXT,
+            resultado TEXT,                        -- AMARELO, VERMELHO, VERMELHO2AMARELO...
+            PRIMARY KEY (id_jogo, atleta_id, sequencia)
+        ) WITHOUT ROWID
+    ''')
+    # Última rodada já contada de cada atleta e reaplicação do livro por atleta, em ordem de rodada
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_cartoes_eventos_atleta_rodada ON cartoes_eventos (atleta_id, rodada)")
+
+def _migracao_005_suspensoes_por_jogo(cursor):
+    """Suspensos e pendurados de cada jogo ainda não disputado (preenchida por calcular_suspensoes_por_jogo)."""
+    # Na ordem da tela do jogo (lado, situação, apelido): WHERE jogo_id = ? percorre só a faixa da chave
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS vw_suspensoes_por_jogo (
+            jogo_id INTEGER NOT NULL,
+            lado TEXT NOT NULL,                    -- MANDANTE, VISITANTE
+            situacao TEXT NOT NULL,                -- SUSPENSO, PENDURADO
+            apelido TEXT NOT NULL,
+            atleta_id INTEGER NOT NULL,
+            time_id INTEGER,
+            motivo TEXT,                           -- Suspensos: AMARELOS (3º amarelo) ou VERMELHO
+            rodada_cartao INTEGER,                 -- Suspensos: rodada do cartão que gerou a suspensão
+            cartoes_amarelos INTEGER,
+            cartoes_vermelhos INTEGER,
+            PRIMARY KEY (jogo_id, lado, situacao, apelido, atleta_id)
+        ) WITHOUT ROWID
+    ''')
+
+def _migracao_006_agregados_por_time(cursor):
+    """Agregados por time calculados com NumPy (ver atualizar_agregados_por_time)."""
+    # Totais dos jogos disputados, ao lado das estatísticas do 365Scores
+    for coluna in ('gols_pro INTEGER', 'gols_contra INTEGER', 'pontos_forma INTEGER'):
+        cursor.execute(f"ALTER TABLE estatisticas_time ADD COLUMN {coluna}")
+
+    # Campanha em casa, fora e no total
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS estatisticas_time_mando (
+            time_id INTEGER NOT NULL,
+            mando TEXT NOT NULL,                   -- TOTAL, CASA, FORA
+            jogos INTEGER,
+            vitorias INTEGER,
+            empates INTEGER,
+            derrotas INTEGER,
+            pontos INTEGER,
+            gols_pro INTEGER,
+            gols_contra INTEGER,
+            media_gols_pro REAL,
+            media_gols_contra REAL,
+            media_cartoes_amarelos REAL,           -- Cartões do livro de cartões (CBF)
+            media_cartoes_vermelhos REAL,
+            PRIMARY KEY (time_id, mando)
+        ) WITHOUT ROWID
+    ''')
+
+    # Série jogo a jogo de cada time, com a forma recente (últimos JOGOS_FORMA jogos)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS estatisticas_time_rodada (
+            time_id INTEGER NOT NULL,
+            rodada INTEGER NOT NULL,
+            id_jogo INTEGER NOT NULL,
+            mando TEXT,                            -- CASA, FORA
+            gols_pro INTEGER,
+            gols_contra INTEGER,
+            pontos INTEGER,
+            pontos_acumulados INTEGER,
+            pontos_forma INTEGER,
+            gols_pro_forma INTEGER,
+            gols_contra_forma INTEGER,
+            PRIMARY KEY (time_id, rodada, id_jogo)
+        ) WITHOUT ROWID
+    ''')
+
+def _migracao_007_cache_de_fotos(cursor):
+    """Cache das fotos dos elencos do 365Scores (ver obter_fotos_jogadores)."""
+    # Última busca com sucesso de cada elenco
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS fotos_elencos (
+            time_365 TEXT PRIMARY KEY,             -- Nome do time em URLS_ELENCO_365
+            buscado_em TEXT NOT NULL,
+            fotos INTEGER
+        ) WITHOUT ROWID
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS fotos_jogadores (
+            chave TEXT PRIMARY KEY,                -- time_normalizado_jogador_normalizado (ver buscar_elencos_365)
+            time_365 TEXT NOT NULL,
+            url_foto TEXT NOT NULL,
+            visto_em TEXT NOT NULL                 -- Última busca do elenco em que a foto apareceu
+        ) WITHOUT ROWID
+    ''')
+
+def _migracao_008_imagens_locais(cursor):
+    """Fotos e escudos guardados como miniaturas WebP locais (ver atualizar_imagens_locais)."""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS imagens (
+            url TEXT PRIMARY KEY,                  -- Endereço de origem (ELENCO.url_foto, TIMES.url_escudo)
+            chave TEXT NOT NULL,                   -- Hash do conteúdo: nome das miniaturas em PASTA_IMAGENS
+            tipo TEXT NOT NULL,                    -- foto, escudo
+            baixado_em TEXT NOT NULL
+        ) WITHOUT ROWID
+    ''')
+    cursor.execute("ALTER TABLE elenco ADD COLUMN chave_foto TEXT")
+    cursor.execute("ALTER TABLE times ADD COLUMN chave_escudo TEXT")
+
+def _migracao_009_identidade_dos_times(cursor):
+    """Identidade dos times no 365Scores guardada em TIMES (ver obter_identidade_times_365)."""
+    cursor.execute("ALTER TABLE times ADD COLUMN nome_cbf TEXT")           # Nome na API da CBF: chave do mapa de identidades
+    cursor.execute("ALTER TABLE times ADD COLUMN identidade_365_em TEXT")  # Última busca em que o time estava na classificação do 365Scores
+
+# Lista ORDENADA de migrações: a posição na lista (1, 2, ...) é a versão do esquema
+MIGRACOES_BANCO = [
+    _migracao_001_esquema_inicial,
+    _migracao_002_indices_de_leitura,
+    _migracao_003_tabelas_de_leitura,
+    _migracao_004_livro_de_cartoes,
+    _migracao_005_suspensoes_por_jogo,
+    _migracao_006_agregados_por_time,
+    _migracao_007_cache_de_fotos,
+    _migracao_008_imagens_locais,
+    _migracao_009_identidade_dos_times,
+]
+VERSAO_ESQUEMA_BANCO = len(MIGRACOES_BANCO)
+
+def aplicar_migracoes(conn: sqlite3.Connection) -> int:
+    """
+    Aplica, em ordem, as migrações ainda não aplicadas ao banco. Cada migração
+    roda na sua própria transação junto com a atualização de PRAGMA user_version,
+    então uma falha no meio não deixa o esquema pela metade.
+
+    Retorna:
+        int: A versão do esquema antes das migrações.
+    """
+    versao_inicial = conn.execute("PRAGMA user_version").fetchone()[0]
+    if versao_inicial > VERSAO_ESQUEMA_BANCO:
+        raise RuntimeError(f"O banco está na versão {versao_inicial} do esquema, mais nova que a deste script ({VERSAO_ESQUEMA_BANCO}).")
+
+    isolamento_original = conn.isolation_level
+    conn.isolation_level = None  # Transações controladas manualmente (DDL incluído)
+    try:
+        for versao, migracao in enumerate(MIGRACOES_BANCO, start=1):
+            if versao <= versao_inicial:
+                continue
+            conn.execute("BEGIN")
+            try:
+                migracao(conn.cursor())
+                conn.execute(f"PRAGMA user_version = {versao}")
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            print(f"   > Migração {versao:03d} aplicada: {migracao.__doc__.strip().splitlines()[0]}")
+    finally:
+        conn.isolation_level = isolamento_original
+    return versao_inicial
+
+def criar_banco_de_dados():
+    """
+    Cria o banco (se não existir) e atualiza o esquema pelas migrações pendentes.
+    Os dados já gravados são preservados entre as execuções.
+    """
+    with usar_conexao() as conn:
+        versao_inicial = aplicar_migracoes(conn)
     print(f"Banco de dados verificado/criado em: {DB_FILE}")
-    print("✅ Nova tabela ELENCO e PARTIDAS_ELENCO criadas com sucesso para resolver o conflito de fotos.")
-
-def buscar_dados_campeonato_completo(id_competicao, num_rodadas):
-    estatisticas_jogadores, times_info = {}, {}
-    jogos_finalizados_info, todas_as_partidas_info = [], []
-    for i in range(1, num_rodadas + 1):
-        url_rodada = f"https://www.cbf.com.br/api/proxy?path=/jogos/campeonato/{id_competicao}/rodada/{i}/fase"
-        print(f"Buscando dados da Rodada {i}...")
+    if versao_inicial < VERSAO_ESQUEMA_BANCO:
+        print(f"✅ Esquema do banco atualizado da versão {versao_inicial} para a {VERSAO_ESQUEMA_BANCO}.")
+    else:
+        print(f"✅ Esquema do banco já está na versão {VERSAO_ESQUEMA_BANCO}. Nenhuma tabela recriada.")
+
+def extrair_registros_da_rodada(dados_api, i, times_info):
+    """
+    Processa o JSON de UMA rodada da API da CBF. Os times (que crescem com o número
+    de clubes, não de rodadas) são acumulados em `times_info`; as partidas, os jogos
+    finalizados e os eventos de cartão da rodada são devolvidos, para irem direto ao
+    banco (ver gravar_rodadas_em_fluxo). Os totais de cartões dos atletas saem do
+    livro de cartões (ver atualizar_atletas_pelos_eventos).
+
+    Retorna:
+        tuple: (partidas, jogos_finalizados, eventos_cartoes) da rodada. Partidas e jogos
+               finalizados são dicts; os eventos, tuplas na ordem de COLUNAS_CARTOES_EVENTOS.
+    """
+    todas_as_partidas_info, jogos_finalizados_info, eventos_cartoes = [], [], []
+    for grupo_de_jogos in dados_api.get('jogos', []):
+        for jogo in grupo_de_jogos.get('jogo', []):
+            jogo_id = jogo.get('id_jogo')
+            if not jogo_id: continue    
+            mandante = jogo.get('mandante', {}); visitante = jogo.get('visitante', {})
+            todas_as_partidas_info.append({'id_jogo': jogo_id, 'rodada': i, 'data': jogo.get('data'), 'hora': jogo.get('hora'), 'local': jogo.get('local'), 'mandante_id': mandante.get('id'), 'mandante_nome': mandante.get('nome'), 'mandante_url_escudo': mandante.get('url_escudo'), 'mandante_gols': mandante.get('gols'), 'visitante_id': visitante.get('id'), 'visitante_nome': visitante.get('nome'), 'visitante_url_escudo': visitante.get('url_escudo'), 'visitante_gols': visitante.get('gols')})
+            documentos = jogo.get('documentos')
+            if documentos and isinstance(documentos, list) and len(documentos) > 0:
+                jogos_finalizados_info.append({'id_jogo': jogo_id, 'rodada': i})
+            for time_info in [mandante, visitante]:
+                time_id = time_info.get('id')
+                if time_id and time_id not in times_info: times_info[time_id] = {'nome': time_info.get('nome'), 'url_escudo': time_info.get('url_escudo')}
+            eventos_por_atleta = {}
+            for penalidade in jogo.get('penalidades', []):
+                if penalidade.get('tipo') == 'PENALIDADE':
+                    if penalidade.get('atleta_camisa') is None: continue
+                    atleta_id = int(penalidade.get('atleta_id', 0)); clube_id = int(penalidade.get('clube_id', 0)); atleta_apelido = penalidade.get('atleta_apelido')
+                    if not all([atleta_id, clube_id, atleta_apelido]): continue
+                    # Sequência: o mesmo atleta pode ter mais de um evento no jogo (ex.: amarelo e vermelho direto)
+                    sequencia = eventos_por_atleta[atleta_id] = eventos_por_atleta.get(atleta_id, -1) + 1
+                    eventos_cartoes.append((int(jogo_id), atleta_id, sequencia, i, clube_id, atleta_apelido, penalidade.get('resultado')))
+    return todas_as_partidas_info, jogos_finalizados_info, eventos_cartoes
+
+def extrair_rodadas(rodadas, times_info):
+    """
+    Segunda etapa do fluxo de rodadas: para cada (rodada, dados_api) de
+    iterar_rodadas, gera (rodada, dados_api, partidas, jogos_finalizados, eventos_cartoes)
+    (ver extrair_registros_da_rodada). Rodadas sem dados ou com erro são puladas.
+    """
+    for i, dados_api in rodadas:
+        if dados_api is None: continue
+        try:
+            partidas, jogos_finalizados, eventos_cartoes = extrair_registros_da_rodada(dados_api, i, times_info)
+        except Exception as e:
+            print(f"   > Erro ao processar rodada {i}: {e}. Pulando.")
+            continue
+        yield i, dados_api, partidas, jogos_finalizados, eventos_cartoes
+
+def montar_sql_upsert(tabela: str, chave: tuple, colunas: tuple, comparar: Optional[tuple] = None, origem: Optional[str] = None) -> str:
+    """
+    Monta um INSERT ... ON CONFLICT(chave) DO UPDATE que só reescreve a linha
+    existente se algum valor mudou. Linhas iguais não geram escrita nenhuma
+    (nem página suja, nem entrada em changes()), ao contrário do INSERT OR
+    REPLACE, que apaga e reinsere a linha e reescreve os índices.
+
+    Args:
+        tabela (str): Nome da tabela.
+        chave (tuple): Colunas da restrição PRIMARY KEY/UNIQUE usada como alvo do conflito.
+        colunas (tuple): Demais colunas gravadas (a ordem dos parâmetros é chave + colunas).
+        comparar (tuple): Colunas que decidem se a linha mudou (padrão: todas as `colunas`).
+        origem (str): SELECT que fornece as linhas, em vez de parâmetros '?'.
+    """
+    todas = chave + colunas
+    atribuicoes = ', '.join(f"{coluna} = excluded.{coluna}" for coluna in colunas)
+    # IS NOT (e não <>) para que NULL -> valor e valor -> NULL também contem como mudança
+    diferencas = ' OR '.join(f"{coluna} IS NOT excluded.{coluna}" for coluna in (comparar or colunas))
+    # "WHERE true" desfaz a ambiguidade do parser entre o ON do JOIN e o ON CONFLICT (exigido pelo SQLite)
+    valores = f"SELECT * FROM ({origem}) WHERE true" if origem else f"VALUES ({', '.join('?' * len(todas))})"
+    return (f"INSERT INTO {tabela} ({', '.join(todas)}) {valores} "
+            f"ON CONFLICT({', '.join(chave)}) DO UPDATE SET {atribuicoes} WHERE {diferencas}")
+
+# Chave de conflito e demais colunas de cada tabela, na ordem das tuplas de montar_linhas_para_o_banco
+CHAVES_E_COLUNAS_POR_TABELA = {
+    'times': (('id',), ('nome', 'url_escudo', 'nome_curto')),
+    # O banco é preservado entre execuções e os IDs do elenco são estáveis (ver ler_ids_elenco_salvos)
+    'elenco': (('id_jogador',), ('id_time', 'nome_jogador', 'numero', 'posicao', 'url_foto')),
+    'atletas': (('id',), ('apelido', 'cartoes_amarelos', 'cartoes_vermelhos', 'rodada_ultimo_vermelho',
+                          'rodada_suspensao_amarelo', 'time_id')),
+    'estatisticas_time': (('time_id',), ('posicao', 'pontos', 'ultimos_jogos', 'media_cartoes_amarelos',
+                                         'total_cartoes_vermelhos', 'media_escanteios')),
+    'partidas': (('id_jogo',), ('rodada', 'data', 'hora', 'local', 'mandante_id', 'mandante_url_escudo', 'mandante_gols',
+                                'mandante_formacao', 'visitante_id', 'visitante_url_escudo', 'visitante_gols', 'visitante_formacao')),
+    'jogos_finalizados': (('id_jogo',), ('rodada',)),
+    'partidas_elenco': (('jogo_id', 'id_time', 'id_jogador'), ('papel', 'pos_x', 'pos_y', 'motivo')),
+}
+
+# SQL de gravação de cada tabela, na ordem em que são gravadas
+SQL_GRAVACAO_POR_TABELA = {tabela: montar_sql_upsert(tabela, chave, colunas)
+                           for tabela, (chave, colunas) in CHAVES_E_COLUNAS_POR_TABELA.items()}
+# Não é tabela: remove as ligações de um time/jogo reescalado que não vieram nesta coleta.
+# Precisa rodar ANTES das novas ligações (por isso a reordenação abaixo).
+SQL_GRAVACAO_POR_TABELA['partidas_elenco_obsoletas'] = 'DELETE FROM partidas_elenco WHERE jogo_id = ? AND id_time = ? AND id_jogador = ?'
+SQL_GRAVACAO_POR_TABELA['partidas_elenco'] = SQL_GRAVACAO_POR_TABELA.pop('partidas_elenco')
+
+def abrir_conexao_escrita(caminho: Optional[str] = None) -> sqlite3.Connection:
+    """
+    Abre o banco para a gravação em lote, com os PRAGMAS_ESCRITA_SQLITE aplicados.
+    A conexão fica em modo autocommit (isolation_level=None): as transações são
+    abertas explicitamente por quem grava (ver transacao).
+
+    Args:
+        caminho (str): Arquivo do banco (padrão: DB_FILE).
+    """
+    # Usa DB_FILE do módulo (e não um caminho relativo ao diretório atual), para que
+    # benchmarks e o modo reprodução possam apontar o banco para outro lugar.
+    caminho = caminho or DB_FILE
+    os.makedirs(os.path.dirname(caminho), exist_ok=True)
+    conn = sqlite3.connect(caminho, isolation_level=None)
+    for nome, valor in PRAGMAS_ESCRITA_SQLITE:
+        conn.execute(f"PRAGMA {nome} = {valor}")
+    return conn
+
+def fechar_conexao_escrita(conn: sqlite3.Connection) -> int:
+    """
+    Descarrega o WAL no arquivo principal e volta o journal para DELETE antes de
+    fechar: o banco publicado fica autocontido (sem -wal/-shm).
+
+    Retorna:
+        int: Quantas páginas foram gravadas no WAL desde a abertura da conexão.
+    """
+    try:
+        # O PASSIVE devolve o tamanho do WAL (em páginas); o TRUNCATE em seguida zera o arquivo
+        _, paginas_no_wal, _ = conn.execute("PRAGMA wal_checkpoint(PASSIVE)").fetchone()
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        conn.execute("PRAGMA journal_mode = DELETE")
+        return max(paginas_no_wal, 0)
+    finally:
+        conn.close()
+
+# ------------------------------------------------------------------------------
+# CONEXÃO E TRANSAÇÕES DA EXECUÇÃO
+# ------------------------------------------------------------------------------
+# Uma execução do main_run usa UMA conexão (aberta e configurada uma única vez por
+# conexao_da_execucao). As funções de leitura/gravação pedem a conexão com
+# usar_conexao(); fora de uma execução (benchmarks, uso avulso) abrem uma só para si.
+# As que tratam sqlite3.Error (informam e seguem com um valor vazio) só fazem isso
+# fora de uma execução: dentro dela o erro é repassado, e a transação da execução
+# é desfeita em vez de confirmada com uma parte das gravações.
+
+_conexao_da_execucao: Optional[sqlite3.Connection] = None
+
+@contextmanager
+def conexao_da_execucao():
+    """
+    Abre a conexão compartilhada pela execução e, ao sair, descarrega o WAL e a
+    fecha (ver fechar_conexao_escrita), informando quantas páginas foram gravadas.
+    """
+    global _conexao_da_execucao
+    if _conexao_da_execucao is not None:
+        yield _conexao_da_execucao
+        return
+    _conexao_da_execucao = abrir_conexao_escrita()
+    try:
+        yield _conexao_da_execucao
+    finally:
+        conn, _conexao_da_execucao = _conexao_da_execucao, None
+        paginas_gravadas = fechar_conexao_escrita(conn)
+        print(f"💾 Páginas gravadas no banco nesta execução: {paginas_gravadas}")
+
+@contextmanager
+def usar_conexao():
+    """Entrega a conexão da execução em andamento ou, se não houver, uma aberta só para o bloco."""
+    if _conexao_da_execucao is not None:
+        yield _conexao_da_execucao
+        return
+    conn = abrir_conexao_escrita()
+    try:
+        yield conn
+    finally:
+        fechar_conexao_escrita(conn)
+
+@contextmanager
+def transacao(conn: sqlite3.Connection):
+    """
+    BEGIN/COMMIT explícitos; em caso de erro, ROLLBACK e a exceção é repassada.
+    Dentro de uma transação já aberta não faz nada: quem abriu a externa decide
+    o COMMIT (é assim que a gravação final do main_run fica atômica).
+    """
+    if conn.in_transaction:
+        yield conn
+        return
+    conn.execute("BEGIN")
+    try:
+        yield conn
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    conn.execute("COMMIT")
+
+def gravar_linhas_em_lote(conn: sqlite3.Connection, linhas_por_tabela: dict) -> dict:
+    """
+    Grava todas as tabelas em UMA transação explícita, com um executemany por tabela.
+    Em caso de erro nada é gravado (ROLLBACK) e a exceção é repassada.
+
+    Args:
+        conn: Conexão aberta com abrir_conexao_escrita().
+        linhas_por_tabela (dict): {tabela: [tuplas]}; tabelas sem linhas são ignoradas.
+
+    Retorna:
+        dict: {tabela: linhas efetivamente inseridas/alteradas/removidas}. Linhas
+              idênticas às já gravadas não contam (ver montar_sql_upsert).
+    """
+    alteradas = {}
+    with transacao(conn):
+        for tabela, sql in SQL_GRAVACAO_POR_TABELA.items():
+            linhas = linhas_por_tabela.get(tabela)
+            if linhas:
+                antes = conn.total_changes
+                conn.executemany(sql, linhas)
+                alteradas[tabela] = conn.total_changes - antes
+    return alteradas
+
+def linha_partida(jogo: dict) -> tuple:
+    """Linha da tabela PARTIDAS (na ordem de SQL_GRAVACAO_POR_TABELA) a partir do dict de uma partida."""
+    return (jogo['id_jogo'], jogo['rodada'], jogo.get('data'), jogo.get('hora', '00:00'), 'Local Desconhecido',
+            jogo.get('mandante_id'), jogo.get('mandante_url_escudo'), jogo.get('mandante_gols', '0'), jogo.get('mandante_formacao'),
+            jogo.get('visitante_id'), jogo.get('visitante_url_escudo'), jogo.get('visitante_gols', '0'), jogo.get('visitante_formacao'))
+
+def linha_atleta(atleta_id, dados_atleta: dict) -> tuple:
+    """Linha da tabela ATLETAS a partir do acumulado de um atleta (ver acumular_cartoes)."""
+    return (atleta_id, dados_atleta['nome'], dados_atleta['amarelos'], dados_atleta['vermelhos'],
+            dados_atleta['rodada_ultimo_vermelho'], dados_atleta.get('rodada_suspensao_amarelo', 0), dados_atleta['time_id'])
+
+def montar_linhas_para_o_banco(estatisticas_jogadores, times_info, jogos_finalizados_info, todas_as_partidas_info, estatisticas_times, todas_as_escalacoes, lista_final_elenco) -> dict:
+    """
+    Converte as estruturas coletadas nas linhas (tuplas) de cada tabela, na ordem
+    das colunas de SQL_GRAVACAO_POR_TABELA.
+
+    Retorna:
+        dict: {tabela: [tuplas]}
+    """
+    linhas = {tabela: [] for tabela in SQL_GRAVACAO_POR_TABELA}
+
+    # --- 1. TIMES ---
+    # Nota: Usei 'nome_curto' e 'url_escudo' que foram populados na Parte I/II
+    linhas['times'] = [(time_id, dados_time.get('nome'), dados_time.get('url_escudo'), dados_time.get('nome_curto'))
+                       for time_id, dados_time in times_info.items()]
+
+    # --- 2. ELENCO MESTRE (RESOLVE O PROBLEMA DA FOTO) ---
+    linhas['elenco'] = [(jogador['id_jogador'], jogador['id_time'], jogador['nome_jogador'],
+                         jogador['numero'], jogador['posicao'], jogador['url_foto'])
+                        for jogador in lista_final_elenco]
+
+    # --- 3. ATLETAS (Geral) - Mantido do seu código original ---
+    linhas['atletas'] = [linha_atleta(atleta_id, dados_atleta) for atleta_id, dados_atleta in estatisticas_jogadores.items()]
+
+    # --- 4. ESTATÍSTICAS TIME ---
+    linhas['estatisticas_time'] = [(
+        time_id,
+        stats.get('posicao'),
+        stats.get('pontos'),
+        stats.get('ultimos_jogos'),
+        stats.get('media_amarelos', 0.0),      # Valor do main_run
+        stats.get('total_vermelhos', 0),       # Valor do main_run
+        stats.get('media_escanteios', 0.0)     # Valor do main_run
+    ) for time_id, stats in estatisticas_times.items()]
+
+    # --- 5. PARTIDAS (Cabeçalho) ---
+    linhas['partidas'] = [linha_partida(jogo) for jogo in todas_as_partidas_info]
+
+    # --- 6. JOGOS FINALIZADOS ---
+    linhas['jogos_finalizados'] = [(jogo['id_jogo'], jogo['rodada']) for jogo in jogos_finalizados_info]
+
+    # --- 7. PARTIDAS_ELENCO (LIGAÇÃO DE ESCALAÇÃO) ---
+    # Criar um mapa de lookup rápido: (id_time_cbf, nome_jogador_normalizado) -> id_jogador_mestre
+    mapa_lookup_elenco = {
+        (e['id_time'], unidecode(e['nome_jogador']).lower().strip()): e['id_jogador']
+        for e in lista_final_elenco
+    }
+
+    # Mapeamento reverso CBF para ID
+    nome_cbf_para_id_cbf = {info['nome']: time_id for time_id, info in times_info.items()}
+
+    def adicionar_ligacoes(time_data, time_id_cbf, jogo_id):
+        if not time_data: return
+
+        for papel_lista, papel_mestre in [('titulares', 'TITULAR'), ('reservas', 'RESERVA'), ('fora_de_jogo', 'AUSENTE')]:
+            for jogador in time_data.get(papel_lista, []):
+                nome_norm = unidecode(jogador['nome']).lower().strip()
+
+                id_jogador_mestre = mapa_lookup_elenco.get((time_id_cbf, nome_norm))
+
+                if id_jogador_mestre:
+                    pos_x = jogador.get('pos_x') if papel_mestre == 'TITULAR' else None
+                    pos_y = jogador.get('pos_y') if papel_mestre == 'TITULAR' else None
+                    motivo = jogador.get('motivo', '') if papel_mestre == 'AUSENTE' else ''
+
+                    # ATENÇÃO: Usa a estrutura de dados retornada pela PARTE III (antes da consolidação do ELENCO MESTRE)
+                    linhas['partidas_elenco'].append((jogo_id, time_id_cbf, id_jogador_mestre, papel_mestre, pos_x, pos_y, motivo))
+
+    # Processa os dados de escalação brutos (que contêm os X/Y e o motivo)
+    for jogo_id, escalacao_data in todas_as_escalacoes.items():
+        for lado in ('mandante', 'visitante'):
+            if lado in escalacao_data:
+                nome_cbf = escalacao_data[lado].get('nome_cbf_original')
+                adicionar_ligacoes(escalacao_data[lado], nome_cbf_para_id_cbf.get(nome_cbf), jogo_id)
+
+    return linhas
+
+def listar_ligacoes_obsoletas(conn: sqlite3.Connection, linhas_partidas_elenco) -> list:
+    """
+    Ligações já gravadas em PARTIDAS_ELENCO para os (jogo, time) coletados agora
+    que não aparecem mais na nova escalação (ex.: jogador saiu da lista de relacionados).
+    Times/jogos que não foram coletados nesta execução não são tocados.
+
+    Retorna:
+        list: [(jogo_id, id_time, id_jogador)] a remover.
+    """
+    novas = {(jogo_id, id_time, id_jogador) for jogo_id, id_time, id_jogador, *_ in linhas_partidas_elenco}
+    pares_coletados = {(jogo_id, id_time) for jogo_id, id_time, _ in novas}
+    jogos = sorted({jogo_id for jogo_id, _ in pares_coletados})
+    if not jogos:
+        return []
+    marcadores = ', '.join('?' * len(jogos))
+    gravadas = conn.execute(f"SELECT jogo_id, id_time, id_jogador FROM partidas_elenco WHERE jogo_id IN ({marcadores})", jogos)
+    return [ligacao for ligacao in gravadas if ligacao[:2] in pares_coletados and ligacao not in novas]
+
+# Tabelas de leitura do app: (chave, demais colunas, SELECT que gera as linhas a partir das tabelas base).
+# Os aliases do SELECT têm os nomes das colunas da tabela, na ordem chave + colunas.
+_JOGOS_NAO_DISPUTADOS = "SELECT id_jogo, mandante_id, visitante_id FROM partidas WHERE id_jogo NOT IN (SELECT id_jogo FROM jogos_finalizados)"
+TABELAS_DE_LEITURA = {
+    'vw_classificacao': (
+        ('posicao', 'time_id'), ('nome', 'url_escudo', 'pontos', 'ultimos_jogos'),
+        "SELECT e.posicao AS posicao, t.id AS time_id, t.nome AS nome, t.url_escudo AS url_escudo, "
+        "e.pontos AS pontos, e.ultimos_jogos AS ultimos_jogos "
+        "FROM estatisticas_time e JOIN times t ON e.time_id = t.id WHERE e.posicao IS NOT NULL"),
+    'vw_pendurados_por_jogo': (
+        ('jogo_id', 'time_nome', 'apelido', 'atleta_id'), ('time_id', 'url_escudo', 'cartoes_amarelos', 'cartoes_vermelhos'),
+        "SELECT p.id_jogo AS jogo_id, t.nome AS time_nome, a.apelido AS apelido, a.id AS atleta_id, t.id AS time_id, "
+        "t.url_escudo AS url_escudo, a.cartoes_amarelos AS cartoes_amarelos, a.cartoes_vermelhos AS cartoes_vermelhos "
+        f"FROM ({_JOGOS_NAO_DISPUTADOS}) p JOIN times t ON t.id IN (p.mandante_id, p.visitante_id) "
+        "JOIN atletas a ON a.time_id = t.id WHERE a.cartoes_amarelos > 0 AND a.cartoes_amarelos % 3 = 2"),
+    'vw_pre_jogo': (
+        ('jogo_id', 'lado'), ('time_id', 'nome', 'url_escudo', 'posicao', 'pontos', 'ultimos_jogos',
+                              'media_cartoes_amarelos', 'total_cartoes_vermelhos', 'media_escanteios'),
+        "SELECT p.id_jogo AS jogo_id, l.lado AS lado, t.id AS time_id, t.nome AS nome, t.url_escudo AS url_escudo, "
+        "e.posicao AS posicao, e.pontos AS pontos, e.ultimos_jogos AS ultimos_jogos, "
+        "e.media_cartoes_amarelos AS media_cartoes_amarelos, e.total_cartoes_vermelhos AS total_cartoes_vermelhos, "
+        "e.media_escanteios AS media_escanteios "
+        f"FROM ({_JOGOS_NAO_DISPUTADOS}) p "
+        "JOIN (SELECT 'MANDANTE' AS lado UNION ALL SELECT 'VISITANTE') l "
+        "JOIN times t ON t.id = CASE l.lado WHEN 'MANDANTE' THEN p.mandante_id ELSE p.visitante_id END "
+        "LEFT JOIN estatisticas_time e ON e.time_id = t.id"),
+    # Calculada em Python a partir do livro de cartões (ver calcular_suspensoes_por_jogo)
+    'vw_suspensoes_por_jogo': (
+        ('jogo_id', 'lado', 'situacao', 'apelido', 'atleta_id'),
+        ('time_id', 'motivo', 'rodada_cartao', 'cartoes_amarelos', 'cartoes_vermelhos'),
+        "SELECT * FROM suspensoes_calculadas"),
+}
+
+def atualizar_tabelas_de_leitura(conn: sqlite3.Connection) -> dict:
+    """
+    Recalcula as TABELAS_DE_LEITURA a partir das tabelas base, em uma transação.
+    Cada tabela recebe um upsert que só reescreve linhas que mudaram e um DELETE
+    das chaves que não existem mais: sem mudanças na base, nada é gravado.
+
+    Retorna:
+        dict: {tabela: linhas inseridas/alteradas/removidas}.
+    """
+    alteradas = {}
+    with transacao(conn):
+        preparar_suspensoes_calculadas(conn)
+        for tabela, (chave, colunas, consulta) in TABELAS_DE_LEITURA.items():
+            alteradas[tabela] = sincronizar_tabela(conn, tabela, chave, colunas, consulta)
+    return alteradas
+
+def sincronizar_tabela(conn: sqlite3.Connection, tabela: str, chave: tuple, colunas: tuple, consulta: str) -> int:
+    """
+    Deixa `tabela` igual ao resultado de `consulta` (aliases = chave + colunas): upsert
+    que só reescreve linhas que mudaram e DELETE das chaves que não existem mais.
+
+    Retorna:
+        int: Linhas inseridas/alteradas/removidas.
+    """
+    antes = conn.total_changes
+    conn.execute(f"DELETE FROM {tabela} WHERE ({', '.join(chave)}) NOT IN (SELECT {', '.join(chave)} FROM ({consulta}))")
+    conn.execute(montar_sql_upsert(tabela, chave, colunas, origem=consulta))
+    return conn.total_changes - antes
+
+def carregar_tabela_temporaria(conn: sqlite3.Connection, nome: str, colunas: tuple, linhas):
+    """(Re)cria a tabela temporária `nome` com as `linhas` calculadas em Python, para ser lida por SQL."""
+    conn.execute(f"CREATE TEMP TABLE IF NOT EXISTS {nome} ({', '.join(colunas)})")
+    conn.execute(f"DELETE FROM {nome}")
+    conn.executemany(f"INSERT INTO {nome} VALUES ({', '.join('?' * len(colunas))})", linhas)
+
+# ------------------------------------------------------------------------------
+# FLUXO DE RODADAS (gravação rodada a rodada)
+# ------------------------------------------------------------------------------
+# iterar_rodadas -> extrair_rodadas -> gravar_rodadas_em_fluxo: cada rodada é lida,
+# processada e gravada antes da seguinte, então a memória não cresce com o número
+# de rodadas (nem de competições). O que os passos seguintes da coleta precisam
+# fica no resumo por rodada ou é lido de volta do banco (ver ler_jogos_da_rodada).
+
+def gravar_rodadas_em_fluxo(conn: sqlite3.Connection, rodadas_extraidas, id_competicao, rodadas_inalteradas=(), rodadas_brutas=(), escudos=None) -> dict:
+    """
+    Última etapa do fluxo de rodadas: grava cada rodada de extrair_rodadas assim
+    que ela chega (JSON bruto, PARTIDAS, JOGOS_FINALIZADOS e eventos do livro de
+    cartões) e atualiza ATLETAS com os eventos novos a cada EVENTOS_POR_LOTE_ATLETAS
+    eventos e no fim (ver atualizar_atletas_pelos_eventos). Dentro da transação do
+    main_run, nada é confirmado antes do fim da coleta.
+
+    Args:
+        conn: Conexão da execução.
+        rodadas_extraidas: Gerador de extrair_rodadas.
+        id_competicao: Competição das rodadas (para o JSON bruto em RODADAS_CBF).
+        rodadas_inalteradas (set): Rodadas sem mudança na API desde a última coleta;
+            se já estiverem no banco, suas linhas não são regravadas (só o escudo, ver `escudos`).
+        rodadas_brutas (set): Rodadas baixadas nesta execução cujo JSON bruto deve ser guardado.
+        escudos (dict): {nome do time na CBF: URL do escudo} que substitui o escudo da API.
+            Vale também para as rodadas não regravadas: um escudo trocado é aplicado no fim
+            a todas as partidas do time.
+
+    Retorna:
+        dict: {'resumo': {rodada: (jogos, jogos finalizados)}, 'alteradas': {tabela: linhas
+              inseridas/alteradas}, 'enviadas': total de linhas enviadas}
+    """
+    escudos = escudos or {}
+    resumo, alteradas, enviadas, puladas = {}, {'partidas': 0, 'jogos_finalizados': 0, 'cartoes_eventos': 0, 'atletas': 0}, 0, 0
+    eventos_novos, atletas_atualizados, atletas_refeitos = 0, 0, 0
+    novos_pendentes, refazer_pendentes = [], set()
+    escudos_por_time = {}
+
+    def atualizar_atletas_pendentes():
+        nonlocal enviadas, eventos_novos, atletas_atualizados, atletas_refeitos
+        if not (novos_pendentes or refazer_pendentes):
+            return
+        atualizacao = atualizar_atletas_pelos_eventos(conn, novos_pendentes, refazer_pendentes)
+        alteradas['atletas'] += atualizacao['alteradas']
+        enviadas += atualizacao['enviadas']
+        eventos_novos += len(novos_pendentes)
+        atletas_atualizados += atualizacao['enviadas']
+        atletas_refeitos += atualizacao['refeitos']
+        novos_pendentes.clear()
+        refazer_pendentes.clear()
+
+    with transacao(conn):
+        rodadas_gravadas = {linha[0] for linha in conn.execute("SELECT DISTINCT rodada FROM partidas")}
+        for rodada, dados_api, partidas, jogos_finalizados, eventos_cartoes in rodadas_extraidas:
+            resumo[rodada] = (len(partidas), len(jogos_finalizados))
+            if rodada in rodadas_brutas:
+                salvar_rodadas_brutas(id_competicao, {rodada: dados_api})
+            # O livro de cartões é conferido também nas rodadas inalteradas: é só uma leitura
+            # por rodada e completa o livro de um banco que acabou de passar pela migração 004.
+            # Como as rodadas chegam em ordem, os eventos novos entram direto na linha atual dos atletas,
+            # em lotes de várias rodadas: cada atualização de ATLETAS tem um custo fixo de consultas.
+            antes = conn.total_changes
+            novos, refazer = registrar_eventos_de_cartoes(conn, [jogo['id_jogo'] for jogo in partidas], eventos_cartoes)
+            alteradas['cartoes_eventos'] += conn.total_changes - antes
+            enviadas += conn.total_changes - antes
+            novos_pendentes += novos
+            refazer_pendentes |= refazer
+            if len(novos_pendentes) >= EVENTOS_POR_LOTE_ATLETAS:
+                atualizar_atletas_pendentes()
+            for jogo in partidas:
+                for lado in ('mandante', 'visitante'):
+                    if jogo.get(f'{lado}_nome') in escudos and jogo.get(f'{lado}_id') is not None:
+                        escudos_por_time[jogo[f'{lado}_id']] = escudos[jogo[f'{lado}_nome']]
+            if rodada in rodadas_inalteradas and rodada in rodadas_gravadas:
+                puladas += 1
+                continue
+            for jogo in partidas:
+                for lado in ('mandante', 'visitante'):
+                    jogo[f'{lado}_url_escudo'] = escudos.get(jogo.get(f'{lado}_nome'), jogo.get(f'{lado}_url_escudo'))
+            linhas = {'partidas': [linha_partida(jogo) for jogo in partidas],
+                      'jogos_finalizados': [(jogo['id_jogo'], jogo['rodada']) for jogo in jogos_finalizados]}
+            for tabela, qtd in gravar_linhas_em_lote(conn, linhas).items():
+                alteradas[tabela] += qtd
+            enviadas += len(linhas['partidas']) + len(linhas['jogos_finalizados'])
+        atualizar_atletas_pendentes()
+        # Rodadas puladas (e encerradas) ficam com o escudo da última gravação: um escudo trocado
+        # chega a elas por um UPDATE por time e lado, que só toca as partidas com o escudo antigo.
+        antes = conn.total_changes
+        for lado in ('mandante', 'visitante'):
+            conn.executemany(f"UPDATE partidas SET {lado}_url_escudo = ? WHERE {lado}_id = ? AND {lado}_url_escudo IS NOT ?",
+                             [(escudo, time_id, escudo) for time_id, escudo in escudos_por_time.items()])
+        alteradas['partidas'] += conn.total_changes - antes
+    print(f"   > {len(resumo)} rodadas processadas e gravadas uma a uma "
+          f"({enviadas} linhas enviadas; {puladas} rodadas inalteradas desde a última coleta não regravadas).")
+    print(f"   > Livro de cartões: {eventos_novos} eventos novos; {atletas_atualizados} atualizações de atletas "
+          f"({atletas_refeitos} refeitos a partir do livro).")
+    return {'resumo': resumo, 'alteradas': alteradas, 'enviadas': enviadas}
+
+def ler_jogos_da_rodada(rodada: int, times_info) -> list:
+    """Partidas gravadas de uma rodada, com os nomes atuais dos times (em `times_info`), para a busca de escalações."""
+    with usar_conexao() as conn:
+        linhas = conn.execute("SELECT id_jogo, mandante_id, visitante_id FROM partidas WHERE rodada = ? ORDER BY id_jogo", (rodada,)).fetchall()
+    return [{'id_jogo': id_jogo, 'rodada': rodada,
+             'mandante_id': mandante_id, 'mandante_nome': times_info.get(mandante_id, {}).get('nome'),
+             'visitante_id': visitante_id, 'visitante_nome': times_info.get(visitante_id, {}).get('nome')}
+            for id_jogo, mandante_id, visitante_id in linhas]
+
+def gravar_formacoes(conn: sqlite3.Connection, todas_as_escalacoes) -> int:
+    """
+    Grava nas PARTIDAS já gravadas pelo fluxo de rodadas as formações das
+    escalações do 365Scores. Partidas com a mesma formação não são regravadas.
+
+    Retorna:
+        int: Quantas partidas foram alteradas.
+    """
+    linhas = [{'id_jogo': jogo_id,
+               'mandante': escalacao.get('mandante', {}).get('formacao'),
+               'visitante': escalacao.get('visitante', {}).get('formacao')}
+              for jogo_id, escalacao in todas_as_escalacoes.items()]
+    antes = conn.total_changes
+    with transacao(conn):
+        conn.executemany("UPDATE partidas SET mandante_formacao = :mandante, visitante_formacao = :visitante "
+                         "WHERE id_jogo = :id_jogo AND (mandante_formacao IS NOT :mandante OR visitante_formacao IS NOT :visitante)", linhas)
+    return conn.total_changes - antes
+
+# ------------------------------------------------------------------------------
+# LIVRO DE CARTÕES (cartoes_eventos)
+# ------------------------------------------------------------------------------
+# Cada penalidade da súmula é um evento em CARTOES_EVENTOS. Os totais de ATLETAS
+# (amarelos, vermelhos, rodada de suspensão) são o resultado de aplicar esses eventos
+# em ordem de rodada (acumular_cartoes). A cada coleta só os eventos de jogos novos
+# são aplicados sobre a linha atual do atleta; jogos com a súmula corrigida ou
+# eventos de rodadas anteriores à última já contada fazem o atleta ser refeito a partir
+# do livro. `--reconstruir-cartoes` refaz todos os atletas a partir do livro.
+
+COLUNAS_CARTOES_EVENTOS = ('id_jogo', 'atleta_id', 'sequencia', 'rodada', 'time_id', 'apelido', 'resultado')
+SQL_INSERIR_CARTAO_EVENTO = (f"INSERT INTO cartoes_eventos ({', '.join(COLUNAS_CARTOES_EVENTOS)}) "
+                             f"VALUES ({', '.join('?' * len(COLUNAS_CARTOES_EVENTOS))})")
+
+def atleta_sem_cartoes(apelido, time_id) -> dict:
+    """Acumulado inicial de um atleta, no formato de linha_atleta."""
+    return {'nome': apelido, 'time_id': time_id, 'amarelos': 0, 'vermelhos': 0, 'rodada_ultimo_vermelho': 0, 'rodada_suspensao_amarelo': 0}
+
+def acumular_cartoes(atleta: dict, eventos) -> dict:
+    """
+    Aplica ao acumulado de um atleta os eventos [(rodada, resultado), ...], que devem
+    vir em ordem de rodada. AMARELO e VERMELHO2AMARELO contam um amarelo (a cada 3, a
+    rodada fica como a da suspensão); VERMELHO e VERMELHO2AMARELO contam um vermelho.
+    """
+    for rodada, resultado in eventos:
+        if resultado in ('AMARELO', 'VERMELHO2AMARELO'):
+            atleta['amarelos'] += 1
+            if atleta['amarelos'] % 3 == 0:
+                atleta['rodada_suspensao_amarelo'] = rodada
+        if resultado in ('VERMELHO', 'VERMELHO2AMARELO'):
+            atleta['vermelhos'] += 1
+            atleta['rodada_ultimo_vermelho'] = rodada
+    return atleta
+
+def registrar_eventos_de_cartoes(conn: sqlite3.Connection, ids_jogos, eventos) -> tuple:
+    """
+    Confere os eventos de cartão de uma rodada com os já gravados no livro. Jogos
+    sem eventos no livro têm os seus acrescentados; jogos cuja súmula mudou (eventos
+    diferentes, inclusive nenhum) têm os eventos trocados.
+
+    Args:
+        conn: Conexão da execução.
+        ids_jogos: Todos os jogos da rodada (para notar os que ficaram sem eventos).
+        eventos (list): Eventos da rodada, tuplas na ordem de COLUNAS_CARTOES_EVENTOS.
+
+    Retorna:
+        tuple: (eventos acrescentados, ids dos atletas de jogos com a súmula corrigida)
+    """
+    ids_jogos = {int(id_jogo) for id_jogo in ids_jogos} | {evento[0] for evento in eventos}
+    if not ids_jogos:
+        return [], set()
+    gravados = {}
+    for evento in conn.execute(f"SELECT {', '.join(COLUNAS_CARTOES_EVENTOS)} FROM cartoes_eventos "
+                               f"WHERE id_jogo IN ({', '.join('?' * len(ids_jogos))})", tuple(ids_jogos)):
+        gravados.setdefault(evento[0], set()).add(evento)
+    recebidos = {id_jogo: set() for id_jogo in ids_jogos}
+    for evento in eventos:
+        recebidos[evento[0]].add(evento)
+
+    novos, refazer = [], set()
+    for id_jogo, eventos_do_jogo in recebidos.items():
+        antigos = gravados.get(id_jogo, set())
+        if eventos_do_jogo == antigos:
+            continue
+        if antigos:
+            conn.execute("DELETE FROM cartoes_eventos WHERE id_jogo = ?", (id_jogo,))
+            conn.executemany(SQL_INSERIR_CARTAO_EVENTO, sorted(eventos_do_jogo))
+            refazer |= {evento[1] for evento in antigos | eventos_do_jogo}
+        else:
+            novos += sorted(eventos_do_jogo)
+    conn.executemany(SQL_INSERIR_CARTAO_EVENTO, novos)
+    return novos, refazer
+
+def somar_livro_de_cartoes(conn: sqlite3.Connection, atletas_ids=None) -> dict:
+    """
+    Refaz o acumulado dos atletas aplicando, em ordem de rodada, todos os seus eventos
+    do livro. Apelido e time são os do primeiro evento. Sem `atletas_ids`, refaz todos.
+
+    Retorna:
+        dict: {atleta_id: acumulado no formato de linha_atleta}
+    """
+    sql = "SELECT atleta_id, rodada, resultado, apelido, time_id FROM cartoes_eventos"
+    if atletas_ids is not None:
+        if not atletas_ids:
+            return {}
+        conn.execute("CREATE TEMP TABLE IF NOT EXISTS atletas_a_refazer (atleta_id INTEGER PRIMARY KEY)")
+        conn.execute("DELETE FROM atletas_a_refazer")
+        conn.executemany("INSERT INTO atletas_a_refazer VALUES (?)", [(atleta_id,) for atleta_id in atletas_ids])
+        sql += " WHERE atleta_id IN (SELECT atleta_id FROM atletas_a_refazer)"
+    acumulados = {}
+    for atleta_id, rodada, resultado, apelido, time_id in conn.execute(sql + " ORDER BY atleta_id, rodada, id_jogo, sequencia"):
+        if atleta_id not in acumulados:
+            acumulados[atleta_id] = atleta_sem_cartoes(apelido, time_id)
+        acumular_cartoes(acumulados[atleta_id], [(rodada, resultado)])
+    return acumulados
+
+def atualizar_atletas_pelos_eventos(conn: sqlite3.Connection, novos, refazer) -> dict:
+    """
+    Atualiza ATLETAS com os eventos acrescentados ao livro nesta coleta
+    (ver registrar_eventos_de_cartoes). Para cada atleta:
+    - sem eventos anteriores no livro: acumulado a partir de zero, só com os novos;
+    - eventos novos a partir da última rodada já contada: aplicados sobre a linha atual;
+    - eventos de rodadas anteriores (rodada atrasada) ou súmula corrigida (`refazer`):
+      o atleta é refeito a partir do livro (somar_livro_de_cartoes).
+
+    Retorna:
+        dict: {'enviadas': linhas de ATLETAS enviadas, 'alteradas': linhas alteradas,
+               'refeitos': atletas refeitos a partir do livro}
+    """
+    refazer = set(refazer)
+    conn.execute("CREATE TEMP TABLE IF NOT EXISTS cartoes_novos (id_jogo INTEGER, atleta_id INTEGER)")
+    conn.execute("DELETE FROM cartoes_novos")
+    conn.executemany("INSERT INTO cartoes_novos VALUES (?, ?)", [(evento[0], evento[1]) for evento in novos])
+    # Última rodada de cada atleta já contada em ATLETAS (eventos que não são desta coleta). O
+    # índice (atleta_id, rodada) é lido de trás para frente até o 1º evento antigo: um MAX com
+    # o NOT IN leria todos os eventos do atleta, e o fluxo de rodadas faz esta consulta a cada rodada.
+    ultima_rodada_contada = dict(conn.execute(
+        "SELECT n.atleta_id, (SELECT e.rodada FROM cartoes_eventos e WHERE e.atleta_id = n.atleta_id "
+        "AND e.id_jogo NOT IN (SELECT id_jogo FROM cartoes_novos) ORDER BY e.rodada DESC LIMIT 1) AS ultima "
+        "FROM (SELECT DISTINCT atleta_id FROM cartoes_novos) n WHERE ultima IS NOT NULL"))
+    atuais = {linha[0]: linha for linha in conn.execute(
+        "SELECT id, apelido, cartoes_amarelos, cartoes_vermelhos, rodada_ultimo_vermelho, rodada_suspensao_amarelo, time_id "
+        "FROM atletas WHERE id IN (SELECT atleta_id FROM cartoes_novos)")}
+
+    por_atleta = {}
+    for evento in sorted(novos, key=lambda evento: (evento[3], evento[0], evento[2])):
+        por_atleta.setdefault(evento[1], []).append(evento)
+    acumulados = {}
+    for atleta_id, eventos in por_atleta.items():
+        if atleta_id in refazer:
+            continue
+        ultima_rodada = ultima_rodada_contada.get(atleta_id)
+        if ultima_rodada is None:
+            atleta = atleta_sem_cartoes(eventos[0][5], eventos[0][4])
+        elif atleta_id in atuais and eventos[0][3] >= ultima_rodada:
+            _, apelido, amarelos, vermelhos, ultimo_vermelho, suspensao, time_id = atuais[atleta_id]
+            atleta = {'nome': apelido, 'time_id': time_id, 'amarelos': amarelos or 0, 'vermelhos': vermelhos or 0,
+                      'rodada_ultimo_vermelho': ultimo_vermelho or 0, 'rodada_suspensao_amarelo': suspensao or 0}
+        else:
+            refazer.add(atleta_id)
+            continue
+        acumulados[atleta_id] = acumular_cartoes(atleta, [(evento[3], evento[6]) for evento in eventos])
+    refeitos = somar_livro_de_cartoes(conn, refazer)
+    acumulados.update(refeitos)
+
+    alteradas = gravar_linhas_em_lote(conn, {'atletas': [linha_atleta(atleta_id, atleta) for atleta_id, atleta in acumulados.items()]}).get('atletas', 0)
+    # Súmula corrigida que tirou todos os cartões do atleta: mantém nome e time, zera os totais
+    sem_eventos = [(atleta_id,) for atleta_id in refazer - refeitos.keys()]
+    antes = conn.total_changes
+    conn.executemany("UPDATE atletas SET cartoes_amarelos = 0, cartoes_vermelhos = 0, rodada_ultimo_vermelho = 0, "
+                     "rodada_suspensao_amarelo = 0 WHERE id = ?", sem_eventos)
+    alteradas += conn.total_changes - antes
+    return {'enviadas': len(acumulados) + len(sem_eventos), 'alteradas': alteradas, 'refeitos': len(refazer)}
+
+def reconstruir_atletas_pelo_livro(conn: sqlite3.Connection) -> int:
+    """Refaz os totais de cartões de todos os atletas a partir do livro. Retorna quantas linhas de ATLETAS mudaram."""
+    acumulados = somar_livro_de_cartoes(conn)
+    return gravar_linhas_em_lote(conn, {'atletas': [linha_atleta(atleta_id, atleta) for atleta_id, atleta in acumulados.items()]}).get('atletas', 0)
+
+# ------------------------------------------------------------------------------
+# MOTOR DE SUSPENSÕES (vw_suspensoes_por_jogo)
+# ------------------------------------------------------------------------------
+# Percorre o livro de cartões uma vez, atleta a atleta em ordem cronológica, com as
+# regras de acumular_cartoes: cada 3º amarelo e cada jogo com vermelho geram um jogo
+# de suspensão, cumprido no próximo jogo do time (o primeiro depois do jogo do cartão;
+# várias suspensões, nos jogos seguintes). Se esse jogo ainda não foi disputado, o
+# atleta sai como SUSPENSO nele; quem está com amarelos % 3 = 2 sai como PENDURADO nos
+# demais jogos do time ainda não disputados. O time é o do último evento do atleta.
+# A ordem dos jogos é a de data/hora, não a de rodada: jogos adiados são comuns e são
+# disputados depois de rodadas posteriores (ver ordenar_jogos_por_data).
+
+def instante_da_partida(data, hora) -> Optional[datetime]:
+    """Data e hora de uma partida ('dd/mm/aaaa', 'HH:MM'); None se a data não for válida."""
+    try:
+        dia, mes, ano = data.strip().split('/')
+        instante = datetime(int(ano), int(mes), int(dia))
+    except (AttributeError, ValueError):
+        return None
+    try:
+        horas, minutos = hora.strip().split(':')
+        return instante.replace(hour=int(horas), minute=int(minutos))
+    except (AttributeError, ValueError):
+        return instante
+
+def ordenar_jogos_por_data(partidas) -> dict:
+    """
+    Chave cronológica de cada jogo: (data/hora, rodada, id_jogo). Jogo sem data válida
+    fica com a primeira data conhecida da sua rodada ou, se a rodada não tiver nenhuma
+    (tabela ainda a definir), depois de todos os jogos com data, na ordem de rodada.
+
+    Args:
+        partidas: Linhas (id_jogo, rodada, data, hora).
+
+    Retorna:
+        dict: {id_jogo: chave ordenável}
+    """
+    instantes = {id_jogo: (rodada, instante_da_partida(data, hora)) for id_jogo, rodada, data, hora in partidas}
+    inicio_da_rodada = {}
+    for rodada, instante in instantes.values():
+        if instante and (rodada not in inicio_da_rodada or instante < inicio_da_rodada[rodada]):
+            inicio_da_rodada[rodada] = instante
+    return {id_jogo: (instante or inicio_da_rodada.get(rodada, datetime.max), rodada, id_jogo)
+            for id_jogo, (rodada, instante) in instantes.items()}
+
+def calcular_suspensoes_por_jogo(conn: sqlite3.Connection) -> list:
+    """
+    Calcula, para cada jogo ainda não disputado em PARTIDAS, os suspensos e pendurados
+    de cada lado, a partir do livro de cartões.
+
+    Retorna:
+        list: Linhas de vw_suspensoes_por_jogo, na ordem das colunas da tabela.
+    """
+    finalizados = {linha[0] for linha in conn.execute("SELECT id_jogo FROM jogos_finalizados")}
+    partidas = conn.execute("SELECT id_jogo, rodada, data, hora, mandante_id, visitante_id FROM partidas").fetchall()
+    chave_do_jogo = ordenar_jogos_por_data([partida[:4] for partida in partidas])
+    # Por time: jogos em ordem cronológica, as chaves deles (para a busca binária) e os jogos a disputar
+    jogos_por_time, chaves_por_time, a_disputar_por_time = {}, {}, {}
+    for id_jogo, _, _, _, mandante_id, visitante_id in sorted(partidas, key=lambda partida: chave_do_jogo[partida[0]]):
+        for time_id, lado in ((mandante_id, 'MANDANTE'), (visitante_id, 'VISITANTE')):
+            jogos_por_time.setdefault(time_id, []).append((id_jogo, lado, id_jogo in finalizados))
+            chaves_por_time.setdefault(time_id, []).append(chave_do_jogo[id_jogo])
+            if id_jogo not in finalizados:
+                a_disputar_por_time.setdefault(time_id, []).append((id_jogo, lado))
+
+    linhas = []
+    eventos = conn.execute("SELECT atleta_id, rodada, id_jogo, resultado, apelido, time_id, sequencia FROM cartoes_eventos "
+                           "ORDER BY atleta_id, rodada, id_jogo, sequencia")
+    # Evento de jogo que não está em PARTIDAS: ordenado pela rodada, depois dos jogos com data
+    chave_do_evento = lambda evento: chave_do_jogo.get(evento[2], (datetime.max, evento[1], evento[2]))  # noqa: E731
+    for atleta_id, eventos_do_atleta in itertools.groupby(eventos, key=lambda evento: evento[0]):
+        eventos_do_atleta = sorted(eventos_do_atleta, key=lambda evento: (chave_do_evento(evento), evento[6]))
+        apelido, time_id = eventos_do_atleta[0][4], eventos_do_atleta[-1][5]
+        atleta, suspensoes = atleta_sem_cartoes(apelido, time_id), []
+        for chave_cartao, eventos_do_jogo in itertools.groupby(eventos_do_atleta, key=chave_do_evento):
+            eventos_do_jogo = list(eventos_do_jogo)
+            rodada = eventos_do_jogo[0][1]
+            amarelos, vermelhos = atleta['amarelos'], atleta['vermelhos']
+            acumular_cartoes(atleta, [(rodada, evento[3]) for evento in eventos_do_jogo])
+            suspensoes += [(chave_cartao, rodada, 'AMARELOS')] * (atleta['amarelos'] // 3 - amarelos // 3)
+            if atleta['vermelhos'] > vermelhos:
+                suspensoes.append((chave_cartao, rodada, 'VERMELHO'))
+
+        jogos_do_time, chaves_do_time = jogos_por_time.get(time_id, []), chaves_por_time.get(time_id, [])
+        suspenso_em, proximo = set(), 0
+        for chave_cartao, rodada_cartao, motivo in suspensoes:
+            # Primeiro jogo do time depois do jogo do cartão que ainda não cumpre outra suspensão
+            proximo = max(proximo, bisect.bisect_right(chaves_do_time, chave_cartao))
+            if proximo == len(jogos_do_time):
+                break
+            id_jogo, lado, disputado = jogos_do_time[proximo]
+            proximo += 1
+            if not disputado:
+                suspenso_em.add(id_jogo)
+                linhas.append((id_jogo, lado, 'SUSPENSO', apelido, atleta_id, time_id, motivo, rodada_cartao,
+                               atleta['amarelos'], atleta['vermelhos']))
+        if atleta['amarelos'] % 3 == 2:
+            linhas += [(id_jogo, lado, 'PENDURADO', apelido, atleta_id, time_id, None, None, atleta['amarelos'], atleta['vermelhos'])
+                       for id_jogo, lado in a_disputar_por_time.get(time_id, []) if id_jogo not in suspenso_em]
+    return linhas
+
+def preparar_suspensoes_calculadas(conn: sqlite3.Connection):
+    """Grava o resultado de calcular_suspensoes_por_jogo na tabela temporária lida por TABELAS_DE_LEITURA."""
+    chave, colunas, _ = TABELAS_DE_LEITURA['vw_suspensoes_por_jogo']
+    carregar_tabela_temporaria(conn, 'suspensoes_calculadas', chave + colunas, calcular_suspensoes_por_jogo(conn))
+
+# ------------------------------------------------------------------------------
+# AGREGADOS POR TIME (NumPy)
+# ------------------------------------------------------------------------------
+# Os jogos disputados (PARTIDAS + JOGOS_FINALIZADOS) viram arrays com uma posição por
+# time e jogo, e os cartões do livro são somados nessas posições. Totais, médias por
+# mando e a forma recente saem de operações sobre os arrays inteiros (bincount, cumsum),
+# sem laço por time ou por rodada. Os resultados vão para ESTATISTICAS_TIME (gols e
+# forma), ESTATISTICAS_TIME_MANDO e ESTATISTICAS_TIME_RODADA. As médias de cartões e
+# escanteios do 365Scores em ESTATISTICAS_TIME continuam vindo do main_run.
+
+JOGOS_FORMA = 5  # Janela da forma recente (pontos e gols nos últimos N jogos)
+
+TABELAS_DE_AGREGADOS = {
+    'estatisticas_time_mando': (
+        ('time_id', 'mando'), ('jogos', 'vitorias', 'empates', 'derrotas', 'pontos', 'gols_pro', 'gols_contra',
+                               'media_gols_pro', 'media_gols_contra', 'media_cartoes_amarelos', 'media_cartoes_vermelhos')),
+    'estatisticas_time_rodada': (
+        ('time_id', 'rodada', 'id_jogo'), ('mando', 'gols_pro', 'gols_contra', 'pontos', 'pontos_acumulados',
+                                           'pontos_forma', 'gols_pro_forma', 'gols_contra_forma')),
+}
+
+def calcular_agregados_por_time(conn: sqlite3.Connection) -> dict:
+    """
+    Calcula os agregados de todos os times de uma vez, a partir dos jogos com placar
+    em PARTIDAS/JOGOS_FINALIZADOS e dos cartões do livro (mesmas regras de acumular_cartoes).
+
+    Retorna:
+        dict: {tabela de TABELAS_DE_AGREGADOS: linhas na ordem chave + colunas,
+               'estatisticas_time': [{'time_id', 'gols_pro', 'gols_contra', 'pontos_forma'}]}
+    """
+    jogos = conn.execute(
+        "SELECT p.id_jogo, p.rodada, p.mandante_id, p.visitante_id, CAST(p.mandante_gols AS INTEGER), CAST(p.visitante_gols AS INTEGER) "
+        "FROM partidas p JOIN jogos_finalizados f ON f.id_jogo = p.id_jogo "
+        "WHERE p.mandante_id IS NOT NULL AND p.visitante_id IS NOT NULL "
+        "AND p.mandante_gols GLOB '[0-9]*' AND p.visitante_gols GLOB '[0-9]*'").fetchall()
+    if not jogos:
+        return {'estatisticas_time_mando': [], 'estatisticas_time_rodada': [], 'estatisticas_time': []}
+    id_jogo, rodada, mandante, visitante, gols_mandante, gols_visitante = (np.array(coluna, dtype=np.int64) for coluna in zip(*jogos))
+
+    # Uma posição por (time, jogo): primeiro os mandantes, depois os visitantes
+    time_do_jogo = np.concatenate([mandante, visitante])
+    em_casa = np.repeat([True, False], len(jogos))
+    jogo, rodada = np.tile(id_jogo, 2), np.tile(rodada, 2)
+    gols_pro, gols_contra = np.concatenate([gols_mandante, gols_visitante]), np.concatenate([gols_visitante, gols_mandante])
+    pontos = np.select([gols_pro > gols_contra, gols_pro == gols_contra], [3, 1], 0)
+    times, indice_time = np.unique(time_do_jogo, return_inverse=True)
+
+    # Cartões do livro (já somados por jogo e time no SQL) na posição (jogo, time) do
+    # array, achada por busca binária na chave combinada; jogos sem placar ficam de fora
+    amarelos, vermelhos = np.zeros(len(jogo), dtype=np.int64), np.zeros(len(jogo), dtype=np.int64)
+    cartoes = conn.execute(
+        "SELECT id_jogo, time_id, SUM(resultado IN ('AMARELO', 'VERMELHO2AMARELO')), SUM(resultado IN ('VERMELHO', 'VERMELHO2AMARELO')) "
+        "FROM cartoes_eventos WHERE time_id IS NOT NULL GROUP BY id_jogo, time_id").fetchall()
+    if cartoes:
+        jogo_cartao, time_cartao, amarelos_cartao, vermelhos_cartao = (np.array(coluna, dtype=np.int64) for coluna in zip(*cartoes))
+        base = max(int(time_do_jogo.max()), int(time_cartao.max())) + 1
+        chave, chave_cartao = jogo * base + time_do_jogo, jogo_cartao * base + time_cartao
+        ordem = np.argsort(chave)
+        posicao = np.minimum(np.searchsorted(chave, chave_cartao, sorter=ordem), len(chave) - 1)
+        achado = chave[ordem[posicao]] == chave_cartao
+        np.add.at(amarelos, ordem[posicao[achado]], amarelos_cartao[achado])
+        np.add.at(vermelhos, ordem[posicao[achado]], vermelhos_cartao[achado])
+
+    # Campanha por mando: somas por time com bincount, médias só onde houve jogo
+    linhas_mando = []
+    for mando, mascara in (('TOTAL', np.ones(len(jogo), dtype=bool)), ('CASA', em_casa), ('FORA', ~em_casa)):
+        qtd_jogos = np.bincount(indice_time[mascara], minlength=len(times))
+        totais = [np.bincount(indice_time[mascara], weights=valores[mascara], minlength=len(times)).astype(np.int64)
+                  for valores in (pontos == 3, pontos == 1, pontos == 0, pontos, gols_pro, gols_contra, amarelos, vermelhos)]
+        medias = [np.round(np.divide(total, qtd_jogos, out=np.zeros(len(times)), where=qtd_jogos > 0), 2) for total in totais[4:]]
+        colunas = [qtd_jogos.tolist()] + [total.tolist() for total in totais[:6]] + [media.tolist() for media in medias]
+        linhas_mando += [(time_id, mando, *valores) for time_id, *valores in zip(times.tolist(), *colunas)]
+
+    # Série jogo a jogo: ordenada por time e rodada; somas acumuladas dentro de cada time
+    # (cumsum do array inteiro menos o que veio antes do primeiro jogo do time)
+    ordem = np.lexsort((jogo, rodada, indice_time))
+    indice_time, jogo, rodada = indice_time[ordem], jogo[ordem], rodada[ordem]
+    em_casa, gols_pro, gols_contra, pontos = em_casa[ordem], gols_pro[ordem], gols_contra[ordem], pontos[ordem]
+    primeiro_do_time = np.searchsorted(indice_time, indice_time)
+    fim = np.arange(1, len(jogo) + 1)
+    inicio_forma = np.maximum(fim - JOGOS_FORMA, primeiro_do_time)
+
+    def somar_ate(valores, inicio):
+        acumulado = np.concatenate([[0], np.cumsum(valores)])
+        return (acumulado[fim] - acumulado[inicio]).tolist()
+
+    pontos_forma = somar_ate(pontos, inicio_forma)
+    linhas_rodada = list(zip(times[indice_time].tolist(), rodada.tolist(), jogo.tolist(), np.where(em_casa, 'CASA', 'FORA').tolist(),
+                             gols_pro.tolist(), gols_contra.tolist(), pontos.tolist(), somar_ate(pontos, primeiro_do_time),
+                             pontos_forma, somar_ate(gols_pro, inicio_forma), somar_ate(gols_contra, inicio_forma)))
+
+    # ESTATISTICAS_TIME: gols da linha TOTAL (as primeiras de linhas_mando) e a forma no último jogo de cada time
+    ultimo_do_time = np.searchsorted(indice_time, np.arange(len(times)), side='right') - 1
+    estatisticas_time = [{'time_id': linha[0], 'gols_pro': linha[7], 'gols_contra': linha[8], 'pontos_forma': pontos_forma[ultimo]}
+                         for linha, ultimo in zip(linhas_mando[:len(times)], ultimo_do_time.tolist())]
+    return {'estatisticas_time_mando': linhas_mando, 'estatisticas_time_rodada': linhas_rodada, 'estatisticas_time': estatisticas_time}
+
+def atualizar_agregados_por_time(conn: sqlite3.Connection) -> dict:
+    """
+    Recalcula os agregados por time (calcular_agregados_por_time) e grava só o que mudou:
+    as tabelas de TABELAS_DE_AGREGADOS via sincronizar_tabela e as colunas de gols/forma
+    de ESTATISTICAS_TIME (só dos times que já têm linha, gravada pelo main_run).
+
+    Retorna:
+        dict: {tabela: linhas inseridas/alteradas/removidas}.
+    """
+    agregados = calcular_agregados_por_time(conn)
+    alteradas = {}
+    with transacao(conn):
+        for tabela, (chave, colunas) in TABELAS_DE_AGREGADOS.items():
+            carregar_tabela_temporaria(conn, f"{tabela}_calculada", chave + colunas, agregados[tabela])
+            alteradas[tabela] = sincronizar_tabela(conn, tabela, chave, colunas, f"SELECT * FROM {tabela}_calculada")
+        antes = conn.total_changes
+        conn.executemany("UPDATE estatisticas_time SET gols_pro = :gols_pro, gols_contra = :gols_contra, pontos_forma = :pontos_forma "
+                         "WHERE time_id = :time_id AND (gols_pro IS NOT :gols_pro OR gols_contra IS NOT :gols_contra "
+                         "OR pontos_forma IS NOT :pontos_forma)", agregados['estatisticas_time'])
+        alteradas['estatisticas_time'] = conn.total_changes - antes
+    return alteradas
+
+def salvar_dados_no_banco(estatisticas_jogadores, times_info, jogos_finalizados_info, todas_as_partidas_info, estatisticas_times, todas_as_escalacoes, lista_final_elenco, rodadas_inalteradas=None, fluxo_rodadas=None):
+    """
+    Salva todos os dados coletados, utilizando a nova estrutura de banco de dados:
+    - TIMES
+    - ELENCO (Mestre de Jogadores com foto única por time)
+    - ESTATISTICAS_TIME
+    - PARTIDAS (Cabeçalho)
+    - PARTIDAS_ELENCO (Ligação de Jogador/Jogo)
+    - ATLETAS (Dados da CBF - Mantidos, mas não alterados aqui)
+
+    Todas as tabelas são gravadas em uma única transação, com um executemany por
+    tabela (ver gravar_linhas_em_lote). Em seguida as tabelas de leitura do app
+    (vw_*) são recalculadas a partir delas (ver atualizar_tabelas_de_leitura).
+    Se chamada dentro de uma transação já aberta (main_run), entra nela.
+
+    `rodadas_inalteradas`: rodadas cujo conteúdo na API não mudou desde a última
+    coleta. Suas linhas em PARTIDAS/JOGOS_FINALIZADOS não são regravadas, desde
+    que a rodada já esteja presente na tabela.
+
+    `fluxo_rodadas`: retorno de gravar_rodadas_em_fluxo, quando as partidas já foram
+    gravadas rodada a rodada na mesma transação (main_run). Entra no relatório de
+    linhas alteradas e na decisão de rodar o ANALYZE.
+    """
+    print("\nSalvando novos dados consolidados no banco de dados...")
+
+    with usar_conexao() as conn, transacao(conn):
+        # Rodadas inalteradas que já estão gravadas podem ser puladas
+        if rodadas_inalteradas:
+            rodadas_gravadas = {linha[0] for linha in conn.execute("SELECT DISTINCT rodada FROM partidas")}
+            rodadas_puladas = set(rodadas_inalteradas) & rodadas_gravadas
+            if rodadas_puladas:
+                print(f"   > {len(rodadas_puladas)} rodadas inalteradas desde a última coleta não serão regravadas.")
+            todas_as_partidas_info = [jogo for jogo in todas_as_partidas_info if jogo['rodada'] not in rodadas_puladas]
+            jogos_finalizados_info = [jogo for jogo in jogos_finalizados_info if jogo['rodada'] not in rodadas_puladas]
+
+        linhas = montar_linhas_para_o_banco(estatisticas_jogadores, times_info, jogos_finalizados_info, todas_as_partidas_info,
+                                            estatisticas_times, todas_as_escalacoes, lista_final_elenco)
+        linhas['partidas_elenco_obsoletas'] = listar_ligacoes_obsoletas(conn, linhas['partidas_elenco'])
+        print(f"   > Salvando {len(linhas['times'])} times...")
+        print(f"   > Salvando {len(linhas['elenco'])} entradas únicas no ELENCO...")
+        print(f"   > Salvando {len(linhas['estatisticas_time'])} estatísticas de times...")
+        if fluxo_rodadas is None:
+            print(f"   > Atualizando {len(linhas['atletas'])} atletas (Dados CBF)...")
+            print(f"   > Salvando {len(linhas['partidas'])} partidas...")
+            print(f"   > Registrando {len(linhas['jogos_finalizados'])} jogos finalizados...")
+        print(f"   > Populando a tabela de ligação PARTIDAS_ELENCO com {len(linhas['partidas_elenco'])} linhas "
+              f"({len(linhas['partidas_elenco_obsoletas'])} ligações obsoletas removidas)...")
+
+        alteradas = gravar_linhas_em_lote(conn, linhas)
+        enviadas = sum(len(v) for v in linhas.values())
+        if fluxo_rodadas is not None:
+            tabelas = [*SQL_GRAVACAO_POR_TABELA, *(t for t in fluxo_rodadas['alteradas'] if t not in SQL_GRAVACAO_POR_TABELA)]
+            alteradas = {tabela: alteradas.get(tabela, 0) + fluxo_rodadas['alteradas'].get(tabela, 0)
+                         for tabela in tabelas if tabela in alteradas or tabela in fluxo_rodadas['alteradas']}
+            enviadas += fluxo_rodadas['enviadas']
+        print(f"   > Calculando os agregados por time ({', '.join(TABELAS_DE_AGREGADOS)}, gols e forma em ESTATISTICAS_TIME)...")
+        alteradas_agregados = atualizar_agregados_por_time(conn)
+        print(f"   > Atualizando as tabelas de leitura do app ({', '.join(TABELAS_DE_LEITURA)})...")
+        alteradas_leitura = atualizar_tabelas_de_leitura(conn)
+        if any(alteradas.values()) or any(alteradas_agregados.values()) or any(alteradas_leitura.values()):
+            # Atualiza as estatísticas do planejador (sqlite_stat1), que vão junto no .db
+            # publicado e servem também às consultas do app. Sem mudanças, nada é regravado.
+            conn.execute("ANALYZE")
+    print("✅ Dados salvos/atualizados com sucesso em todas as tabelas, incluindo ELENCO.")
+    detalhe = ', '.join(f"{tabela}: {qtd}" for tabela, qtd in alteradas.items() if qtd)
+    print(f"📊 Linhas alteradas nesta execução: {sum(alteradas.values())} de {enviadas} enviadas"
+          f"{f' ({detalhe})' if detalhe else ''}")
+    print(f"📊 Agregados por time: {', '.join(f'{tabela}: {qtd} linhas alteradas' for tabela, qtd in alteradas_agregados.items())}")
+    print(f"📊 Tabelas de leitura: {', '.join(f'{tabela}: {qtd} linhas alteradas' for tabela, qtd in alteradas_leitura.items())}")
+
+# ==============================================================================
+# IMAGENS LOCAIS (fotos e escudos em miniaturas WebP, endereçadas pelo conteúdo)
+# ==============================================================================
+# O app carregava url_foto e url_escudo direto do 365Scores a cada tela. Cada URL de
+# foto (ELENCO) e de escudo (TIMES) agora é baixada uma única vez: o hash do conteúdo
+# é a chave da imagem, então URLs diferentes com a mesma imagem (ex.: a silhueta dos
+# jogadores sem foto) geram um único conjunto de miniaturas WebP em PASTA_IMAGENS, nos
+# tamanhos de TAMANHOS_MINIATURAS. A tabela IMAGENS guarda url -> chave: só URL nova
+# (ou cujas miniaturas sumiram da pasta) é baixada. ELENCO.chave_foto e
+# TIMES.chave_escudo apontam para os arquivos (ver arquivo_miniatura).
+# No robô (.github/workflows/main.yml) a pasta fica no cache entre execuções e é
+# publicada como imagens.zip na release "dados", ao lado do banco. O app ainda lê
+# url_foto/url_escudo: usar as chaves é uma mudança à parte, no app.
+
+def arquivo_miniatura(chave: str, lado: int, pasta: Optional[str] = None) -> str:
+    """Caminho da miniatura de `lado` px da imagem `chave` ('{chave}_{lado}.webp')."""
+    return os.path.join(pasta or PASTA_IMAGENS, f"{chave}_{lado}.webp")
+
+def miniaturas_existem(chave: str, tipo: str, pasta: Optional[str] = None) -> bool:
+    return all(os.path.exists(arquivo_miniatura(chave, lado, pasta)) for lado in TAMANHOS_MINIATURAS[tipo])
+
+def chave_da_imagem(conteudo: bytes) -> str:
+    """Chave da imagem: os 16 primeiros dígitos hexadecimais do SHA-256 do conteúdo."""
+    return hashlib.sha256(conteudo).hexdigest()[:16]
+
+def gerar_miniaturas(conteudo: bytes, chave: str, tipo: str, pasta: Optional[str] = None) -> int:
+    """
+    Grava as miniaturas WebP de TAMANHOS_MINIATURAS[tipo] (proporção mantida, sem
+    ampliar imagens menores). Levanta UnidentifiedImageError/OSError se o conteúdo
+    não for uma imagem.
+
+    Retorna:
+        int: Miniaturas gravadas (as que já existem não são refeitas).
+    """
+    pasta = pasta or PASTA_IMAGENS
+    os.makedirs(pasta, exist_ok=True)
+    with Image.open(io.BytesIO(conteudo)) as original:
+        transparente = original.mode in ('RGBA', 'LA') or 'transparency' in original.info
+        imagem = original.convert('RGBA' if transparente else 'RGB')
+    gravadas = 0
+    for lado in TAMANHOS_MINIATURAS[tipo]:
+        destino = arquivo_miniatura(chave, lado, pasta)
+        if os.path.exists(destino):
+            continue
+        miniatura = imagem.copy()
+        miniatura.thumbnail((lado, lado), Image.Resampling.LANCZOS)
+        temporario = destino + '.tmp'
+        miniatura.save(temporario, 'WEBP', quality=QUALIDADE_WEBP)
+        os.replace(temporario, destino)
+        gravadas += 1
+    return gravadas
+
+async def baixar_imagem_async(url: str) -> Optional[bytes]:
+    """Conteúdo da imagem (sem passar pelo cache HTTP). Retorna None em caso de erro."""
+    try:
+        response = await http_get_async(url, usar_cache=False)
+        return response.content
+    except Exception as e:
+        descricao = 'tempo esgotado' if isinstance(e, asyncio.TimeoutError) else e
+        print(f"   > Erro ao baixar a imagem {url}: {descricao}")
+        return None
+
+def atualizar_imagens_locais(conn: sqlite3.Connection, pasta: Optional[str] = None, agora: Optional[datetime] = None) -> dict:
+    """
+    Baixa (pelo motor HTTP, em paralelo) as fotos e escudos ainda sem imagem local,
+    gera as miniaturas dos conteúdos novos e aponta ELENCO.chave_foto e
+    TIMES.chave_escudo para elas.
+
+    Retorna:
+        dict: {'urls', 'baixadas', 'conteudos_novos', 'miniaturas', 'falhas', 'alteradas'},
+              em que 'alteradas' são as linhas de IMAGENS, ELENCO e TIMES que mudaram.
+    """
+    pasta = pasta or PASTA_IMAGENS
+    baixado_em = (agora or datetime.now()).isoformat(timespec='seconds')
+    urls = {}
+    for tipo, consulta in (('escudo', "SELECT url_escudo FROM times"), ('foto', "SELECT url_foto FROM elenco")):
+        for (url,) in conn.execute(consulta):
+            if url and url.startswith(('http://', 'https://')):
+                urls.setdefault(url, tipo)
+    conhecidas = dict(conn.execute("SELECT url, chave FROM imagens"))
+    a_baixar = [url for url, tipo in urls.items()
+                if url not in conhecidas or not miniaturas_existem(conhecidas[url], tipo, pasta)]
+
+    resumo = {'urls': len(urls), 'baixadas': 0, 'conteudos_novos': 0, 'miniaturas': 0, 'falhas': 0, 'alteradas': 0}
+    linhas = []
+    conteudos = executar_coleta_http(*(baixar_imagem_async(url) for url in a_baixar)) if a_baixar else []
+    for url, conteudo in zip(a_baixar, conteudos):
+        if conteudo is None:
+            resumo['falhas'] += 1
+            continue
+        resumo['baixadas'] += 1
+        chave = chave_da_imagem(conteudo)
         try:
-            time.sleep(1)
-            response = requests.get(url_rodada, headers=HEADERS, timeout=20)
-            if response.status_code == 429: time.sleep(10); response = requests.get(url_rodada, headers=HEADERS, timeout=20)
-            response.raise_for_status()
-            dados_api = response.json()
-            for grupo_de_jogos in dados_api.get('jogos', []):
-                for jogo in grupo_de_jogos.get('jogo', []):
-                    jogo_id = jogo.get('id_jogo')
-                    if not jogo_id: continue    
-                    mandante = jogo.get('mandante', {}); visitante = jogo.get('visitante', {})
-                    todas_as_partidas_info.append({'id_jogo': jogo_id, 'rodada': i, 'data': jogo.get('data'), 'hora': jogo.get('hora'), 'local': jogo.get('local'), 'mandante_id': mandante.get('id'), 'mandante_nome': mandante.get('nome'), 'mandante_url_escudo': mandante.get('url_escudo'), 'mandante_gols': mandante.get('gols'), 'visitante_id': visitante.get('id'), 'visitante_nome': visitante.get('nome'), 'visitante_url_escudo': visitante.get('url_escudo'), 'visitante_gols': visitante.get('gols')})
-                    documentos = jogo.get('documentos')
-                    if documentos and isinstance(documentos, list) and len(documentos) > 0:
-                        jogos_finalizados_info.append({'id_jogo': jogo_id, 'rodada': i})
-                    for time_info in [mandante, visitante]:
-                        time_id = time_info.get('id')
-                        if time_id and time_id not in times_info: times_info[time_id] = {'nome': time_info.get('nome'), 'url_escudo': time_info.get('url_escudo')}
-                    for penalidade in jogo.get('penalidades', []):
-                        if penalidade.get('tipo') == 'PENALIDADE':
-                            if penalidade.get('atleta_camisa') is None: continue
-                            atleta_id = int(penalidade.get('atleta_id', 0)); clube_id = int(penalidade.get('clube_id', 0)); atleta_apelido = penalidade.get('atleta_apelido')
-                            if not all([atleta_id, clube_id, atleta_apelido]): continue
-                            if atleta_id not in estatisticas_jogadores:
-                                estatisticas_jogadores[atleta_id] = {'nome': atleta_apelido, 'time_id': clube_id, 'amarelos': 0, 'vermelhos': 0, 'rodada_ultimo_vermelho': 0, 'rodada_suspensao_amarelo': 0}
-                            resultado = penalidade.get('resultado')
-                            if resultado == 'AMARELO':
-                                estatisticas_jogadores[atleta_id]['amarelos'] += 1
-                                if estatisticas_jogadores[atleta_id]['amarelos'] > 0 and estatisticas_jogadores[atleta_id]['amarelos'] % 3 == 0:
-                                    estatisticas_jogadores[atleta_id]['rodada_suspensao_amarelo'] = i
-                            elif resultado == 'VERMELHO':
-                                estatisticas_jogadores[atleta_id]['vermelhos'] += 1
-                                estatisticas_jogadores[atleta_id]['rodada_ultimo_vermelho'] = i
-                            elif resultado == 'VERMELHO2AMARELO':
-                                estatisticas_jogadores[atleta_id]['amarelos'] += 1
-                                estatisticas_jogadores[atleta_id]['vermelhos'] += 1
-                                estatisticas_jogadores[atleta_id]['rodada_ultimo_vermelho'] = i
-                                if estatisticas_jogadores[atleta_id]['amarelos'] > 0 and estatisticas_jogadores[atleta_id]['amarelos'] % 3 == 0:
-                                    estatisticas_jogadores[atleta_id]['rodada_suspensao_amarelo'] = i
-        except Exception as e:
-            print(f"   > Erro ao buscar rodada {i}: {e}. Pulando.")
+            gravadas = gerar_miniaturas(conteudo, chave, urls[url], pasta)
+        except (UnidentifiedImageError, OSError) as e:
+            print(f"   > Imagem inválida em {url}: {e}")
+            resumo['falhas'] += 1
             continue
-    return estatisticas_jogadores, times_info, jogos_finalizados_info, todas_as_partidas_info
+        resumo['miniaturas'] += gravadas
+        resumo['conteudos_novos'] += bool(gravadas)
+        linhas.append((url, chave, urls[url], baixado_em))
+
+    with transacao(conn):
+        antes = conn.total_changes
+        conn.executemany(montar_sql_upsert('imagens', ('url',), ('chave', 'tipo', 'baixado_em'), comparar=('chave', 'tipo')), linhas)
+        for tabela, coluna_url, coluna_chave in (('elenco', 'url_foto', 'chave_foto'), ('times', 'url_escudo', 'chave_escudo')):
+            nova_chave = f"(SELECT chave FROM imagens WHERE url = {tabela}.{coluna_url})"
+            conn.execute(f"UPDATE {tabela} SET {coluna_chave} = {nova_chave} WHERE {coluna_chave} IS NOT {nova_chave}")
+        resumo['alteradas'] = conn.total_changes - antes
+    return resumo
+
+# ==============================================================================
+# EXPORTAÇÃO EM TEXTO (NDJSON versionável no git, no lugar do .db binário)
+# ==============================================================================
+# O banco é exportado para PASTA_EXPORTACAO_TEXTO como NDJSON: uma linha JSON por
+# registro, ordenada pela chave, com um arquivo por tabela (ou por rodada, nas
+# tabelas grandes). Uma coleta que muda poucas linhas muda poucas linhas de texto,
+# e o git guarda só essa diferença. O .db é reconstruído com importar_banco_de_texto.
+# As tabelas de leitura (vw_*), os agregados por time e o sqlite_stat1 não são
+# exportados: são refeitos a partir das tabelas base na importação.
+
+# {tabela: (ORDER BY estável, expressão da rodada de cada linha ou None = arquivo único, colunas não exportadas)}
+EXPORTACAO_POR_TABELA = {
+    'times': ('id', None, ()),
+    'elenco': ('id_jogador', None, ()),
+    'atletas': ('id', None, ()),
+    'estatisticas_time': ('time_id', None, ('gols_pro', 'gols_contra', 'pontos_forma')),
+    'jogos_finalizados': ('id_jogo', None, ()),
+    'status_coleta': ('chave', None, ()),
+    'rodadas_cbf': ('id_competicao, rodada', 'rodada', ()),
+    'partidas': ('id_jogo', 'rodada', ()),
+    'cartoes_eventos': ('id_jogo, atleta_id, sequencia', 'rodada', ()),
+    'fotos_elencos': ('time_365', None, ()),
+    'fotos_jogadores': ('chave', None, ()),
+    'imagens': ('url', None, ()),
+    # O id AUTOINCREMENT é só interno: exportá-lo faria linhas iguais mudarem de id entre coletas
+    'partidas_elenco': ('jogo_id, id_time, id_jogador',
+                        '(SELECT p.rodada FROM partidas p WHERE p.id_jogo = partidas_elenco.jogo_id)', ('id',)),
+}
+
+def comprimir_payload_rodada(dados_api) -> bytes:
+    """JSON da rodada no formato gravado em RODADAS_CBF.payload (chaves ordenadas, zlib)."""
+    return zlib.compress(json.dumps(dados_api, ensure_ascii=False, sort_keys=True).encode('utf-8'))
+
+# Colunas BLOB exportadas como JSON legível: {(tabela, coluna): (para_texto, do_texto)}
+CONVERSORES_EXPORTACAO = {
+    ('rodadas_cbf', 'payload'): (lambda payload: json.loads(zlib.decompress(payload)), comprimir_payload_rodada),
+}
 
-def salvar_dados_no_banco(estatisticas_jogadores, times_info, jogos_finalizados_info, todas_as_partidas_info, estatisticas_times, todas_as_escalacoes, lista_final_elenco):
+def _arquivo_exportacao(tabela: str, rodada) -> str:
+    """Caminho relativo do arquivo NDJSON de uma tabela (e rodada, se particionada)."""
+    if EXPORTACAO_POR_TABELA[tabela][1] is None:
+        return f"{tabela}.ndjson"
+    return os.path.join(tabela, f"rodada_{rodada:02d}.ndjson" if rodada is not None else "sem_rodada.ndjson")
+
+def exportar_banco_para_texto(pasta: Optional[str] = None) -> dict:
     """
-    Salva todos os dados coletados, utilizando a nova estrutura de banco de dados:
-    - TIMES
-    - ELENCO (Mestre de Jogadores com foto única por time)
-    - ESTATISTICAS_TIME
-    - PARTIDAS (Cabeçalho)
-    - PARTIDAS_ELENCO (Ligação de Jogador/Jogo)
-    - ATLETAS (Dados da CBF - Mantidos, mas não alterados aqui)
+    Exporta as tabelas de EXPORTACAO_POR_TABELA para NDJSON em `pasta`.
+    Só reescreve os arquivos cujo conteúdo mudou e remove os que deixaram de existir.
+
+    Args:
+        pasta (str): Destino (padrão: PASTA_EXPORTACAO_TEXTO).
+
+    Retorna:
+        dict: {'arquivos': total, 'alterados': reescritos, 'removidos': apagados}.
+    """
+    pasta = pasta or PASTA_EXPORTACAO_TEXTO
+    conteudos = {}
+    with usar_conexao() as conn:
+        tabelas_existentes = {linha[0] for linha in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        for tabela, (ordem, expressao_rodada, ignoradas) in EXPORTACAO_POR_TABELA.items():
+            if tabela not in tabelas_existentes:
+                continue
+            cursor = conn.execute(f"SELECT {expressao_rodada or 'NULL'}, * FROM {tabela} ORDER BY {ordem}")
+            colunas = [descricao[0] for descricao in cursor.description[1:]]
+            for rodada, *valores in cursor:
+                registro = {}
+                for coluna, valor in zip(colunas, valores):
+                    if coluna in ignoradas:
+                        continue
+                    conversor = CONVERSORES_EXPORTACAO.get((tabela, coluna))
+                    registro[coluna] = conversor[0](valor) if conversor else valor
+                linha = json.dumps(registro, ensure_ascii=False, separators=(',', ':'))
+                conteudos.setdefault(_arquivo_exportacao(tabela, rodada), []).append(linha)
+        versao = conn.execute("PRAGMA user_version").fetchone()[0]
+
+    conteudos['manifesto.json'] = [json.dumps({'versao_esquema': versao, 'tabelas': list(EXPORTACAO_POR_TABELA)}, ensure_ascii=False)]
+
+    alterados = 0
+    for relativo, linhas in conteudos.items():
+        caminho = os.path.join(pasta, relativo)
+        texto = '\n'.join(linhas) + '\n'
+        try:
+            with open(caminho, encoding='utf-8', newline='') as f:
+                if f.read() == texto:
+                    continue
+        except FileNotFoundError:
+            os.makedirs(os.path.dirname(caminho), exist_ok=True)
+        with open(caminho, 'w', encoding='utf-8', newline='') as f:
+            f.write(texto)
+        alterados += 1
+
+    removidos = 0
+    for raiz, _, arquivos in os.walk(pasta):
+        for nome in arquivos:
+            caminho = os.path.join(raiz, nome)
+            if os.path.relpath(caminho, pasta) not in conteudos:
+                os.remove(caminho)
+                removidos += 1
+
+    print(f"📝 Banco exportado em texto para {pasta}: {len(conteudos)} arquivos, {alterados} alterados, {removidos} removidos.")
+    return {'arquivos': len(conteudos), 'alterados': alterados, 'removidos': removidos}
+
+def importar_banco_de_texto(pasta: Optional[str] = None, destino: Optional[str] = None) -> int:
+    """
+    Reconstrói o banco a partir da exportação NDJSON: cria um arquivo novo com as
+    migrações, carrega todas as tabelas em uma transação (um executemany por
+    arquivo), recalcula as tabelas de leitura, roda ANALYZE e só então substitui
+    o `destino`.
+
+    Args:
+        pasta (str): Origem (padrão: PASTA_EXPORTACAO_TEXTO).
+        destino (str): Banco a gerar (padrão: DB_FILE).
+
+    Retorna:
+        int: Quantidade de linhas importadas.
     """
+    pasta = pasta or PASTA_EXPORTACAO_TEXTO
+    destino = destino or DB_FILE
+    with open(os.path.join(pasta, 'manifesto.json'), encoding='utf-8') as f:
+        manifesto = json.load(f)
+    if manifesto['versao_esquema'] > VERSAO_ESQUEMA_BANCO:
+        raise ValueError(f"Exportação na versão de esquema {manifesto['versao_esquema']}, mais nova que a "
+                         f"suportada por este script ({VERSAO_ESQUEMA_BANCO}).")
+
+    temporario = destino + '.importando'
+    if os.path.exists(temporario):
+        os.remove(temporario)
+    total = 0
     try:
-        conn = sqlite3.connect(DB_FILE)
-        cursor = conn.cursor()
-    except NameError:
-        print("❌ ERRO FATAL: Variáveis de caminho do DB (DB_FILE/DB_FOLDER_PATH) não definidas. Não foi possível conectar ao banco.")
-        return
+        conn = abrir_conexao_escrita(temporario)
+        try:
+            aplicar_migracoes(conn)
+            with transacao(conn):
+                for tabela in manifesto['tabelas']:
+                    if tabela not in EXPORTACAO_POR_TABELA:
+                        continue
+                    arquivo_unico = os.path.join(pasta, f"{tabela}.ndjson")
+                    pasta_tabela = os.path.join(pasta, tabela)
+                    if os.path.isdir(pasta_tabela):
+                        arquivos = [os.path.join(pasta_tabela, nome) for nome in sorted(os.listdir(pasta_tabela))]
+                    else:
+                        arquivos = [arquivo_unico] if os.path.exists(arquivo_unico) else []
+                    for arquivo in arquivos:
+                        with open(arquivo, encoding='utf-8') as f:
+                            registros = [json.loads(linha) for linha in f if linha.strip()]
+                        if not registros:
+                            continue
+                        colunas = list(registros[0])
+                        conversores = [CONVERSORES_EXPORTACAO.get((tabela, coluna)) for coluna in colunas]
+                        linhas = [tuple(conversor[1](registro[coluna]) if conversor else registro[coluna]
+                                        for coluna, conversor in zip(colunas, conversores))
+                                  for registro in registros]
+                        conn.executemany(f"INSERT INTO {tabela} ({', '.join(colunas)}) VALUES ({', '.join('?' * len(colunas))})", linhas)
+                        total += len(linhas)
+                atualizar_agregados_por_time(conn)
+                atualizar_tabelas_de_leitura(conn)
+                conn.execute("ANALYZE")
+        finally:
+            fechar_conexao_escrita(conn)
+        os.replace(temporario, destino)
+    finally:
+        if os.path.exists(temporario):
+            os.remove(temporario)
+    print(f"📥 Banco reconstruído em {destino} a partir de {pasta}: {total} linhas importadas.")
+    return total
 
-    print("\nSalvando novos dados consolidados no banco de dados...")
+# ==============================================================================
+# TEMPORADAS EM BANCOS SEPARADOS (shards) + CATÁLOGO COM ATTACH SOB DEMANDA
+# ==============================================================================
+# Cada temporada/competição tem o seu banco em PASTA_TEMPORADAS (DB_FILE é o da
+# temporada atual), então a coleta grava, analisa (ANALYZE) e publica só a
+# temporada em andamento, por maior que fique o histórico. O catálogo
+# (CATALOGO_DB_FILE) lista os shards existentes; consultar_temporadas faz ATTACH
+# (somente leitura) dos shards pedidos para rodar uma consulta em várias temporadas.
 
-    # --- 1. TIMES ---
-    print(f"   > Salvando {len(times_info)} times...")
-    for time_id, dados_time in times_info.items():
-        # Nota: Usei 'nome_curto' e 'url_escudo' que foram populados na Parte I/II
-        cursor.execute('INSERT OR REPLACE INTO times (id, nome, url_escudo, nome_curto) VALUES (?, ?, ?, ?)', 
-                       (time_id, dados_time.get('nome'), dados_time.get('url_escudo'), dados_time.get('nome_curto')))
+# Máximo de bancos anexados por conexão no SQLite padrão (SQLITE_MAX_ATTACHED)
+LIMITE_BANCOS_ANEXADOS = 10
 
-    # --- 2. ELENCO MESTRE (RESOLVE O PROBLEMA DA FOTO) ---
-    print(f"   > Salvando {len(lista_final_elenco)} entradas únicas no ELENCO...")
-    for jogador in lista_final_elenco:
-        # Usamos INSERT OR IGNORE para evitar erro se a chave UNIQUE(id_time, nome_jogador) já existir
-        cursor.execute('''
-            INSERT OR IGNORE INTO elenco 
-            (id_jogador, id_time, nome_jogador, numero, posicao, url_foto) 
-            VALUES (?, ?, ?, ?, ?, ?)
-        ''', (jogador['id_jogador'], jogador['id_time'], jogador['nome_jogador'], 
-              jogador['numero'], jogador['posicao'], jogador['url_foto']))
+def adotar_banco_legado():
+    """Move o brasileirao.db único (anterior aos shards) para o shard da temporada atual, se ainda não houver um."""
+    if os.path.exists(DB_FILE_LEGADO) and not os.path.exists(DB_FILE):
+        os.makedirs(os.path.dirname(DB_FILE), exist_ok=True)
+        os.replace(DB_FILE_LEGADO, DB_FILE)
+        print(f"📦 Banco único antigo adotado como o da temporada {ANO_COMPETICAO}: {DB_FILE}")
 
-    # --- 3. ATLETAS (Geral) - Mantido do seu código original ---
-    print(f"   > Atualizando {len(estatisticas_jogadores)} atletas (Dados CBF)...")
-    for atleta_id, dados_atleta in estatisticas_jogadores.items():
-        rodada_suspensao = dados_atleta.get('rodada_suspensao_amarelo', 0)
-        
-        cursor.execute('INSERT OR REPLACE INTO atletas (id, apelido, cartoes_amarelos, cartoes_vermelhos, rodada_ultimo_vermelho, rodada_suspensao_amarelo, time_id) VALUES (?, ?, ?, ?, ?, ?, ?)',
-                       (atleta_id, dados_atleta['nome'], dados_atleta['amarelos'], dados_atleta['vermelhos'], dados_atleta['rodada_ultimo_vermelho'], rodada_suspensao, dados_atleta['time_id']))
-    
-    # --- 4. ESTATÍSTICAS TIME ---
-    print(f"   > Salvando {len(estatisticas_times)} estatísticas de times...")
-    for time_id, stats in estatisticas_times.items():
-        cursor.execute('''
-                INSERT OR REPLACE INTO estatisticas_time 
-                (time_id, posicao, pontos, ultimos_jogos, media_cartoes_amarelos, total_cartoes_vermelhos, media_escanteios) 
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                time_id, 
-                stats.get('posicao'), 
-                stats.get('pontos'), 
-                stats.get('ultimos_jogos'), 
-                stats.get('media_amarelos', 0.0),      # Valor do main_run
-                stats.get('total_vermelhos', 0),       # Valor do main_run
-                stats.get('media_escanteios', 0.0)     # Valor do main_run
-            ))
+def atualizar_catalogo() -> list:
+    """
+    Sincroniza o catálogo com os arquivos de PASTA_TEMPORADAS (nome no formato
+    ARQUIVO_BANCO_TEMPORADA): registra os novos, atualiza tamanho/data e remove
+    os que não existem mais.
 
-    # --- 5. PARTIDAS (Cabeçalho) ---
-    print(f"   > Salvando {len(todas_as_partidas_info)} partidas...")
-    for jogo in todas_as_partidas_info:
-        cursor.execute('''INSERT OR REPLACE INTO partidas (
-            id_jogo, rodada, data, hora, local, mandante_id, mandante_url_escudo, mandante_gols, mandante_formacao, 
-            visitante_id, visitante_url_escudo, visitante_gols, visitante_formacao
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)''',
-            (jogo['id_jogo'], jogo['rodada'], jogo.get('data'), jogo.get('hora', '00:00'), 'Local Desconhecido', 
-             jogo.get('mandante_id'), jogo.get('mandante_url_escudo'), jogo.get('mandante_gols', '0'), jogo.get('mandante_formacao'),
-             jogo.get('visitante_id'), jogo.get('visitante_url_escudo'), jogo.get('visitante_gols', '0'), jogo.get('visitante_formacao')))
+    Retorna:
+        list: [(id_competicao, ano, caminho)] ordenada por ano e competição.
+    """
+    padrao = re.compile(re.escape(ARQUIVO_BANCO_TEMPORADA).replace(r'\{ano\}', r'(\d+)').replace(r'\{id_competicao\}', r'(\d+)') + '$')
+    encontrados = []
+    if os.path.isdir(PASTA_TEMPORADAS):
+        for nome in sorted(os.listdir(PASTA_TEMPORADAS)):
+            achado = padrao.match(nome)
+            if achado:
+                caminho = os.path.join(PASTA_TEMPORADAS, nome)
+                estado = os.stat(caminho)
+                encontrados.append((int(achado.group(2)), int(achado.group(1)), nome, estado.st_size,
+                                    datetime.fromtimestamp(estado.st_mtime).isoformat(timespec='seconds')))
 
-    # --- 6. JOGOS FINALIZADOS ---
-    print(f"   > Registrando {len(jogos_finalizados_info)} jogos finalizados...")
-    for jogo in jogos_finalizados_info:
-         cursor.execute("INSERT OR REPLACE INTO jogos_finalizados (id_jogo, rodada) VALUES (?, ?)", 
-                        (jogo['id_jogo'], jogo['rodada']))
+    conn = sqlite3.connect(CATALOGO_DB_FILE)
+    try:
+        with conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS temporadas (
+                    id_competicao INTEGER NOT NULL,
+                    ano INTEGER NOT NULL,
+                    arquivo TEXT NOT NULL,         -- Nome do arquivo em PASTA_TEMPORADAS
+                    tamanho_bytes INTEGER,
+                    modificado_em TEXT,
+                    PRIMARY KEY (id_competicao, ano)
+                )
+            ''')
+            conn.executemany(montar_sql_upsert('temporadas', ('id_competicao', 'ano'), ('arquivo', 'tamanho_bytes', 'modificado_em')),
+                             encontrados)
+            conn.execute("CREATE TEMP TABLE encontrados (id_competicao INTEGER, ano INTEGER)")
+            conn.executemany("INSERT INTO encontrados VALUES (?, ?)", [linha[:2] for linha in encontrados])
+            conn.execute("DELETE FROM temporadas WHERE (id_competicao, ano) NOT IN (SELECT id_competicao, ano FROM encontrados)")
+        return [(id_competicao, ano, os.path.join(PASTA_TEMPORADAS, arquivo))
+                for id_competicao, ano, arquivo in conn.execute("SELECT id_competicao, ano, arquivo FROM temporadas ORDER BY ano, id_competicao")]
+    finally:
+        conn.close()
 
+def consultar_temporadas(sql: str, parametros=(), anos=None, id_competicao: Optional[int] = None) -> list:
+    """
+    Roda a mesma consulta em várias temporadas, anexando os shards ao catálogo
+    (ATTACH somente leitura, no máximo LIMITE_BANCOS_ANEXADOS por vez) e juntando
+    os resultados com UNION ALL.
 
-    # --- 7. PARTIDAS_ELENCO (LIGAÇÃO DE ESCALAÇÃO) ---
-    print("   > Populando a tabela de ligação PARTIDAS_ELENCO...")
-    
-    # Criar um mapa de lookup rápido: (id_time_cbf, nome_jogador_normalizado) -> id_jogador_mestre
-    mapa_lookup_elenco = {
-        (e['id_time'], unidecode(e['nome_jogador']).lower().strip()): e['id_jogador'] 
-        for e in lista_final_elenco
+    Args:
+        sql (str): Consulta com {t} no lugar do esquema do shard. Ex.:
+                   "SELECT apelido, cartoes_amarelos FROM {t}.atletas WHERE cartoes_vermelhos > ?"
+        parametros (tuple): Parâmetros da consulta (repetidos para cada temporada).
+        anos (iterable): Temporadas desejadas (padrão: todas as do catálogo).
+        id_competicao (int): Filtra uma competição (padrão: todas).
+
+    Retorna:
+        list: Linhas da consulta precedidas de (ano, id_competicao), em ordem de temporada.
+    """
+    temporadas = [(competicao, ano, caminho) for competicao, ano, caminho in atualizar_catalogo()
+                  if (anos is None or ano in anos) and (id_competicao is None or competicao == id_competicao)]
+    linhas = []
+    conn = sqlite3.connect(CATALOGO_DB_FILE, uri=True)
+    try:
+        for inicio in range(0, len(temporadas), LIMITE_BANCOS_ANEXADOS):
+            lote = temporadas[inicio:inicio + LIMITE_BANCOS_ANEXADOS]
+            esquemas = [f"t{ano}_{competicao}" for competicao, ano, _ in lote]
+            for esquema, (_, _, caminho) in zip(esquemas, lote):
+                conn.execute(f"ATTACH DATABASE ? AS {esquema}", (f"file:{pathname2url(os.path.abspath(caminho))}?mode=ro",))
+            try:
+                uniao = ' UNION ALL '.join(f"SELECT {ano} AS ano, {competicao} AS id_competicao, * FROM ({sql.format(t=esquema)})"
+                                           for esquema, (competicao, ano, _) in zip(esquemas, lote))
+                linhas.extend(conn.execute(uniao, tuple(parametros) * len(lote)).fetchall())
+            finally:
+                for esquema in esquemas:
+                    conn.execute(f"DETACH DATABASE {esquema}")
+    finally:
+        conn.close()
+    return linhas
+
+# ==============================================================================
+# COMPETIÇÕES (várias por execução)
+# ==============================================================================
+# As funções de coleta leem a competição das constantes do módulo (ID_COMPETICAO_CBF,
+# TOTAL_RODADAS, DB_FILE...). O main_run percorre COMPETICOES trocando essas
+# constantes com usar_competicao, do mesmo jeito que modo_gravacao_reproducao troca
+# as de cache e coleta incremental.
+
+def competicao_atual() -> dict:
+    """Configuração (no formato de COMPETICOES) da competição para a qual as constantes apontam agora."""
+    return {
+        'nome': NOME_COMPETICAO,
+        'id_competicao': ID_COMPETICAO_CBF,
+        'ano': ANO_COMPETICAO,
+        'total_rodadas': TOTAL_RODADAS,
+        'caminho_tabela_cbf': CAMINHO_TABELA_CBF,
+        'liga_365': LIGA_365_SCORES,
+        'mapa_nomes_365_para_cbf': MAPA_NOMES_365_PARA_CBF,
+        'urls_elenco_365': URLS_ELENCO_365,
+        'db_file': DB_FILE,
+        'pasta_exportacao': PASTA_EXPORTACAO_TEXTO,
     }
-    
-    # Mapeamento reverso CBF para ID
-    nome_cbf_para_id_cbf = {info['nome']: time_id for time_id, info in times_info.items()}
 
-    for jogo_id, escalacao_data in todas_as_escalacoes.items():
-        
-        def inserir_ligacao(time_data, time_id_cbf, jogo_id):
-            if not time_data: return
-            
-            for papel_lista, papel_mestre in [('titulares', 'TITULAR'), ('reservas', 'RESERVA'), ('fora_de_jogo', 'AUSENTE')]:
-                for jogador in time_data.get(papel_lista, []):
-                    nome_norm = unidecode(jogador['nome']).lower().strip()
-                    
-                    id_jogador_mestre = mapa_lookup_elenco.get((time_id_cbf, nome_norm))
-                    
-                    if id_jogador_mestre:
-                        pos_x = jogador.get('pos_x') if papel_mestre == 'TITULAR' else None
-                        pos_y = jogador.get('pos_y') if papel_mestre == 'TITULAR' else None
-                        motivo = jogador.get('motivo', '') if papel_mestre == 'AUSENTE' else ''
-                        
-                        # ATENÇÃO: Esta inserção usa a estrutura de dados retornada pela PARTE III (antes da consolidação do ELENCO MESTRE)
-                        cursor.execute('''
-                            INSERT INTO partidas_elenco (jogo_id, id_time, id_jogador, papel, pos_x, pos_y, motivo) 
-                            VALUES (?, ?, ?, ?, ?, ?, ?)
-                        ''', (jogo_id, time_id_cbf, id_jogador_mestre, papel_mestre, pos_x, pos_y, motivo))
-
-        # Processa os dados de escalação brutos (que contêm os X/Y e o motivo)
-        if 'mandante' in escalacao_data:
-            mandante_nome_cbf = escalacao_data['mandante'].get('nome_cbf_original')
-            id_mandante = nome_cbf_para_id_cbf.get(mandante_nome_cbf)
-            inserir_ligacao(escalacao_data['mandante'], id_mandante, jogo_id)
-            
-        if 'visitante' in escalacao_data:
-            visitante_nome_cbf = escalacao_data['visitante'].get('nome_cbf_original')
-            id_visitante = nome_cbf_para_id_cbf.get(visitante_nome_cbf)
-            inserir_ligacao(escalacao_data['visitante'], id_visitante, jogo_id)
-
-    # --- FINALIZAÇÃO ---
-    conn.commit()
-    conn.close()
-    print("✅ Dados salvos/atualizados com sucesso em todas as tabelas, incluindo ELENCO.")
+def _aplicar_competicao(competicao: dict):
+    global NOME_COMPETICAO, ID_COMPETICAO_CBF, ANO_COMPETICAO, TOTAL_RODADAS, CAMINHO_TABELA_CBF, LIGA_365_SCORES
+    global MAPA_NOMES_365_PARA_CBF, URLS_ELENCO_365, DB_FILE, PASTA_EXPORTACAO_TEXTO
+    NOME_COMPETICAO = competicao['nome']
+    ID_COMPETICAO_CBF = competicao['id_competicao']
+    ANO_COMPETICAO = competicao['ano']
+    TOTAL_RODADAS = competicao['total_rodadas']
+    CAMINHO_TABELA_CBF = competicao['caminho_tabela_cbf']
+    LIGA_365_SCORES = competicao['liga_365']
+    MAPA_NOMES_365_PARA_CBF = competicao['mapa_nomes_365_para_cbf']
+    URLS_ELENCO_365 = competicao['urls_elenco_365']
+    DB_FILE = competicao.get('db_file') or os.path.join(
+        PASTA_TEMPORADAS, ARQUIVO_BANCO_TEMPORADA.format(ano=ANO_COMPETICAO, id_competicao=ID_COMPETICAO_CBF))
+    PASTA_EXPORTACAO_TEXTO = competicao.get('pasta_exportacao') or os.path.join(
+        DB_FOLDER_PATH, 'dados', f"{ANO_COMPETICAO}_{ID_COMPETICAO_CBF}")
+
+@contextmanager
+def usar_competicao(competicao: dict):
+    """
+    Aponta as constantes da competição para `competicao` durante o bloco `with`
+    e restaura as anteriores ao sair. Sem 'db_file'/'pasta_exportacao' na
+    configuração, o banco e a exportação seguem ARQUIVO_BANCO_TEMPORADA e
+    database/dados/{ano}_{id_competicao}.
+    """
+    anterior = competicao_atual()
+    _aplicar_competicao(competicao)
+    try:
+        yield
+    finally:
+        _aplicar_competicao(anterior)
 
 # ==============================================================================
 # PARTE II (Refatorada) - Funções de Scraping
@@ -557,7 +3439,7 @@ def handle_cookie_banner(driver):
         agree_button = wait.until(EC.element_to_be_clickable((By.ID, "didomi-notice-agree-button")))
         driver.execute_script("arguments[0].click();", agree_button)
         print("   > Banner de cookie aceito.")
-        time.sleep(2)
+        pausar(2)
     except Exception:
         pass
 
@@ -568,19 +3450,22 @@ def handle_ad_popup(driver):
         close_button = wait.until(EC.element_to_be_clickable((By.XPATH, "//*[contains(@class, 'external-ad_close_button')]")))
         driver.execute_script("arguments[0].click();", close_button)
         print("   > Popup de propaganda fechado.")
-        time.sleep(1)
+        pausar(1)
     except Exception:
         pass
 
-def buscar_classificacao_com_scraping(ano_competicao, times_info):
+def buscar_classificacao_com_scraping(ano_competicao, times_info, html_tabela=None):
     """
     Realiza web scraping da tabela de classificação da CBF, mapeando os nomes
     encontrados para os IDs da API.
     (Lógica original mantida, pois não interfere no problema da foto)
+
+    Se `html_tabela` for informado (baixado antes por buscar_html_classificacao_async),
+    a página não é buscada novamente.
     """
     print("\nBuscando dados de classificação via Web Scraping da CBF...")
     estatisticas_times = {}
-    url_tabela = f"https://www.cbf.com.br/futebol-brasileiro/tabelas/campeonato-brasileiro/serie-a/{ano_competicao}"
+    url_tabela = montar_url_classificacao_cbf(ano_competicao)
     
     # --------------------------------------------------------------------------
     # 1. CRIAÇÃO DO MAPA DE BUSCA (API ID -> CHAVE NORMALIZADA)
@@ -601,10 +3486,21 @@ def buscar_classificacao_com_scraping(ano_competicao, times_info):
         mapa_api_normalizado[chave_de_busca] = time_id
     # --------------------------------------------------------------------------
 
+    # Página idêntica à da última coleta (304 ou mesmo hash) e mesmos times: reaproveita o resultado já parseado
+    cache = obter_cache_http()
+    assinatura_times = hashlib.sha1(repr(sorted(mapa_api_normalizado.items(), key=str)).encode('utf-8')).hexdigest()[:12]
+    nome_derivado = f"classificacao:{assinatura_times}"
+    if cache and cache.inalterado(url_tabela):
+        guardado = cache.obter_derivado(url_tabela, nome_derivado)
+        if guardado is not None:
+            estatisticas_times = {time_id: stats for time_id, stats in guardado}
+            print(f"✅ Tabela de classificação inalterada desde a última coleta. {len(estatisticas_times)} times reaproveitados do cache.")
+            return estatisticas_times
+
     try:
-        response = requests.get(url_tabela, headers=HEADERS, timeout=20)
-        response.raise_for_status()
-        soup = BeautifulSoup(response.content, 'lxml')
+        if html_tabela is None:
+            html_tabela = http_get(url_tabela).content
+        soup = BeautifulSoup(html_tabela, 'lxml')
         container_tabela = soup.find('div', class_='styles_tableContent__dh0gO')
         
         if not container_tabela:
@@ -671,6 +3567,8 @@ def buscar_classificacao_com_scraping(ano_competicao, times_info):
                 }
         
         print(f"✅ Dados de classificação para {len(estatisticas_times)} times processados com sucesso.")
+        if cache and estatisticas_times:
+            cache.guardar_derivado(url_tabela, nome_derivado, [[time_id, stats] for time_id, stats in estatisticas_times.items()])
         return estatisticas_times
         
     except Exception as e:
@@ -759,17 +3657,12 @@ def extrair_dados_time(widget_content):
 def buscar_stats_365scores():
     """Busca estatísticas agregadas de times no 365Scores (Selenium)."""
     print("\nBuscando dados de estatísticas via Web Scraping do 365Scores...")
-    options = webdriver.ChromeOptions()
-    options.add_argument('--headless')
-    options.add_argument('--no-sandbox')
-    
-    service = ChromeService(ChromeDriverManager().install())
     driver = None
     stats_365 = {}
     
     try:
-        driver = webdriver.Chrome(service=service, options=options)
-        driver.get("https://www.365scores.com/pt-br/football/league/brasileirao-serie-a-113/stats")
+        driver = criar_driver('estatisticas_365')
+        driver.get(f"https://www.365scores.com/pt-br/football/league/{LIGA_365_SCORES}/stats")
         handle_cookie_banner(driver)
 
         print("   > Clicando na aba 'Times'...")
@@ -827,34 +3720,93 @@ def buscar_stats_365scores():
     finally:
         if driver:
             driver.quit()
-            print("   > Navegador de estatísticas fechado.")
+            print("   > Navegador de estatísticas devolvido.")
 
 # ==============================================================================
 # PARTE III (Refatorada) - Funções de Elenco e Escalação
 # ==============================================================================
 
-def buscar_fotos_jogadores(driver):
+def buscar_fotos_jogadores(driver=None, navegadores: Optional[int] = None):
     """
     Busca URLs de fotos de jogadores de todos os times e usa uma chave composta 
     (nome_time_normalizado_nome_jogador_normalizado) para evitar colisões.
+    Os elencos são buscados por buscar_fotos_por_time (em paralelo, sem `driver`)
+    e juntados na ordem de URLS_ELENCO_365, o mesmo resultado da busca sequencial.
     """
     print("\nBuscando fotos dos jogadores de todos os times...")
+    fotos_por_time = buscar_fotos_por_time(list(URLS_ELENCO_365), driver, navegadores)
     fotos_por_chave = {} # Chave: nome_time_normalizado_nome_jogador_normalizado
+    for team_name in URLS_ELENCO_365:
+        fotos_por_chave.update(fotos_por_time.get(team_name, {}))
+    print(f"\n✅ Total de {len(fotos_por_chave)} fotos de jogadores coletadas.")
+    return fotos_por_chave
+
+def buscar_fotos_por_time(nomes_times: list, driver=None, navegadores: Optional[int] = None) -> dict:
+    """
+    Busca os elencos dos times `nomes_times` (chaves de URLS_ELENCO_365).
+
+    Sem `driver`, os times são repartidos entre `navegadores` navegadores (padrão:
+    NAVEGADORES_FOTOS) emprestados por criar_driver: cada um busca o próximo time
+    ainda não buscado. Com `driver`, busca todos os times nele, um após o outro.
+
+    Retorna:
+        dict: {nome do time: {chave composta: url da foto}}, só com os times cuja
+              página de elenco carregou.
+    """
+    times = [(nome, URLS_ELENCO_365[nome]) for nome in nomes_times]
+    fila = iter(times)
+    lock_fila = threading.Lock()
+
+    def proximo_time():
+        with lock_fila:
+            return next(fila, None)
+
+    if driver is not None:
+        fotos_por_time = buscar_elencos_365(driver, proximo_time)
+    else:
+        if not times:
+            return {}
+        navegadores = max(1, min(navegadores or NAVEGADORES_FOTOS, len(times)))
+        print(f"   > {len(times)} elencos repartidos entre {navegadores} navegadores.")
+
+        def trabalhador():
+            driver_elenco = criar_driver('fotos_365')
+            try:
+                return buscar_elencos_365(driver_elenco, proximo_time)
+            finally:
+                driver_elenco.quit()
+
+        with ThreadPoolExecutor(max_workers=navegadores, thread_name_prefix='fotos') as executor:
+            futuros = [executor.submit(trabalhador) for _ in range(navegadores)]
+        fotos_por_time = {}
+        for futuro in futuros:
+            try:
+                fotos_por_time.update(futuro.result())
+            except Exception as e:
+                print(f"     - ❌ Erro em um navegador de fotos: {e}")
+    return fotos_por_time
+
+def buscar_elencos_365(driver, proximo_time) -> dict:
+    """
+    Busca no `driver` os elencos entregues por `proximo_time()` ((nome, url) ou None
+    quando não há mais times). Retorna {nome do time: {chave composta: url da foto}}.
+    """
+    fotos_por_time = {}
     wait = WebDriverWait(driver, 10)
-    for team_name, url in URLS_ELENCO_365.items():
+    for team_name, url in iter(proximo_time, None):
         try:
             print(f"   > Buscando elenco do {team_name}...")
             driver.get(url)
             wait.until(EC.presence_of_element_located((By.XPATH, "//a[contains(@class, 'squad-widget_row__')]")))
-            time.sleep(2)
+            pausar(2)
             
             soup = BeautifulSoup(driver.page_source, 'lxml')
             
             jogadores_tags = soup.find_all('a', class_=lambda c: c and 'squad-widget_row__' in c)
-            count = 0
+            fotos = fotos_por_time[team_name] = {}
             
             # NORMALIZAÇÃO DO NOME DO TIME (Usada como prefixo da chave)
-            nome_time_normalizado = unidecode(team_name).strip().lower().replace(' ', '_').replace('-', '_')
+            nome_time_normalizado = normalizar_nome_time_365(team_name)
             
             for jogador_tag in jogadores_tags:
                 nome_tag = jogador_tag.find('span', class_=lambda c: c and 'squad-widget_player_name__' in c)
@@ -867,19 +3819,120 @@ def buscar_fotos_jogadores(driver):
                     if nome_jogador_normalizado and foto_url:
                         # CRIAÇÃO DA CHAVE COMPOSTA (CHAVE QUE RESOLVE O CONFLITO DE NOME)
                         chave_unica = f"{nome_time_normalizado}_{nome_jogador_normalizado}"
+                        fotos[chave_unica] = foto_url
                         
-                        # O MAPA_ABREVIACOES é usado para o nome do time. Aqui usaremos o team_name
-                        nome_time_abreviado = MAPA_ABREVIACOES.get(team_name, team_name)
-                        
-                        fotos_por_chave[chave_unica] = foto_url
-                        count += 1
-                        
-            print(f"     - {count} fotos de jogadores encontradas para {team_name}.")
+            print(f"     - {len(fotos)} fotos de jogadores encontradas para {team_name}.")
         except Exception as e:
             print(f"     - ❌ Erro ao buscar elenco do {team_name}: {e}")
             continue
-            
-    print(f"\n✅ Total de {len(fotos_por_chave)} fotos de jogadores coletadas.")
+    return fotos_por_time
+
+def normalizar_nome_time_365(nome_365: str) -> str:
+    """Prefixo das chaves de foto de um time do 365Scores ('Atlético-MG' -> 'atletico_mg')."""
+    return unidecode(nome_365).strip().lower().replace(' ', '_').replace('-', '_')
+
+# ------------------------------------------------------------------------------
+# Cache das fotos dos elencos (FOTOS_ELENCOS e FOTOS_JOGADORES)
+# ------------------------------------------------------------------------------
+# Os elencos mudam pouco: as fotos ficam no banco, com a data da última busca de
+# cada elenco e da última vez em que cada foto foi vista. Um elenco só é buscado
+# de novo quando o cache passa de VALIDADE_FOTOS_ELENCO_DIAS ou quando a escalação
+# traz um jogador do time sem foto (no máximo uma vez a cada
+# ESPERA_NOVA_BUSCA_ELENCO_HORAS: o 365Scores pode não mostrar o jogador no elenco).
+
+def ler_cache_de_fotos(conn) -> tuple:
+    """
+    Retorna:
+        tuple: ({chave composta: url da foto}, {nome do time: datetime da última busca do elenco}).
+    """
+    fotos = dict(conn.execute("SELECT chave, url_foto FROM fotos_jogadores"))
+    buscas = {time_365: datetime.fromisoformat(buscado_em)
+              for time_365, buscado_em in conn.execute("SELECT time_365, buscado_em FROM fotos_elencos")}
+    return fotos, buscas
+
+def jogadores_sem_foto_por_time(todas_as_escalacoes: dict, fotos_por_chave: dict) -> dict:
+    """{nome do time (URLS_ELENCO_365): quantos jogadores das escalações não têm foto no cache}."""
+    time_por_prefixo = {normalizar_nome_time_365(nome): nome for nome in URLS_ELENCO_365}
+    sem_foto = {}
+    for jogo_data in todas_as_escalacoes.values():
+        for lado in ('mandante', 'visitante'):
+            dados_time = jogo_data.get(lado)
+            if not dados_time or dados_time.get('chave_foto_prefixo') not in time_por_prefixo:
+                continue
+            prefixo = dados_time['chave_foto_prefixo']
+            faltando = {jogador['nome_normalizado'] for papel in ('titulares', 'reservas', 'fora_de_jogo')
+                        for jogador in dados_time.get(papel, [])
+                        if f"{prefixo}_{jogador['nome_normalizado']}" not in fotos_por_chave}
+            if faltando:
+                time_365 = time_por_prefixo[prefixo]
+                sem_foto[time_365] = sem_foto.get(time_365, 0) + len(faltando)
+    return sem_foto
+
+def planejar_busca_de_fotos(buscas: dict, sem_foto: dict, agora: datetime) -> dict:
+    """
+    Decide quais elencos buscar de novo.
+
+    Args:
+        buscas (dict): {nome do time: datetime da última busca}, de ler_cache_de_fotos.
+        sem_foto (dict): {nome do time: jogadores sem foto}, de jogadores_sem_foto_por_time.
+
+    Retorna:
+        dict: {nome do time: motivo}, na ordem de URLS_ELENCO_365. Vazio = etapa de fotos pulada.
+    """
+    a_buscar = {}
+    for time_365 in URLS_ELENCO_365:
+        buscado_em = buscas.get(time_365)
+        if buscado_em is None:
+            a_buscar[time_365] = 'sem cache'
+        elif (agora - buscado_em).total_seconds() > VALIDADE_FOTOS_ELENCO_DIAS * 86400:
+            a_buscar[time_365] = f"cache de {(agora - buscado_em).days} dias"
+        elif sem_foto.get(time_365) and (agora - buscado_em).total_seconds() > ESPERA_NOVA_BUSCA_ELENCO_HORAS * 3600:
+            a_buscar[time_365] = f"{sem_foto[time_365]} jogadores da escalação sem foto"
+    return a_buscar
+
+def gravar_cache_de_fotos(conn, fotos_por_time: dict, agora: datetime) -> int:
+    """
+    Grava os elencos buscados agora: a data da busca de cada time e as fotos vistas
+    (as que não apareceram continuam no cache, com o visto_em antigo).
+
+    Retorna:
+        int: Linhas alteradas.
+    """
+    visto_em = agora.isoformat(timespec='seconds')
+    with transacao(conn):
+        antes = conn.total_changes
+        conn.executemany(montar_sql_upsert('fotos_elencos', ('time_365',), ('buscado_em', 'fotos')),
+                         [(time_365, visto_em, len(fotos)) for time_365, fotos in fotos_por_time.items()])
+        conn.executemany(montar_sql_upsert('fotos_jogadores', ('chave',), ('time_365', 'url_foto', 'visto_em')),
+                         [(chave, time_365, url_foto, visto_em)
+                          for time_365, fotos in fotos_por_time.items() for chave, url_foto in fotos.items()])
+        return conn.total_changes - antes
+
+def obter_fotos_jogadores(todas_as_escalacoes: dict, agora: Optional[datetime] = None) -> dict:
+    """
+    Fotos dos jogadores pelo cache do banco, buscando antes no 365Scores só os
+    elencos vencidos ou com jogadores da escalação sem foto (ver planejar_busca_de_fotos).
+
+    Retorna:
+        dict: {chave composta: url da foto}, como buscar_fotos_jogadores.
+    """
+    agora = agora or datetime.now()
+    with usar_conexao() as conn:
+        fotos_por_chave, buscas = ler_cache_de_fotos(conn)
+        a_buscar = planejar_busca_de_fotos(buscas, jogadores_sem_foto_por_time(todas_as_escalacoes, fotos_por_chave), agora)
+        if not a_buscar:
+            print(f"\n📸 Fotos dos jogadores: {len(fotos_por_chave)} em cache, todos os {len(URLS_ELENCO_365)} elencos em dia. Busca de fotos pulada.")
+            return fotos_por_chave
+
+        print(f"\n📸 Fotos dos jogadores: {len(URLS_ELENCO_365) - len(a_buscar)} elencos em cache; buscando {len(a_buscar)}...")
+        for motivo, times in itertools.groupby(sorted(a_buscar, key=a_buscar.get), key=a_buscar.get):
+            print(f"   > {motivo}: {', '.join(times)}")
+        fotos_por_time = buscar_fotos_por_time(list(a_buscar))
+        alteradas = gravar_cache_de_fotos(conn, fotos_por_time, agora)
+        for fotos in fotos_por_time.values():
+            fotos_por_chave.update(fotos)
+    print(f"✅ {len(fotos_por_time)}/{len(a_buscar)} elencos buscados ({alteradas} linhas do cache alteradas); "
+          f"{len(fotos_por_chave)} fotos de jogadores disponíveis.")
     return fotos_por_chave
 
 def buscar_escalacoes_da_rodada(proxima_rodada, jogos_da_proxima_rodada_cbf, mapa_nomes_cbf_para_365):
@@ -888,19 +3941,14 @@ def buscar_escalacoes_da_rodada(proxima_rodada, jogos_da_proxima_rodada_cbf, map
     bruta e os nomes normalizados para posterior mapeamento de foto.
     """
     print(f"\nBuscando escalações para a rodada {proxima_rodada} no 365Scores...")
-    options = webdriver.ChromeOptions()
-    options.add_argument('--headless')
-    options.add_argument('--no-sandbox')
-    
-    service = ChromeService(ChromeDriverManager().install())
     driver = None
     todas_as_escalacoes = {}
 
     try:
-        driver = webdriver.Chrome(service=service, options=options)
+        driver = criar_driver('escalacoes_365')
         wait = WebDriverWait(driver, 20)
         
-        url_fixtures = "https://www.365scores.com/pt-br/football/league/brasileirao-serie-a-113/matches#fixtures"
+        url_fixtures = f"https://www.365scores.com/pt-br/football/league/{LIGA_365_SCORES}/matches#fixtures"
         driver.get(url_fixtures)
         handle_cookie_banner(driver)
         
@@ -910,7 +3958,7 @@ def buscar_escalacoes_da_rodada(proxima_rodada, jogos_da_proxima_rodada_cbf, map
         max_scrolls = 15 
         for i in range(max_scrolls):
             driver.execute_script("window.scrollBy(0, window.innerHeight);")
-            time.sleep(2)
+            pausar(2)
             new_height = driver.execute_script("return document.body.scrollHeight")
             if new_height == last_height:
                 print(f"   > Fim da página alcançado na rolagem #{i+1}. Todos os jogos devem estar carregados.")
@@ -946,8 +3994,8 @@ def buscar_escalacoes_da_rodada(proxima_rodada, jogos_da_proxima_rodada_cbf, map
                 continue
             
             # Normalização do nome para a CHAVE DA FOTO
-            nome_mandante_365_chave = unidecode(nome_mandante_365).strip().lower().replace(' ', '_').replace('-', '_')
-            nome_visitante_365_chave = unidecode(nome_visitante_365).strip().lower().replace(' ', '_').replace('-', '_')
+            nome_mandante_365_chave = normalizar_nome_time_365(nome_mandante_365)
+            nome_visitante_365_chave = normalizar_nome_time_365(nome_visitante_365)
 
             chave_jogo_atual = f"{nome_mandante_365}-{nome_visitante_365}"
             url_jogo_365 = mapa_jogo_para_url.get(chave_jogo_atual)
@@ -969,7 +4017,7 @@ def buscar_escalacoes_da_rodada(proxima_rodada, jogos_da_proxima_rodada_cbf, map
                 
                 xpath_campo_futebol = "//div[contains(@class, 'game-center-widget_content')]//div[contains(@class, 'field-formation_field_container')]"
                 wait.until(EC.presence_of_element_located((By.XPATH, xpath_campo_futebol)))
-                time.sleep(1)
+                pausar(1)
 
                 jogo_atual = {'id_jogo': jogo_cbf['id_jogo']}
 
@@ -994,7 +4042,7 @@ def buscar_escalacoes_da_rodada(proxima_rodada, jogos_da_proxima_rodada_cbf, map
                 if len(botoes_time) > 1:
                     # Clica no segundo botão (Visitante)
                     driver.execute_script("arguments[0].click();", botoes_time[1])
-                    time.sleep(3)
+                    pausar(3)
                     
                     print(f"     - Extraindo dados de: {nome_visitante_365} (Visitante)")
                     soup_visitante = BeautifulSoup(driver.page_source, 'lxml')
@@ -1022,7 +4070,7 @@ def buscar_escalacoes_da_rodada(proxima_rodada, jogos_da_proxima_rodada_cbf, map
     finally:
         if driver:
             driver.quit()
-            print("   > Navegador de escalações fechado.")
+            print("   > Navegador de escalações devolvido.")
 
 def buscar_identidade_times_365scores(mapa_nomes_365_para_cbf):
     """
@@ -1030,24 +4078,19 @@ def buscar_identidade_times_365scores(mapa_nomes_365_para_cbf):
     e mapeá-los para o nome longo da CBF.
     """
     print("\nBuscando nomes e URLs de escudos dos times no 365Scores...")
-    options = webdriver.ChromeOptions()
-    options.add_argument('--headless')
-    options.add_argument('--no-sandbox')
-    
-    service = ChromeService(ChromeDriverManager().install())
     driver = None
     identidades = {} # {nome_cbf_longo: {'nome_365_abreviado': '...', 'escudo_url': '...'}}
     
-    URL_STANDINGS = "https://www.365scores.com/pt-br/football/league/brasileirao-serie-a-113/standings"
+    URL_STANDINGS = f"https://www.365scores.com/pt-br/football/league/{LIGA_365_SCORES}/standings"
 
     try:
-        driver = webdriver.Chrome(service=service, options=options)
+        driver = criar_driver('identidade_times_365')
         driver.get(URL_STANDINGS)
         handle_cookie_banner(driver)
         
         XPATH_TABELA = "//div[contains(@class, 'standings-widget_container')]"
         WebDriverWait(driver, 20).until(EC.presence_of_element_located((By.XPATH, XPATH_TABELA)))
-        time.sleep(2) 
+        pausar(2) 
         
         soup = BeautifulSoup(driver.page_source, 'lxml')
         tabela_tag = soup.find('div', class_=lambda c: c and 'standings-widget_container' in c)
@@ -1095,7 +4138,125 @@ def buscar_identidade_times_365scores(mapa_nomes_365_para_cbf):
     finally:
         if driver:
             driver.quit()
-            print("   > Navegador de identidade de times fechado.")
+            print("   > Navegador de identidade de times devolvido.")
+
+# ------------------------------------------------------------------------------
+# Cache da identidade dos times (TIMES.nome_cbf, nome_curto e url_escudo)
+# ------------------------------------------------------------------------------
+# Nomes abreviados e escudos do 365Scores quase nunca mudam numa temporada: o mapa
+# fica em TIMES, com a data da busca, e a assinatura da lista de times da CBF para a
+# qual ele foi montado fica em STATUS_COLETA. A classificação do 365Scores (e o
+# navegador dela) só é buscada de novo quando a lista de times muda, quando um time
+# da CBF está sem identidade (no máximo uma vez a cada ESPERA_NOVA_BUSCA_IDENTIDADE_HORAS)
+# ou quando o cache passa de VALIDADE_IDENTIDADE_TIMES_DIAS.
+
+def times_das_rodadas(rodadas_api) -> dict:
+    """{id do time: nome na API da CBF} dos jogos de JSONs de rodada da API (None é ignorado)."""
+    times = {}
+    for dados_api in rodadas_api:
+        for grupo_de_jogos in (dados_api or {}).get('jogos', []):
+            for jogo in grupo_de_jogos.get('jogo', []):
+                for lado in ('mandante', 'visitante'):
+                    time_info = jogo.get(lado) or {}
+                    if time_info.get('id') and time_info.get('nome'):
+                        times[time_info['id']] = time_info['nome']
+    return times
+
+def assinatura_dos_times(times_cbf: dict) -> int:
+    """Assinatura da lista {id: nome} de times da CBF (inteiro de 60 bits, cabe em STATUS_COLETA.valor)."""
+    return int(hashlib.sha1(repr(sorted(times_cbf.items())).encode('utf-8')).hexdigest()[:15], 16)
+
+def ler_cache_de_identidades(conn) -> tuple:
+    """
+    Retorna:
+        tuple: ({nome na CBF: {'nome_365_abreviado', 'escudo_url'}}, {nome na CBF: datetime da busca},
+                assinatura da lista de times da última busca ou None).
+    """
+    identidades, buscas = {}, {}
+    for nome_cbf, nome_curto, url_escudo, buscado_em in conn.execute(
+            "SELECT nome_cbf, nome_curto, url_escudo, identidade_365_em FROM times WHERE identidade_365_em IS NOT NULL"):
+        identidades[nome_cbf] = {'nome_365_abreviado': nome_curto, 'escudo_url': url_escudo}
+        buscas[nome_cbf] = datetime.fromisoformat(buscado_em)
+    linha = conn.execute("SELECT valor FROM status_coleta WHERE chave = 'assinatura_times_365'").fetchone()
+    return identidades, buscas, linha[0] if linha else None
+
+def planejar_busca_de_identidades(buscas: dict, assinatura: Optional[int], times_cbf: dict, agora: datetime) -> Optional[str]:
+    """
+    Decide se a classificação do 365Scores precisa ser buscada de novo.
+
+    Args:
+        buscas (dict): {nome na CBF: datetime da busca}, de ler_cache_de_identidades.
+        assinatura (int): Assinatura gravada na última busca (None se nunca houve).
+        times_cbf (dict): {id: nome na CBF} dos times das rodadas baixadas (vazio = lista desconhecida).
+
+    Retorna:
+        str: O motivo da busca, ou None se o cache serve.
+    """
+    if not buscas:
+        return 'sem cache'
+    ultima_busca = max(buscas.values())
+    if times_cbf and assinatura != assinatura_dos_times(times_cbf):
+        return 'a lista de times da CBF mudou'
+    if (agora - ultima_busca).total_seconds() > VALIDADE_IDENTIDADE_TIMES_DIAS * 86400:
+        return f"cache de {(agora - ultima_busca).days} dias"
+    sem_identidade = sorted(nome for nome in times_cbf.values() if nome not in buscas)
+    if sem_identidade and (agora - ultima_busca).total_seconds() > ESPERA_NOVA_BUSCA_IDENTIDADE_HORAS * 3600:
+        return f"times sem identidade: {', '.join(sem_identidade)}"
+    return None
+
+def gravar_cache_de_identidades(conn, identidades: dict, times_cbf: dict, agora: datetime, assinatura: Optional[int]) -> int:
+    """
+    Grava em TIMES as identidades buscadas agora (nome_curto, url_escudo e o nome
+    abreviado em nome, como a etapa 4 do ciclo) e, se informada, a assinatura da
+    lista de times em STATUS_COLETA. Times fora de `times_cbf` não são gravados.
+
+    Retorna:
+        int: Linhas alteradas.
+    """
+    buscado_em = agora.isoformat(timespec='seconds')
+    id_por_nome = {nome: time_id for time_id, nome in times_cbf.items()}
+    linhas = [(id_por_nome[nome_cbf], identidade['nome_365_abreviado'], identidade['escudo_url'],
+               identidade['nome_365_abreviado'], nome_cbf, buscado_em)
+              for nome_cbf, identidade in identidades.items() if nome_cbf in id_por_nome]
+    with transacao(conn):
+        antes = conn.total_changes
+        conn.executemany(montar_sql_upsert('times', ('id',), ('nome', 'url_escudo', 'nome_curto', 'nome_cbf', 'identidade_365_em')), linhas)
+        if assinatura is not None:
+            conn.execute("INSERT OR REPLACE INTO status_coleta (chave, valor) VALUES ('assinatura_times_365', ?)", (assinatura,))
+        return conn.total_changes - antes
+
+def obter_identidade_times_365(times_cbf: dict, agora: Optional[datetime] = None) -> dict:
+    """
+    Identidade (nome abreviado e escudo) dos times pelo cache em TIMES, buscando antes a
+    classificação do 365Scores só se preciso (ver planejar_busca_de_identidades).
+
+    Args:
+        times_cbf (dict): {id: nome na CBF} dos times das rodadas baixadas (ver times_das_rodadas).
+
+    Retorna:
+        dict: {nome na CBF: {'nome_365_abreviado', 'escudo_url'}}, como buscar_identidade_times_365scores.
+    """
+    agora = agora or datetime.now()
+    with usar_conexao() as conn:
+        identidades, buscas, assinatura = ler_cache_de_identidades(conn)
+        motivo = planejar_busca_de_identidades(buscas, assinatura, times_cbf, agora)
+        if motivo is None:
+            print(f"\n🏷️ Identidade dos times: {len(identidades)} times em cache (busca de {max(buscas.values()):%d/%m/%Y}). "
+                  f"Busca no 365Scores pulada.")
+            return identidades
+
+        print(f"\n🏷️ Identidade dos times: buscando a classificação do 365Scores ({motivo}).")
+        buscadas = buscar_identidade_times_365scores(MAPA_NOMES_365_PARA_CBF)
+        if not buscadas:
+            print(f"   > Nenhuma identidade buscada: usando as {len(identidades)} do cache.")
+            return identidades
+        # Sem rodadas baixadas, os ids vêm de TIMES e a assinatura gravada não muda
+        ids_dos_times = times_cbf or dict(conn.execute("SELECT id, nome_cbf FROM times WHERE nome_cbf IS NOT NULL"))
+        alteradas = gravar_cache_de_identidades(conn, buscadas, ids_dos_times, agora,
+                                                assinatura_dos_times(times_cbf) if times_cbf else None)
+    identidades.update(buscadas)
+    print(f"✅ Identidade de {len(buscadas)} times gravada em TIMES ({alteradas} linhas alteradas).")
+    return identidades
             
 # ==============================================================================
 # FUNÇÃO PRINCIPAL (Refatorada)
@@ -1109,31 +4270,143 @@ import sys
 # from selenium.webdriver.chrome.service import Service as ChromeService
 # ... outras funções e constantes ...
 
-def main_run():
-    print(f"\n{'='*20} INICIANDO CICLO DE COLETA - {datetime.now().strftime('%d/%m/%Y %H:%M:%S')} {'='*20}")
+def main_run(competicoes: Optional[list] = None) -> list:
+    """
+    Executa o ciclo de coleta de uma ou mais competições no mesmo processo,
+    intercalando as etapas: primeiro o banco e o plano de rodadas de todas; depois
+    os downloads HTTP de TODAS saem juntos em segundo plano (mesmo motor HTTP e
+    mesmos limites por host) enquanto as etapas de Selenium de cada competição
+    rodam, uma após a outra, com navegadores de um pool aberto uma vez por
+    execução (ver navegador_compartilhado).
+
+    Args:
+        competicoes (list): Configurações no formato de COMPETICOES (padrão: só a
+            competição para a qual as constantes apontam, ver competicao_atual).
+
+    Retorna:
+        list: Nomes das competições cuja coleta falhou. A falha de uma não
+              interrompe as demais (cada uma grava no seu banco).
+    """
+    competicoes = competicoes or [competicao_atual()]
+    falhas = []
+
+    # 0. Banco e plano de rodadas de cada competição
+    planos = []
+    for competicao in competicoes:
+        with usar_competicao(competicao):
+            try:
+                planos.append(preparar_ciclo_de_coleta())
+            except Exception as e:
+                print(f"❌ ERRO ao preparar a coleta de {NOME_COMPETICAO}: {type(e).__name__}: {e}")
+                falhas.append(NOME_COMPETICAO)
+                planos.append(None)
+
+    # 1+2. DOWNLOADS HTTP DA CBF (API das rodadas + página de classificação) DE TODAS AS COMPETIÇÕES.
+    #      Rodam em segundo plano enquanto o Selenium coleta os dados do 365Scores (etapas 3 a 5).
+    #      O resultado da competição i fica nas posições 2i (rodadas) e 2i+1 (HTML da classificação).
+    corotinas = []
+    for competicao, plano in zip(competicoes, planos):
+        if plano is not None:
+            plano['indice_http'] = len(corotinas)
+            corotinas += [buscar_rodadas_async(competicao['id_competicao'], plano['rodadas_a_buscar']),
+                          buscar_html_classificacao_async(competicao['ano'], competicao['caminho_tabela_cbf'])]
+    coleta_http = iniciar_coleta_http_em_segundo_plano(*corotinas)
+
+    with navegador_compartilhado():
+        for competicao, plano in zip(competicoes, planos):
+            if plano is None:
+                continue
+            with usar_competicao(competicao):
+                try:
+                    # Uma única conexão por competição (ver conexao_da_execucao) e uma única
+                    # transação para a coleta inteira: as rodadas são gravadas à medida que
+                    # são processadas, mas só confirmadas no fim (ver executar_ciclo_de_coleta)
+                    with conexao_da_execucao() as conn, transacao(conn):
+                        executar_ciclo_de_coleta(plano, coleta_http)
+                except Exception as e:
+                    print(f"❌ ERRO na coleta de {NOME_COMPETICAO}: {type(e).__name__}: {e}")
+                    falhas.append(NOME_COMPETICAO)
+
+    if len(competicoes) > 1:
+        print(f"\n🏁 {len(competicoes) - len(falhas)}/{len(competicoes)} competições coletadas com sucesso."
+              + (f" Com falha: {', '.join(falhas)}." if falhas else ""))
+    return falhas
+
+def preparar_ciclo_de_coleta() -> dict:
+    """
+    Etapa inicial da coleta da competição em andamento (ver usar_competicao):
+    aplica as migrações pendentes e decide quais rodadas baixar da API.
+
+    Retorna:
+        dict: {'rodadas_salvas': {rodada: {...}}, 'rodadas_a_buscar': [rodada, ...]}
+    """
+    print(f"\n{'='*20} INICIANDO CICLO DE COLETA: {NOME_COMPETICAO} {ANO_COMPETICAO} - {datetime.now().strftime('%d/%m/%Y %H:%M:%S')} {'='*20}")
     
-    # 🚨 PONTO DE ATENÇÃO: NÃO USAR criar_banco_de_dados() COM DROP TABLE AQUI. 
-    # Mantenha a criação de tabelas se não existirem, mas evite o DROP/CREATE completo.
+    # Não destrutivo: só aplica as migrações de esquema pendentes (os dados são preservados).
     criar_banco_de_dados()
     
-    # 1. BUSCA DE DADOS BÁSICOS DA CBF (API)
-    dados_jogadores, dados_times_cbf, jogos_finalizados, todas_as_partidas = buscar_dados_campeonato_completo(ID_COMPETICAO_CBF, TOTAL_RODADAS)
+    # No modo incremental, só as rodadas abertas (+ janela de revisão) vão para a API.
+    rodadas_salvas = ler_rodadas_salvas(ID_COMPETICAO_CBF) if MODO_INCREMENTAL else {}
+    rodadas_a_buscar = planejar_rodadas_a_buscar(TOTAL_RODADAS, rodadas_salvas)
+    print(f"\nBaixando {len(rodadas_a_buscar)}/{TOTAL_RODADAS} rodadas da API da CBF "
+          f"({TOTAL_RODADAS - len(rodadas_a_buscar)} fechadas reaproveitadas do banco) e a tabela de classificação em segundo plano...")
+    return {'rodadas_salvas': rodadas_salvas, 'rodadas_a_buscar': rodadas_a_buscar}
+
+def executar_ciclo_de_coleta(plano: dict, coleta_http: Future):
+    """
+    Etapas 1 a 8 da coleta da competição em andamento, a partir do plano de
+    preparar_ciclo_de_coleta e dos downloads em segundo plano de main_run.
+    Roda dentro da transação aberta pelo main_run; se a coleta for abortada,
+    levanta RuntimeError e nada do que foi gravado é confirmado.
+    """
+    print(f"\n{'='*20} {NOME_COMPETICAO} {ANO_COMPETICAO}: ETAPAS DE SELENIUM E GRAVAÇÃO {'='*20}")
+    rodadas_salvas = plano['rodadas_salvas']
+
+    # 3. BUSCA DE ESTATÍSTICAS 365SCORES (Selenium)
+    stats_365 = buscar_stats_365scores()
+
+    indice_http = plano['indice_http']
+    dados_baixados, html_classificacao = coleta_http.result()[indice_http:indice_http + 2]
+
+    # 4. NOMES E ESCUDOS DOS TIMES NO 365SCORES. Vem antes das rodadas da CBF porque o escudo
+    #    entra nas partidas, que são gravadas à medida que cada rodada é processada. Saem do
+    #    cache em TIMES: o Selenium só roda se a lista de times das rodadas baixadas mudou,
+    #    se um time está sem identidade ou se o cache venceu (ver obter_identidade_times_365).
+    identidades_365 = obter_identidade_times_365(times_das_rodadas(dados_baixados.values()))
+
+    # Rodadas sem mudança: fechadas lidas do banco + baixadas com 304/mesmo hash (cache HTTP)
+    cache_http = obter_cache_http()
+    rodadas_inalteradas = {r for r in rodadas_salvas if r not in dados_baixados}
+    if cache_http:
+        rodadas_inalteradas |= {r for r, dados in dados_baixados.items()
+                                if dados is not None and r in rodadas_salvas and cache_http.inalterado(montar_url_rodada_cbf(ID_COMPETICAO_CBF, r))}
+    print(f"   > {len(rodadas_inalteradas)} rodadas sem alteração desde a última coleta.")
+
+    # O JSON bruto vai para o banco junto com os dados extraídos dele, rodada a rodada
+    rodadas_brutas_novas = {r for r, dados in dados_baixados.items() if dados is not None and r not in rodadas_inalteradas}
+
+    # 1. DADOS BÁSICOS DA CBF (API), em fluxo: cada rodada é lida, processada e gravada
+    #    antes da seguinte. Os times são acumulados para as etapas seguintes; os cartões
+    #    vão para o livro de cartões, que atualiza ATLETAS.
+    print("\nProcessando e gravando as rodadas da CBF...")
+    dados_times_cbf = {}
+    rodadas = iterar_rodadas(ID_COMPETICAO_CBF, TOTAL_RODADAS, rodadas_salvas, dados_baixados)
+    with usar_conexao() as conn:
+        fluxo_rodadas = gravar_rodadas_em_fluxo(conn, extrair_rodadas(rodadas, dados_times_cbf), ID_COMPETICAO_CBF,
+                                                rodadas_inalteradas, rodadas_brutas_novas,
+                                                escudos={nome: identidade['escudo_url'] for nome, identidade in identidades_365.items()})
     
     if len(dados_times_cbf) < 2: 
-        print(f"❌ ERRO: API da CBF retornou apenas {len(dados_times_cbf)} times. Encerrando.")
-        sys.exit()
+        print(f"❌ ERRO: API da CBF retornou apenas {len(dados_times_cbf)} times. Encerrando a coleta de {NOME_COMPETICAO}.")
+        raise RuntimeError(f"API da CBF retornou apenas {len(dados_times_cbf)} times")
 
-    # 2. BUSCA DA CLASSIFICAÇÃO CBF (Scraping)
-    estatisticas_dos_times = buscar_classificacao_com_scraping(ANO_COMPETICAO, dados_times_cbf)
+    # 2. CLASSIFICAÇÃO CBF (Scraping do HTML já baixado)
+    estatisticas_dos_times = buscar_classificacao_com_scraping(ANO_COMPETICAO, dados_times_cbf, html_classificacao)
     if len(estatisticas_dos_times) < 2: 
         print(f"❌ ERRO GRAVE: Scraping da CBF retornou apenas {len(estatisticas_dos_times)} times. Continuando com cautela.")
-    
-    # 3. BUSCA DE ESTATÍSTICAS 365SCORES (Selenium)
-    stats_365 = buscar_stats_365scores()
 
-    # 4. ATUALIZAÇÃO DE NOMES E ESCUDOS DOS TIMES
+    # 4. ATUALIZAÇÃO DE NOMES E ESCUDOS DOS TIMES (os das partidas já foram aplicados na etapa 1)
     print("\n--- ATUALIZAÇÃO DE NOMES E ESCUDOS DOS TIMES ---")
-    identidades_365 = buscar_identidade_times_365scores(MAPA_NOMES_365_PARA_CBF)
     nome_cbf_para_id = {info['nome']: time_id for time_id, info in dados_times_cbf.items()}
     
     if identidades_365:
@@ -1145,19 +4418,6 @@ def main_run():
                 dados_times_cbf[time_id]['nome_curto'] = nome_a_salvar
                 dados_times_cbf[time_id]['nome'] = nome_a_salvar # Sobrescreve o nome longo da CBF
                 dados_times_cbf[time_id]['url_escudo'] = identidade['escudo_url']
-                
-        # Mesclagem de Nome/Escudo Abreviado nas Partidas (Para o Flutter)
-        for i, partida in enumerate(todas_as_partidas):
-            mandante_id = partida.get('mandante_id') 
-            visitante_id = partida.get('visitante_id')
-            if mandante_id and mandante_id in dados_times_cbf:
-                dados_mandante = dados_times_cbf[mandante_id]
-                todas_as_partidas[i]['mandante_nome'] = dados_mandante['nome']
-                todas_as_partidas[i]['mandante_url_escudo'] = dados_mandante.get('url_escudo', '')
-            if visitante_id and visitante_id in dados_times_cbf:
-                dados_visitante = dados_times_cbf[visitante_id]
-                todas_as_partidas[i]['visitante_nome'] = dados_visitante['nome']
-                todas_as_partidas[i]['visitante_url_escudo'] = dados_visitante.get('url_escudo', '')
     print("--- FIM DA ATUALIZAÇÃO ---")
 
     # ==============================================================================
@@ -1166,7 +4426,7 @@ def main_run():
     # ==============================================================================
     
     # Descobre qual é a rodada que a lógica CBF considera ser a próxima a começar
-    rodada_cbf_sugerida = calcular_rodada_atual(jogos_finalizados, todas_as_partidas, TOTAL_RODADAS)
+    rodada_cbf_sugerida = calcular_rodada_atual(fluxo_rodadas['resumo'], TOTAL_RODADAS)
     
     # Lê do banco de dados qual foi a última rodada que salvamos escalações e elenco
     ultima_rodada_salva = ler_ultima_rodada_salva()
@@ -1186,34 +4446,24 @@ def main_run():
     
     if proxima_rodada <= TOTAL_RODADAS:
         
-        # INICIA O DRIVER PARA A COLETA DE FOTOS E O PASSA PARA A FUNÇÃO
-        options = webdriver.ChromeOptions()
-        options.add_argument('--headless')
-        options.add_argument('--no-sandbox')
-        service = ChromeService(ChromeDriverManager().install())
-        driver_fotos = None
-        
-        try:
-            # Inicialização do navegador para a coleta das URLs de fotos
-            driver_fotos = webdriver.Chrome(service=service, options=options)
-            # A função buscar_fotos_jogadores é o único lugar onde o driver é usado isoladamente para as fotos
-            fotos_por_chave = buscar_fotos_jogadores(driver_fotos)
-        except Exception as e:
-            print(f"❌ ERRO ao iniciar driver para fotos: {e}")
-        finally:
-            if driver_fotos:
-                driver_fotos.quit()
-                print("   > Navegador de fotos fechado.")
-                
-        # Continua com a busca de escalações (que inicia seu próprio driver internamente)
-        jogos_da_proxima_rodada_cbf = [jogo for jogo in todas_as_partidas if jogo['rodada'] == proxima_rodada]
+        # Busca das escalações (que inicia seu próprio driver internamente)
+        jogos_da_proxima_rodada_cbf = ler_jogos_da_rodada(proxima_rodada, dados_times_cbf)
         mapa_nomes_cbf_para_365 = {v: k for k, v in MAPA_NOMES_365_PARA_CBF.items()}
         todas_as_escalacoes = buscar_escalacoes_da_rodada(proxima_rodada, jogos_da_proxima_rodada_cbf, mapa_nomes_cbf_para_365)
+
+        # FOTOS DOS ELENCOS: vêm do cache do banco; só os elencos vencidos ou com jogadores da
+        # escalação sem foto são buscados, repartidos entre NAVEGADORES_FOTOS navegadores do pool
+        try:
+            fotos_por_chave = obter_fotos_jogadores(todas_as_escalacoes)
+        except Exception as e:
+            print(f"❌ ERRO ao buscar as fotos dos jogadores: {e}")
         
     # 6. CRIAÇÃO DO ELENCO MESTRE E RESOLUÇÃO DE CONFLITO DE FOTOS
     print("\n--- GERAÇÃO DO ELENCO MESTRE (Tabela ELENCO) E RESOLUÇÃO DE CONFLITOS ---")
     elenco_mestre = {}
-    jogador_id_counter = 1
+    # Jogadores já cadastrados mantêm o ID; os novos recebem IDs a partir do maior existente
+    ids_elenco_salvos = ler_ids_elenco_salvos()
+    jogador_id_counter = max(ids_elenco_salvos.values(), default=0) + 1
     
     # Mapeamento {nome_cbf_original: id_cbf}
     nome_cbf_para_id_cbf = {info['nome']: time_id for time_id, info in dados_times_cbf.items()}
@@ -1234,9 +4484,10 @@ def main_run():
                 chave_foto_365 = f"{chave_foto_prefixo}_{nome_normalizado}"
                 foto_url = fotos_por_chave.get(chave_foto_365, '')
                 
+                id_salvo = ids_elenco_salvos.get(chave_jogador_mestre)
                 elenco_mestre[chave_jogador_mestre] = {
                     "id_time": time_id,
-                    "id_jogador": jogador_id_counter,
+                    "id_jogador": id_salvo or jogador_id_counter,
                     "nome_jogador": jogador_data['nome'],
                     "numero": jogador_data.get('numero', 'S/N'),
                     "posicao": jogador_data.get('posicao', papel).upper(),
@@ -1245,7 +4496,8 @@ def main_run():
                     "pos_y": jogador_data.get('pos_y') if papel == 'TITULAR' else None,
                     "motivo": jogador_data.get('motivo', '')
                 }
-                jogador_id_counter += 1
+                if not id_salvo:
+                    jogador_id_counter += 1
             else:
                 # Se já existe (pode ter sido listado como reserva em outro jogo)
                 if papel == 'TITULAR':
@@ -1283,14 +4535,10 @@ def main_run():
     print(f"✅ Elenco Mestre consolidado com {len(lista_final_elenco)} entradas únicas por Time/Jogador.")
 
     # 7. INJEÇÃO DE DADOS RESTANTES (Formação e Estatísticas 365)
-    for jogo_id, escalacao_data in todas_as_escalacoes.items():
-        for i, partida in enumerate(todas_as_partidas):
-            if partida['id_jogo'] == jogo_id:
-                if 'mandante' in escalacao_data and 'formacao' in escalacao_data['mandante']:
-                    todas_as_partidas[i]['mandante_formacao'] = escalacao_data['mandante']['formacao']
-                if 'visitante' in escalacao_data and 'formacao' in escalacao_data['visitante']:
-                    todas_as_partidas[i]['visitante_formacao'] = escalacao_data['visitante']['formacao']
-                break
+    # As partidas já estão no banco (etapa 1): a formação é gravada nelas diretamente
+    with usar_conexao() as conn:
+        fluxo_rodadas['alteradas']['partidas'] += gravar_formacoes(conn, todas_as_escalacoes)
+        fluxo_rodadas['enviadas'] += len(todas_as_escalacoes)
 
     if estatisticas_dos_times and stats_365:
         # Mescla estatísticas 365Scores
@@ -1306,13 +4554,90 @@ def main_run():
                 estatisticas_dos_times[time_id]['media_escanteios'] = stats.get('media_escanteios', 0)
                             
     # 8. SALVAMENTO FINAL E ATUALIZAÇÃO DO STATUS DA RODADA
-    salvar_dados_no_banco(dados_jogadores, dados_times_cbf, jogos_finalizados, todas_as_partidas, estatisticas_dos_times, todas_as_escalacoes, lista_final_elenco)
-    
-    # Se a coleta e o salvamento foram bem-sucedidos para a rodada, registramos o status.
-    if proxima_rodada <= TOTAL_RODADAS:
-        salvar_ultima_rodada_processada(proxima_rodada)
+    # JSON bruto das rodadas (etapa 1), dados e status vão em UMA transação (aberta pelo
+    # main_run): se a execução cair no meio, nada é confirmado e a próxima coleta não vê
+    # rodadas/status à frente dos dados.
+    with usar_conexao() as conn, transacao(conn):
+        # Partidas, jogos finalizados e atletas já foram gravados rodada a rodada (etapa 1)
+        salvar_dados_no_banco({}, dados_times_cbf, [], [], estatisticas_dos_times, todas_as_escalacoes, lista_final_elenco,
+                              fluxo_rodadas=fluxo_rodadas)
+        
+        # Se a coleta e o salvamento foram bem-sucedidos para a rodada, registramos o status.
+        if proxima_rodada <= TOTAL_RODADAS:
+            salvar_ultima_rodada_processada(proxima_rodada)
+
+    # 9. IMAGENS LOCAIS: fotos e escudos de URLs novas viram miniaturas WebP (ver atualizar_imagens_locais)
+    print("\nAtualizando as imagens locais (fotos e escudos)...")
+    try:
+        with usar_conexao() as conn:
+            imagens = atualizar_imagens_locais(conn)
+        print(f"🖼️ Imagens: {imagens['urls']} URLs, {imagens['baixadas']} baixadas ({imagens['conteudos_novos']} conteúdos novos, "
+              f"{imagens['miniaturas']} miniaturas geradas), {imagens['falhas']} falhas; {imagens['alteradas']} linhas alteradas.")
+    except Exception as e:
+        print(f"❌ ERRO ao atualizar as imagens locais: {type(e).__name__}: {e}")
     
     print(f"\n✅ CICLO CONCLUÍDO COM SUCESSO. {len(lista_final_elenco)} jogadores únicos salvos na tabela ELENCO.")
 
 if __name__ == "__main__":
-    main_run()
\ No newline at end of file
+    import argparse
+    parser = argparse.ArgumentParser(description="Robô de coleta de dados do Brasileirão (CBF + 365Scores).")
+    grupo = parser.add_mutually_exclusive_group()
+    grupo.add_argument('--gravar', metavar='ARQUIVO.zip', help="Grava todas as respostas HTTP e páginas do Selenium em um arquivo.")
+    grupo.add_argument('--reproduzir', metavar='ARQUIVO.zip', help="Executa offline, servindo as respostas de uma gravação.")
+    grupo.add_argument('--exportar', action='store_true', help="Só exporta o banco de cada competição em NDJSON para database/dados.")
+    grupo.add_argument('--importar', action='store_true', help="Só reconstrói os bancos de todas as temporadas a partir da exportação em texto.")
+    grupo.add_argument('--mostrar-banco', action='store_true', help="Só mostra o caminho do banco da temporada atual da competição do app.")
+    grupo.add_argument('--reconstruir-cartoes', action='store_true', help="Só refaz os cartões dos atletas de cada competição a partir do livro de cartões.")
+    parser.add_argument('--chromedriver', metavar='CAMINHO', help="Usa este chromedriver local, sem consultar o host de downloads (modo offline).")
+    args = parser.parse_args()
+    CHROMEDRIVER_FIXO = args.chromedriver
+
+    if args.mostrar_banco:
+        with usar_competicao(COMPETICOES[0]):
+            print(DB_FILE)
+        sys.exit()
+    if args.exportar:
+        for competicao in COMPETICOES:
+            with usar_competicao(competicao):
+                exportar_banco_para_texto()
+        sys.exit()
+    if args.reconstruir_cartoes:
+        for competicao in COMPETICOES:
+            with usar_competicao(competicao):
+                criar_banco_de_dados()
+                with usar_conexao() as conn, transacao(conn):
+                    alteradas = reconstruir_atletas_pelo_livro(conn)
+                    atualizar_agregados_por_time(conn)
+                    atualizar_tabelas_de_leitura(conn)
+                print(f"✅ {NOME_COMPETICAO}: {alteradas} atletas corrigidos a partir do livro de cartões.")
+        sys.exit()
+    if args.importar:
+        # Uma pasta por temporada em database/dados ({ano}_{id_competicao}), cada uma vira o seu shard
+        pasta_dados = os.path.dirname(PASTA_EXPORTACAO_TEXTO)
+        for nome in sorted(os.listdir(pasta_dados)):
+            achado = re.fullmatch(r'(\d+)_(\d+)', nome)
+            if achado:
+                destino = os.path.join(PASTA_TEMPORADAS, ARQUIVO_BANCO_TEMPORADA.format(ano=achado.group(1), id_competicao=achado.group(2)))
+                importar_banco_de_texto(os.path.join(pasta_dados, nome), destino)
+        atualizar_catalogo()
+        sys.exit()
+
+    with usar_competicao(COMPETICOES[0]):
+        adotar_banco_legado()
+    # O .db não é versionado: na primeira execução (ex.: no CI) ele é refeito a partir do texto
+    for competicao in COMPETICOES:
+        with usar_competicao(competicao):
+            if not os.path.exists(DB_FILE) and os.path.exists(os.path.join(PASTA_EXPORTACAO_TEXTO, 'manifesto.json')):
+                importar_banco_de_texto()
+
+    with modo_gravacao_reproducao(arquivo_gravar=args.gravar, arquivo_reproduzir=args.reproduzir):
+        falhas = main_run(COMPETICOES)
+
+    # Na reprodução o banco é de teste: a exportação versionada só é atualizada nas coletas reais
+    if not args.reproduzir:
+        for competicao in COMPETICOES:
+            with usar_competicao(competicao):
+                exportar_banco_para_texto()
+        atualizar_catalogo()
+    if falhas:
+        sys.exit(1)
\ No newline at end of file